@@ -1,10 +1,12 @@
 import streamlit as st
-import json
-from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
-from typing import List, Dict
 
 from src.llms.openai_llm import OpenAILLM
 from src.agents.meta_query_agent import MetaQueryAgent
+from src.conversation.conversation_store import get_conversation_store
+from src.conversation.session import bind_conversation
+from src.conversation.turn import record_error, record_turn_result, record_user_message, split_result
+from src.observability.tracing import format_trace, get_trace_collector, span, tracing_enabled, tracing_scope
+from src.observability.usage import get_usage_ledger
 
 # Page configuration
 st.set_page_config(
@@ -14,8 +16,10 @@ st.set_page_config(
 )
 
 # Initialize session state
-if "messages" not in st.session_state:
-    st.session_state.messages: List[Dict[str, str]] = []
+if "conversation" not in st.session_state:
+    # Conversation history lives in the durable store; the ID in the URL survives reloads/restarts
+    st.session_state.conversation = get_conversation_store().conversation(st.query_params.get("conversation_id"))
+    st.query_params["conversation_id"] = st.session_state.conversation.id
 
 if "meta_query_agent" not in st.session_state:
     st.session_state.meta_query_agent = None
@@ -42,6 +46,40 @@ def initialize_agents():
         return False
 
 
+def render_stream(events):
+    """
+    Paint MetaQueryAgent.stream() events as they arrive.
+    Returns (final result, response placeholder).
+    Tokens of the `response` field are written into a placeholder; tool and
+    sub-agent events are shown in a status box.
+    """
+    status = st.status("Working...", expanded=False)
+    placeholder = st.empty()
+    streamed_text = ""
+    result = {}
+
+    for event in events:
+        event_type = event.get("type")
+        if event_type == "token":
+            streamed_text += event["text"]
+            placeholder.markdown(streamed_text + "▌")
+        elif event_type == "tool_start":
+            status.update(label=f"🔧 Running `{event.get('name')}`...")
+            status.write(f"🔧 `{event.get('name')}` started")
+        elif event_type == "tool_end":
+            status.write(f"✅ `{event.get('name')}` finished • status: **{event.get('status')}**")
+        elif event_type == "sub_agent_field" and event.get("field") in ("stage", "follow_up_question") and event.get("value"):
+            # Launching state fields become visible as soon as they are complete
+            status.write(f"🤖 {event.get('agent_name')} • {event['field']}: {event['value']}")
+        elif event_type == "sub_agent":
+            status.write(f"🤖 {event.get('agent_name', 'sub-agent')}: {event.get('status')}")
+        elif event_type == "final":
+            result = event.get("result") or {}
+
+    status.update(label="Done", state="complete")
+    return result, placeholder
+
+
 def main():
     st.title("🤖 Meta Query Agent Chat Interface")
     st.markdown("Chat with the Meta Query Agent to manage your Meta campaign workflows.")
@@ -52,8 +90,10 @@ def main():
             if not initialize_agents():
                 st.stop()
     
+    conversation = st.session_state.conversation
+
     # Display chat messages
-    for message in st.session_state.messages:
+    for message in conversation.messages():
         role = message.get("role", "assistant")
         agent_name = message.get("agent_name", "")
 
@@ -75,106 +115,41 @@ def main():
     # Chat input
     if prompt := st.chat_input("What would you like to know?"):
         # Add user message to chat history
-        st.session_state.messages.append({
-            "role": "user",
-            "content": prompt,
-            "agent_name": "",
-            "formatted_output": ""
-        })
+        record_user_message(conversation, prompt)
 
         # Display user message
         with st.chat_message("user"):
             st.markdown(prompt)
 
-        # Build LangChain messages including TOOL messages
-        langchain_messages = []
-        for msg in st.session_state.messages:
-            role = msg.get("role")
-
-            if role == "user":
-                langchain_messages.append(HumanMessage(content=msg["content"]))
-
-            elif role == "assistant":
-                # Pass the formatted output JSON string if available, else fallback to visible content
-                assistant_payload = msg.get("formatted_output") or msg.get("formated_output") or msg.get("content", "")
-                langchain_messages.append(AIMessage(content=assistant_payload))
-
-            elif role == "tool":
-                # ToolMessage requires tool_call_id for best compatibility
-                langchain_messages.append(
-                    ToolMessage(
-                        content=msg.get("content", ""),
-                        tool_call_id=msg.get("tool_call_id", "unknown_tool_call_id"),
-                        name=msg.get("name"),
-                    )
-                )
+        # LangChain messages including TOOL messages (cached, only new messages are converted)
+        langchain_messages = conversation.langchain_messages()
 
         # Display assistant response
         with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                try:
-                    # Invoke based on selected mode
-                    result = st.session_state.meta_query_agent.invoke(langchain_messages)
-
-                    # Expecting: { structured_response, tool_calls, ... }
-                    structured = {}
-                    tool_calls = []
-
-                    if isinstance(result, dict) and "structured_response" in result:
-                        structured = result.get("structured_response") or {}
-                        tool_calls = result.get("tool_calls") or []
-                    else:
-                        # fallback if your invoke returns only structured_response
-                        structured = result if isinstance(result, dict) else {"response": str(result), "context": {}}
-                        tool_calls = []
-
-                    response_text = structured.get("response", str(structured))
-
-                    # Show assistant response
-                    st.markdown(response_text)
-
-                    # Store assistant message (include full structured JSON as string so it can be replayed)
-                    st.session_state.messages.append({
-                        "role": "assistant",
-                        "content": response_text,
-                        "agent_name": "META_QUERY_AGENT",
-                        "formatted_output": json.dumps(structured, ensure_ascii=False),
-                    })
-
-                    # Store tool calls as separate messages + display them
-                    if tool_calls:
-                        with st.expander("🔧 Tool calls"):
-                            st.json(tool_calls)
-
-                        for t in tool_calls:
-                            tool_name = t.get("name", "")
-                            # Determine agent_name based on tool name
-                            if tool_name == "launching_agent_tool":
-                                agent_name = "LAUNCHING_AGENT"
-                            elif tool_name == "reporting_agent_tool":
-                                agent_name = "REPORTING_AGENT"
-                            else:
-                                agent_name = "META_QUERY_AGENT"  # Default fallback
-                            
-                            st.session_state.messages.append({
-                                "role": "tool",
-                                "name": tool_name,
-                                "content": t.get("content", ""),
-                                "agent_name": agent_name,
-                                "tool_call_id": t.get("tool_call_id") or t.get("id") or "unknown_tool_call_id",
-                                "status": t.get("status", "success"),
-                                "formatted_output": ""
-                            })
-
-                except Exception as e:
-                    error_message = f"An error occurred: {str(e)}"
-                    st.error(error_message)
-                    st.session_state.messages.append({
-                        "role": "assistant",
-                        "content": error_message,
-                        "agent_name": "META_QUERY_AGENT",
-                        "formatted_output": ""
-                    })
+            try:
+                # Stream the supervisor run, painting tokens and tool progress as they arrive
+                # Traces are recorded per session ("Record traces" in the sidebar), not for the whole process
+                with bind_conversation(conversation), tracing_scope(st.session_state.get("record_traces")), span("turn", "turn", conversation_id=conversation.id, input_chars=len(prompt)) as turn_span:
+                    result, response_placeholder = render_stream(st.session_state.meta_query_agent.stream(langchain_messages))
+                st.session_state.last_trace_id = turn_span.trace_id
+
+                # Expecting: { structured_response, tool_calls, ... }
+                structured, tool_calls = split_result(result)
+
+                # Store assistant message and tool calls (full structured JSON is kept so it can be replayed)
+                response_text = record_turn_result(conversation, structured, tool_calls)
+
+                # Replace the streamed text with the final, validated response
+                response_placeholder.markdown(response_text)
+
+                if tool_calls:
+                    with st.expander("🔧 Tool calls"):
+                        st.json(tool_calls)
+
+            except Exception as e:
+                error_message = f"An error occurred: {str(e)}"
+                st.error(error_message)
+                record_error(conversation, error_message)
 
     # Sidebar with controls
     with st.sidebar:
@@ -185,18 +160,38 @@ def main():
         st.header("Controls")
         
         if st.button("Clear Chat History"):
-            st.session_state.messages = []
+            conversation.clear()
             st.rerun()
         
         st.markdown("---")
         st.subheader("Chat Info")
-        st.write(f"Total messages: {len(st.session_state.messages)}")
+        st.write(f"Conversation: `{conversation.id}`")
+        st.write(f"Total messages: {len(conversation)}")
+
+        usage = get_usage_ledger().conversation_report(conversation.id)
+        if usage is not None:
+            st.write(f"Tokens: {usage['tokens']:,} ({usage['cached_tokens']:,} cached input)")
+            st.write(f"Cost: ${usage['cost_usd']:.4f}")
+            budget = usage.get("budget")
+            if budget is not None:
+                st.progress(min(1.0, budget["used_ratio"]), text=f"Budget: {budget['status']}")
+            with st.expander("Usage by agent and tool"):
+                st.json({"by_agent": usage["by_agent"], "by_tool": usage["by_tool"]})
         
         if st.session_state.initialized:
             st.success("✅ Agents initialized")
         else:
             st.error("❌ Agents not initialized")
 
+        st.markdown("---")
+        st.subheader("Trace")
+        record_traces = st.checkbox("Record traces", value=tracing_enabled(), key="record_traces")
+        last_trace = get_trace_collector().find(st.session_state.get("last_trace_id")) if record_traces else None
+        if last_trace is not None:
+            st.code(format_trace(last_trace), language=None)
+        elif record_traces:
+            st.caption("Send a message to see its trace.")
+
 
 if __name__ == "__main__":
     main()
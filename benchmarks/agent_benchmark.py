@@ -0,0 +1,191 @@
+"""
+Offline benchmark suite for the agent pipeline, driven by FakeChatModel (no
+network access). Every scenario reports p50/p95/p99 latency per turn plus
+allocations per turn (traced in separate runs):
+
+  single_turn   MetaQueryAgent.invoke and LaunchingAgent.invoke, one turn each
+  launch_flow   full launch conversations: supervisor -> launching_agent_tool ->
+                LaunchingAgent, CAMPAIGN_INFO -> CREATIVE -> LAUNCHING, plus
+                cached/uncached input tokens per agent prompt prefix
+  history       one supervisor turn on top of a growing conversation history,
+                with prompt tokens before/after the context budget
+  concurrent    many sessions at once, thread pool vs one event loop
+
+    python -m benchmarks.agent_benchmark --scenario all --latency 0.01 --token-latency 0.0005
+"""
+import argparse
+import asyncio
+import os
+from typing import Any, Dict, List
+
+from langchain_core.messages import HumanMessage
+
+from benchmarks.common import allocation_summary, latency_summary, print_row, timed, use_scratch_dir
+from src.agents.context_budget import ContextBudget
+from src.agents.launching_agent import LaunchingAgent
+from src.agents.meta_query_agent import MetaQueryAgent
+from src.conversation.conversation_store import InMemoryConversationStore
+from src.conversation.session import bind_conversation
+from src.conversation.turn import record_turn_result, record_user_message, split_result
+from src.llms.fake_llm import FakeChatModel, launch_flow_reply, stand_in_reply
+from src.observability.prompt_cache import get_prompt_cache_tracker
+from src.observability.tracing import span
+
+CLARIFY_REPLY = {
+    "context": "mode=clarify | stage=intake | question=launch_or_reporting",
+    "response": "Would you like to launch a campaign or see a report?",
+}
+
+# User side of one complete launch conversation
+LAUNCH_SCRIPT = [
+    "I want to launch a new campaign",
+    "Traffic",
+    "India",
+    "500",
+    "2026-11-01T09:00:00",
+    "GENERATE",
+    "https://example.com/product",
+    "YES",
+]
+
+
+def _model(args: argparse.Namespace, reply: Any) -> FakeChatModel:
+    return FakeChatModel(responses=[reply], latency=args.latency, token_latency=args.token_latency)
+
+
+def run_turn(agent: MetaQueryAgent, conversation, text: str) -> Dict[str, Any]:
+    """One chat turn the way app.py runs it: record, build history, invoke, record."""
+    record_user_message(conversation, text)
+    with bind_conversation(conversation), span("turn", "turn", conversation_id=conversation.id):
+        result = agent.invoke(conversation.langchain_messages())
+    structured, tool_calls = split_result(result)
+    record_turn_result(conversation, structured, tool_calls)
+    return result
+
+
+def bench_single_turn(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    supervisor = MetaQueryAgent(model=_model(args, CLARIFY_REPLY))
+    # fast_path=False so the case measures a real (fake) model call
+    launching = LaunchingAgent(model=_model(args, launch_flow_reply), fast_path=False)
+    cases = {
+        "MetaQueryAgent.invoke": lambda: supervisor.invoke([HumanMessage(content="hello")]),
+        "LaunchingAgent.invoke": lambda: launching.invoke([HumanMessage(content="I want to launch a campaign")]),
+    }
+
+    rows = []
+    for name, call in cases.items():
+        call()  # warm-up (first graph run compiles lazily)
+        latencies = [timed(call)[1] for _ in range(args.turns)]
+        rows.append({"scenario": "single_turn", "case": name, **latency_summary(latencies), **allocation_summary(call, args.alloc_runs)})
+    return rows
+
+
+def bench_launch_flow(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    # launching_agent_tool asks OpenAILLM for its model; point it at the stand-in
+    os.environ["LLM_STAND_IN"] = "1"
+    os.environ["LLM_STAND_IN_LATENCY"] = str(args.latency)
+    os.environ["LLM_STAND_IN_TOKEN_LATENCY"] = str(args.token_latency)
+
+    agent = MetaQueryAgent(model=_model(args, stand_in_reply))
+    store = InMemoryConversationStore()
+
+    def one_session() -> List[float]:
+        conversation = store.conversation()
+        latencies = [timed(lambda: run_turn(agent, conversation, text))[1] for text in LAUNCH_SCRIPT]
+        final = conversation.messages(agent_name="LAUNCHING_AGENT", roles=("assistant",))[-1]
+        if '"state": "completed"' not in final.get("formatted_output", ""):
+            raise RuntimeError(f"Launch flow did not complete: {final}")
+        return latencies
+
+    tracker = get_prompt_cache_tracker()
+    one_session()
+    tracker.reset()
+    latencies = [t for _ in range(args.sessions) for t in one_session()]
+    prompt_rows = tracker.stats()["by_prefix"]
+    allocations = allocation_summary(one_session, max(1, args.alloc_runs // 2))
+    # Allocations are measured per session; report them per turn like the other scenarios
+    allocations = {k: round(v / len(LAUNCH_SCRIPT), 1) for k, v in allocations.items()}
+    rows = [{
+        "scenario": "launch_flow",
+        "case": f"{len(LAUNCH_SCRIPT)} turns x {args.sessions} sessions",
+        **latency_summary(latencies),
+        **allocations,
+    }]
+    # Cached vs uncached input tokens per agent prompt prefix (simulated provider prompt cache)
+    for row in prompt_rows:
+        rows.append({
+            "scenario": "launch_flow", "case": f"prompt {row['agent']}@{row['prefix']}", "calls": row["calls"],
+            "input_tokens": row["input_tokens"], "cached_tokens": row["cached_tokens"],
+            "uncached_tokens": row["uncached_tokens"], "cached_ratio": row["cached_ratio"],
+        })
+    return rows
+
+
+def bench_history(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    agent = MetaQueryAgent(model=_model(args, CLARIFY_REPLY), context_budget=ContextBudget())
+    store = InMemoryConversationStore()
+
+    rows = []
+    for size in args.history_sizes:
+        conversation = store.conversation()
+        for i in range(size // 2):
+            record_user_message(conversation, f"question {i}: how is campaign {i} doing?")
+            record_turn_result(conversation, {"context": "mode=clarify", "response": f"answer {i}"}, [])
+
+        def turn() -> None:
+            with bind_conversation(conversation):
+                agent.invoke(conversation.langchain_messages() + [HumanMessage(content="hello")])
+
+        turn()
+        latencies = [timed(turn)[1] for _ in range(args.turns)]
+        _, report = agent.context_budget.apply(conversation.langchain_messages() + [HumanMessage(content="hello")])
+        rows.append({
+            "scenario": "history",
+            "case": f"{size} messages",
+            "prompt_tokens": report.tokens_before,
+            "budgeted_tokens": report.tokens_after,
+            "saved_pct": round(100 * report.saved / report.tokens_before, 1) if report.tokens_before else 0.0,
+            **latency_summary(latencies),
+            **allocation_summary(turn, args.alloc_runs),
+        })
+    return rows
+
+
+def bench_concurrent(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    from benchmarks.concurrency_benchmark import run_async, run_sync, supervisor_reply
+
+    agent = MetaQueryAgent(model=_model(args, supervisor_reply))
+    results = [run_sync(agent, args.sessions * 10, args.threads), asyncio.run(run_async(agent, args.sessions * 10))]
+    return [{"scenario": "concurrent", **row} for row in results]
+
+
+SCENARIOS = {
+    "single_turn": bench_single_turn,
+    "launch_flow": bench_launch_flow,
+    "history": bench_history,
+    "concurrent": bench_concurrent,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=[*SCENARIOS, "all"], default="all")
+    parser.add_argument("--turns", type=int, default=50, help="timed turns per case")
+    parser.add_argument("--sessions", type=int, default=5, help="launch conversations (x10 for concurrent)")
+    parser.add_argument("--threads", type=int, default=8, help="worker threads for the concurrent sync baseline")
+    parser.add_argument("--history-sizes", type=int, nargs="+", default=[0, 100, 1000, 5000])
+    parser.add_argument("--latency", type=float, default=0.0, help="fake LLM time to first token (seconds)")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="fake LLM time per output token (seconds)")
+    parser.add_argument("--alloc-runs", type=int, default=3, help="traced runs per case for allocation stats")
+    args = parser.parse_args()
+
+    use_scratch_dir()
+
+    names = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+    for name in names:
+        for row in SCENARIOS[name](args):
+            print_row(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Cold/warm report for the LLM record/replay cassette. Runs the scripted launch
+conversation through OpenAILLM models (stand-in model with simulated latency,
+wrapped by the cassette): the cold pass records every call, the warm pass
+replays them from disk.
+
+    python -m benchmarks.cassette_benchmark --sessions 5 --latency 0.05
+"""
+import argparse
+import os
+
+from benchmarks.agent_benchmark import LAUNCH_SCRIPT, run_turn
+from benchmarks.common import latency_summary, print_row, timed, use_scratch_dir
+from src.agents.meta_query_agent import MetaQueryAgent
+from src.conversation.conversation_store import InMemoryConversationStore
+from src.llms.cassette import Cassette
+from src.llms.openai_llm import OpenAILLM
+
+
+def run_pass(name: str, sessions: int, cassette: Cassette) -> dict:
+    cassette.reset_stats()
+    agent = MetaQueryAgent(model=OpenAILLM().get_llm_model())
+    store = InMemoryConversationStore()
+    latencies = []
+    for _ in range(sessions):
+        conversation = store.conversation()
+        latencies.extend(timed(lambda: run_turn(agent, conversation, text))[1] for text in LAUNCH_SCRIPT)
+    stats = cassette.stats()
+    return {
+        "pass": name,
+        "hit_rate": stats["hit_rate"],
+        "hits": stats["hits"],
+        "misses": stats["misses"],
+        "recorded": stats["recorded"],
+        "saved_s": stats["saved_seconds"],
+        **latency_summary(latencies),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05, help="stand-in model latency per call (seconds)")
+    args = parser.parse_args()
+
+    use_scratch_dir()
+    os.environ.update({
+        "LLM_STAND_IN": "1",
+        "LLM_STAND_IN_LATENCY": str(args.latency),
+        "LLM_CASSETTE": os.path.abspath("cassettes/llm.cas"),
+        "LLM_CASSETTE_MODE": "auto",
+    })
+    cassette = OpenAILLM.get_cassette(os.environ["LLM_CASSETTE"])
+
+    print_row(run_pass("cold", args.sessions, cassette))
+    print_row(run_pass("warm", args.sessions, cassette))
+
+    # Reopening only reads the fixed-width index, not the recorded payloads
+    (reopened, seconds) = timed(lambda: Cassette(os.environ["LLM_CASSETTE"]))
+    print_row({
+        "entries": len(reopened),
+        "data_bytes": os.path.getsize(reopened.path),
+        "index_bytes": os.path.getsize(reopened.index_path),
+        "reopen_ms": round(seconds * 1000, 2),
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Micro-benchmark for tool-message repair on long synthetic histories: the
+previous look-back implementation of MetaQueryAgent._clean_messages (quadratic
+in the distance to the last AIMessage) vs the single-pass repair_tool_messages().
+
+    python -m benchmarks.clean_messages_benchmark --sizes 1000 10000 50000 --orphan-run 200
+"""
+import argparse
+import random
+import time
+from typing import List
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+from src.agents.message_repair import repair_tool_messages
+
+
+def legacy_clean_messages(messages: List[BaseMessage]) -> List[BaseMessage]:
+    """The original implementation: scans back to the last AIMessage for every ToolMessage."""
+    cleaned = []
+    for i, msg in enumerate(messages):
+        if not isinstance(msg, ToolMessage):
+            cleaned.append(msg)
+            continue
+        prev_ai = None
+        for j in range(i - 1, -1, -1):
+            if isinstance(messages[j], AIMessage):
+                prev_ai = messages[j]
+                break
+        tool_calls = (getattr(prev_ai, "tool_calls", None) or []) if prev_ai is not None else []
+        tool_call_id = getattr(msg, "tool_call_id", None)
+        ids = [tc.get("id") if isinstance(tc, dict) else getattr(tc, "id", None) for tc in tool_calls]
+        if tool_call_id and tool_call_id in ids:
+            cleaned.append(msg)
+    return cleaned
+
+
+def synthetic_history(size: int, orphan_run: int, seed: int = 0) -> List[BaseMessage]:
+    """
+    Mix of normal turns, parallel tool calls (some left unanswered), duplicate
+    answers and runs of `orphan_run` orphaned tool messages after human turns.
+    """
+    rng = random.Random(seed)
+    messages: List[BaseMessage] = []
+    n = 0
+    while len(messages) < size:
+        messages.append(HumanMessage(content=f"turn {n}"))
+        kind = rng.random()
+        if kind < 0.6:
+            calls = [{"name": "reporting_agent_tool", "args": {"campaign_ids": [str(n)]}, "id": f"call_{n}_{k}", "type": "tool_call"}
+                     for k in range(rng.randint(1, 3))]
+            messages.append(AIMessage(content="", tool_calls=calls))
+            answered = calls if rng.random() < 0.8 else calls[:-1]
+            for call in answered:
+                messages.append(ToolMessage(content="ok", tool_call_id=call["id"], name=call["name"]))
+            if answered and rng.random() < 0.1:
+                messages.append(ToolMessage(content="dup", tool_call_id=answered[0]["id"], name="reporting_agent_tool"))
+            messages.append(AIMessage(content=f"answer {n}"))
+        elif kind < 0.9:
+            messages.append(AIMessage(content=f"answer {n}"))
+        else:
+            messages.extend(ToolMessage(content="stale", tool_call_id=f"stale_{n}_{k}") for k in range(orphan_run))
+        n += 1
+    return messages[:size]
+
+
+def _best_of(fn, messages: List[BaseMessage], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(messages)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--orphan-run", type=int, default=200, help="orphaned tool messages per stale block")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-legacy-above", type=int, default=50000, help="don't time the quadratic version above this size")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        messages = synthetic_history(size, args.orphan_run)
+        cleaned, report = repair_tool_messages(messages)
+        row = {
+            "messages": size,
+            "kept": len(cleaned),
+            "dropped_tool": len(report.dropped_tool_messages),
+            "stripped_calls": len(report.stripped_tool_calls),
+            "repair_ms": round(_best_of(repair_tool_messages, messages, args.repeat) * 1000, 2),
+        }
+        if size <= args.skip_legacy_above:
+            row["legacy_ms"] = round(_best_of(legacy_clean_messages, messages, args.repeat) * 1000, 2)
+            row["speedup"] = round(row["legacy_ms"] / max(row["repair_ms"], 1e-6), 1)
+        print("  ".join(f"{k}={v}" for k, v in row.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Shared helpers for the benchmarks: percentiles, allocation tracing and row printing."""
+import math
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list (q in 0..100)."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/max in milliseconds."""
+    values = sorted(latencies)
+    return {
+        "n": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2) if values else 0.0,
+    }
+
+
+def timed(fn: Callable[[], Any]) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def allocation_summary(fn: Callable[[], Any], runs: int = 5) -> Dict[str, float]:
+    """
+    Allocations per call of `fn`, traced separately from the timed runs because
+    tracemalloc slows Python code down: peak traced memory and total bytes
+    allocated (net of frees) per call, in KiB.
+    """
+    peaks, nets = [], []
+    for _ in range(runs):
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        fn()
+        after, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks.append(peak - before)
+        nets.append(after - before)
+    return {
+        "alloc_peak_kib": round(max(peaks) / 1024, 1),
+        "alloc_net_kib": round(sum(nets) / len(nets) / 1024, 1),
+    }
+
+
+def use_scratch_dir() -> str:
+    """Run from a temporary directory, since the agents write logs/ relative to the working directory."""
+    path = tempfile.mkdtemp(prefix="bench-")
+    os.chdir(path)
+    return path
+
+
+def print_row(row: Dict[str, Any]) -> None:
+    print("  ".join(f"{k}={v}" for k, v in row.items()), flush=True)
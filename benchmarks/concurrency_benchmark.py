@@ -0,0 +1,97 @@
+"""
+Sessions-per-process benchmark: blocking invoke() on a worker-thread pool (one
+thread pinned per in-flight LLM call, like Streamlit) vs ainvoke() multiplexed
+on a single event loop. Uses FakeChatModel, so no network access is needed.
+
+    python -m benchmarks.concurrency_benchmark --sessions 200 --threads 8 --latency 0.2
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+from benchmarks.common import latency_summary, print_row, use_scratch_dir
+from src.agents.meta_query_agent import MetaQueryAgent
+from src.llms.fake_llm import FakeChatModel
+
+
+def supervisor_reply(messages: List[BaseMessage]) -> AIMessage:
+    """Call reporting_agent_tool once, then answer with a MetaQueryAgentResponse."""
+    if isinstance(messages[-1], ToolMessage):
+        return AIMessage(content=json.dumps({
+            "context": "mode=reporting | stage=fetch_report",
+            "response": "Campaign 123 spent 100 with a ROAS of 10.",
+        }))
+    return AIMessage(content="", tool_calls=[{
+        "name": "reporting_agent_tool",
+        "args": {"campaign_ids": ["123"]},
+        "id": f"call_{uuid.uuid4().hex[:12]}",
+        "type": "tool_call",
+    }])
+
+
+def _summary(name: str, latencies: List[float], wall: float, peak_threads: int) -> dict:
+    return {
+        "mode": name,
+        "sessions": len(latencies),
+        "wall_s": round(wall, 3),
+        "sessions_per_s": round(len(latencies) / wall, 1),
+        **{k: v for k, v in latency_summary(latencies).items() if k != "n"},
+        "peak_threads": peak_threads,
+    }
+
+
+def run_sync(agent: MetaQueryAgent, sessions: int, threads: int) -> dict:
+    latencies = []
+    peak_threads = threading.active_count()
+
+    def one_session(i: int) -> None:
+        nonlocal peak_threads
+        start = time.perf_counter()
+        agent.invoke([HumanMessage(content=f"report for campaign 123 (session {i})")])
+        latencies.append(time.perf_counter() - start)
+        peak_threads = max(peak_threads, threading.active_count())
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one_session, range(sessions)))
+    return _summary(f"sync x{threads} threads", latencies, time.perf_counter() - start, peak_threads)
+
+
+async def run_async(agent: MetaQueryAgent, sessions: int) -> dict:
+    latencies = []
+
+    async def one_session(i: int) -> None:
+        start = time.perf_counter()
+        await agent.ainvoke([HumanMessage(content=f"report for campaign 123 (session {i})")])
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_session(i) for i in range(sessions)))
+    return _summary("async, 1 event loop", latencies, time.perf_counter() - start, threading.active_count())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=8, help="worker threads for the blocking baseline")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake LLM latency per call (seconds)")
+    args = parser.parse_args()
+
+    use_scratch_dir()
+
+    agent = MetaQueryAgent(model=FakeChatModel(responses=[supervisor_reply], latency=args.latency))
+
+    results = [run_sync(agent, args.sessions, args.threads), asyncio.run(run_async(agent, args.sessions))]
+    for row in results:
+        print_row(row)
+
+
+if __name__ == "__main__":
+    main()
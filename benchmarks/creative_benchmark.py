@@ -0,0 +1,49 @@
+"""
+Creative generation latency with the local stand-in backend: one variant at a
+time (the old behaviour) against the worker-pool fan-out with and without a
+spare variant, a re-run of the same launch (served from the creative store),
+and concurrent launches for the same products (deduplicated in flight).
+
+    python -m benchmarks.creative_benchmark --products 10 --images 3 --latency 0.2
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import latency_summary, print_row, timed, use_scratch_dir
+from src.creatives.backends import LocalGenerationBackend
+from src.creatives.generator import CreativeGenerator, CreativeStore
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=10, help="product URLs launched per case")
+    parser.add_argument("--images", type=int, default=3, help="creatives per launch")
+    parser.add_argument("--latency", type=float, default=0.2, help="stand-in seconds per image (x0.5-1.5 by variant)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--clients", type=int, default=4, help="concurrent launches of the same product in the last case")
+    args = parser.parse_args()
+
+    use_scratch_dir()
+    backend = LocalGenerationBackend(args.latency)
+    cases = [("sequential", 1, 0), ("pool", args.workers, 0), ("pool + spare", args.workers, 1)]
+    for name, workers, spare in cases:
+        generator = CreativeGenerator(backend, CreativeStore(f"store-{workers}-{spare}"), workers=workers, spare_variants=spare)
+        products = [f"https://shop.example.com/products/{name.replace(' ', '-')}-{i}" for i in range(args.products)]
+        latencies = [timed(lambda: generator.generate(url, args.images))[1] for url in products]
+        print_row({"case": name, "workers": workers, "spare": spare, **latency_summary(latencies)})
+        if spare:
+            rerun = [timed(lambda: generator.generate(url, args.images))[1] for url in products]
+            print_row({"case": "re-run", **latency_summary(rerun), "generated": generator.stats()["generated"]})
+
+    generator = CreativeGenerator(backend, CreativeStore("store-shared"), workers=args.workers)
+    products = [f"https://shop.example.com/products/shared-{i}" for i in range(args.products)]
+    with ThreadPoolExecutor(max_workers=args.clients) as pool:
+        latencies = list(pool.map(lambda url: timed(lambda: generator.generate(url, args.images))[1],
+                                  [url for url in products for _ in range(args.clients)]))
+    stats = generator.stats()
+    print_row({"case": "concurrent launches", "clients": args.clients, **latency_summary(latencies),
+               "generated": stats["generated"], "deduplicated": stats["deduplicated"]})
+
+
+if __name__ == "__main__":
+    main()
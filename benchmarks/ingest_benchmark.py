@@ -0,0 +1,124 @@
+"""
+Streaming ingestion of synthetic Meta Ads insight exports. Every simulated
+day writes one export restating the last `--window` days for every campaign
+(conversions and revenue keep being attributed for a while), so most rows are
+updates of an already stored (campaign, date) cell, as with real exports.
+Reports throughput and peak RSS, and checks the stored totals against the
+last restatement of every cell.
+
+The defaults write about 2 GB of CSV; use --campaigns/--days to scale down.
+
+    python -m benchmarks.ingest_benchmark --format csv --campaigns 3000 --days 365 --window 28
+"""
+import argparse
+import json
+import os
+import resource
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from benchmarks.common import print_row, use_scratch_dir
+from src.reporting.date_ranges import DateRange
+from src.reporting.ingest import IngestPipeline
+from src.reporting.metrics_source import FixtureMetricsSource
+from src.reporting.metrics_store import MetricsStore
+
+
+def maturity(age: np.ndarray) -> np.ndarray:
+    """Share of final conversions and revenue attributed `age` days after the day."""
+    return 1.0 - 0.5 * np.exp(-age / 3.0)
+
+
+def restated(final: np.ndarray, age: np.ndarray) -> np.ndarray:
+    """The values an export `age` days later reports for days whose final metrics are `final`."""
+    out = final.copy()
+    share = maturity(age)
+    out[..., 3] = np.floor(final[..., 3] * share)
+    out[..., 4] = np.round(final[..., 4] * share, 2)
+    return out
+
+
+def write_exports(directory: str, fmt: str, campaigns: int, days: int, window: int, end: date) -> int:
+    """Write one export per simulated day; returns bytes written."""
+    os.makedirs(directory, exist_ok=True)
+    fixture = FixtureMetricsSource()
+    campaign_ids = [str(100000 + i) for i in range(campaigns)]
+    first = end - timedelta(days=days - 1)
+    total = 0
+    for export_index in range(days):
+        export_day = first + timedelta(days=export_index)
+        lo = max(first, export_day - timedelta(days=window - 1))
+        final = fixture.daily(campaign_ids, DateRange(lo, export_day, "export"))
+        ages = np.arange((export_day - lo).days, -1, -1, dtype=np.float64)[None, :]
+        values = restated(final, ages)
+        day_texts = [(lo + timedelta(days=d)).isoformat() for d in range(final.shape[1])]
+        path = os.path.join(directory, f"insights_{export_day.isoformat()}.{fmt}")
+        with open(path, "w", encoding="utf-8") as f:
+            if fmt == "csv":
+                f.write("campaign_id,date_start,spend,impressions,clicks,conversions,revenue\n")
+                f.writelines(
+                    f"{c},{day_texts[d]},{v[0]:.2f},{v[1]:.0f},{v[2]:.0f},{v[3]:.0f},{v[4]:.2f}\n"
+                    for i, c in enumerate(campaign_ids) for d, v in enumerate(values[i])
+                )
+            else:
+                f.writelines(
+                    json.dumps({"campaign_id": c, "date_start": day_texts[d], "spend": round(v[0], 2), "impressions": int(v[1]),
+                                "clicks": int(v[2]), "conversions": int(v[3]), "revenue": round(v[4], 2)}) + "\n"
+                    for i, c in enumerate(campaign_ids) for d, v in enumerate(values[i].tolist())
+                )
+        total += os.path.getsize(path)
+    return total
+
+
+def expected_totals(campaigns: int, days: int, window: int, end: date) -> np.ndarray:
+    """Per-campaign totals of the last restatement of every (campaign, day)."""
+    first = end - timedelta(days=days - 1)
+    final = FixtureMetricsSource().daily([str(100000 + i) for i in range(campaigns)], DateRange(first, end, "all"))
+    # The last export covering day d is min(d + window - 1, end)
+    age = np.minimum(window - 1, np.arange(days - 1, -1, -1, dtype=np.float64))[None, :]
+    return restated(final, age).sum(axis=1)
+
+
+def peak_rss_mib() -> float:
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    parser.add_argument("--campaigns", type=int, default=3000)
+    parser.add_argument("--days", type=int, default=365, help="simulated days, one export file each")
+    parser.add_argument("--window", type=int, default=28, help="days restated by every export")
+    parser.add_argument("--chunk-rows", type=int, default=50_000)
+    args = parser.parse_args()
+
+    use_scratch_dir()
+    end = date.today() - timedelta(days=1)
+
+    started = time.perf_counter()
+    size = write_exports("exports", args.format, args.campaigns, args.days, args.window, end)
+    print_row({"case": "generate", "format": args.format, "files": args.days, "gib": round(size / 2**30, 2),
+               "seconds": round(time.perf_counter() - started, 1)})
+
+    rss_before = peak_rss_mib()
+    pipeline = IngestPipeline(MetricsStore("metrics_store"), chunk_rows=args.chunk_rows)
+    stats = pipeline.ingest_paths(["exports"])
+    print_row({"case": "ingest", **stats.to_dict(), "mib_per_s": round(stats.bytes_read / 2**20 / stats.seconds, 1),
+               "peak_rss_mib": peak_rss_mib(), "rss_before_mib": rss_before})
+
+    # Re-running only picks up what is new (nothing)
+    again = pipeline.ingest_paths(["exports"])
+    print_row({"case": "re-run", "rows_read": again.rows_read, "seconds": round(again.seconds, 3)})
+
+    campaign_ids = [str(100000 + i) for i in range(args.campaigns)]
+    expected = expected_totals(args.campaigns, args.days, args.window, end)
+    window = DateRange(end - timedelta(days=args.days - 1), end, "all")
+    stored_error = float(np.abs(pipeline.store.totals(campaign_ids, window) - expected).max())
+    running_error = float(np.abs(pipeline.totals(campaign_ids) - expected).max())
+    print_row({"case": "check", "store_max_abs_error": round(stored_error, 6), "running_max_abs_error": round(running_error, 6)})
+
+
+if __name__ == "__main__":
+    main()
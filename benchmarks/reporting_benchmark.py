@@ -0,0 +1,79 @@
+"""
+Reporting latency for portfolio queries: the fixture source (recomputes daily
+rows per query) against the columnar metrics store (cumulative rollups), for
+growing numbers of campaigns over 7-day to 6-month ranges. A last case
+replays a hot-campaign load (many clients repeating a few reports) with and
+without the report cache.
+
+    python -m benchmarks.reporting_benchmark --campaigns 5000 --days 180
+"""
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from benchmarks.common import latency_summary, print_row, timed, use_scratch_dir
+from src.reporting.date_ranges import DateRange
+from src.reporting.metrics_source import FixtureMetricsSource
+from src.reporting.metrics_store import MetricsStore, seed_from_fixture
+from src.reporting.report import ReportingEngine
+from src.reporting.report_cache import ReportCache
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--campaigns", type=int, default=5000, help="campaigns in the store")
+    parser.add_argument("--days", type=int, default=180, help="days of history in the store")
+    parser.add_argument("--portfolios", type=int, nargs="+", default=[1, 200, 1000, 5000], help="campaigns per query")
+    parser.add_argument("--queries", type=int, default=20, help="timed queries per case")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent clients in the hot-campaign case")
+    parser.add_argument("--hot-requests", type=int, default=2000, help="requests in the hot-campaign case")
+    args = parser.parse_args()
+
+    use_scratch_dir()
+    end = date.today() - timedelta(days=1)
+    store = MetricsStore("metrics_store")
+    started = time.perf_counter()
+    seed_from_fixture(store, args.campaigns, args.days, end=end)
+    print_row({"case": "seed", "campaigns": args.campaigns, "days": args.days,
+               "seconds": round(time.perf_counter() - started, 2), "store_mib": round(store.stats()["bytes"] / 2**20, 1)})
+
+    sources = {"fixture": ReportingEngine(FixtureMetricsSource()), "store": ReportingEngine(store)}
+    for size in args.portfolios:
+        campaign_ids = [str(100000 + i) for i in range(min(size, args.campaigns))]
+        for days in (7, 30, args.days):
+            ranges = [f"{(end - timedelta(days=days - 1)).isoformat()}..{end.isoformat()}"]
+            for name, engine in sources.items():
+                engine.report(campaign_ids, ranges)  # warm-up
+                latencies = [timed(lambda: engine.report(campaign_ids, ranges))[1] for _ in range(args.queries)]
+                print_row({"source": name, "campaigns": len(campaign_ids), "range_days": days, **latency_summary(latencies)})
+
+    # Weekly series straight from the weekly rollup
+    campaign_ids = [str(100000 + i) for i in range(min(1000, args.campaigns))]
+    window = DateRange(end - timedelta(days=args.days - 1), end, "series")
+    latencies = [timed(lambda: store.series(campaign_ids, window, "week"))[1] for _ in range(args.queries)]
+    print_row({"source": "store", "case": "weekly series", "campaigns": len(campaign_ids), "range_days": args.days, **latency_summary(latencies)})
+
+    # Hot campaigns: a few dashboards' portfolios requested over and over, skewed towards the first ones
+    rng = random.Random(0)
+    hot = [([str(100000 + rng.randrange(args.campaigns)) for _ in range(rng.choice([1, 20, 200]))], [rng.choice(["last_7d", "last_30d"])])
+           for _ in range(50)]
+    requests = [hot[min(int(rng.expovariate(0.15)), len(hot) - 1)] for _ in range(args.hot_requests)]
+    # A short TTL so that stale-while-revalidate refreshes show up in a short run
+    for name, cache in (("none", None), ("report cache", ReportCache(ttl=0.05, stale_for=5))):
+        engine = ReportingEngine(FixtureMetricsSource(), cache)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.clients) as pool:
+            latencies = list(pool.map(lambda r: timed(lambda: engine.report(*r))[1], requests))
+        elapsed = time.perf_counter() - started
+        row = {"case": "hot campaigns", "cache": name, "clients": args.clients, "requests": len(requests),
+               "req_per_s": round(len(requests) / elapsed), **latency_summary(latencies)}
+        if cache is not None:
+            stats = cache.stats()
+            row.update({k: stats[k] for k in ("hit_ratio", "hits", "stale_hits", "coalesced", "misses", "refreshes")})
+        print_row(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import hashlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def prompt_version(prompt: str) -> str:
+    """Short stable fingerprint of a system prompt, used as part of registry keys."""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+
+
+def model_key(model: Any) -> Optional[Hashable]:
+    """
+    Registry key component for a chat model, or None if the model can't be keyed.
+    Model name strings are used as-is. Model instances are keyed by identity, but
+    only if the registry handed them out: it keeps them alive, so their id can't be
+    recycled, and it already shares one instance per configuration. Anything else
+    (a model built per request, a test's scripted model) returns None, and the
+    caller builds its graph without caching it.
+    """
+    if isinstance(model, str):
+        return model
+    if not agent_registry.holds(model):
+        return None
+    name = getattr(model, "model_name", None) or getattr(model, "model", None)
+    return (type(model).__name__, name, id(model))
+
+
+def tools_key(tools: list) -> Tuple[str, ...]:
+    """Registry key component for a tool set (order-insensitive)."""
+    return tuple(sorted(getattr(t, "name", None) or repr(t) for t in tools))
+
+
+class AgentRegistry:
+    """
+    Process-wide registry of expensive, reusable objects (compiled agent graphs and
+    chat models). Each entry is built once per key and shared across Streamlit
+    sessions and threads.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Hashable, Any] = {}
+        self._entry_ids: Set[int] = set()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def _kind_stats(self, kind: str) -> Dict[str, float]:
+        if kind not in self._stats:
+            self._stats[kind] = {"hits": 0, "misses": 0, "builds": 0, "build_time_seconds": 0.0}
+        return self._stats[kind]
+
+    def get_or_build(self, kind: str, key: Hashable, builder: Callable[[], Any]) -> Any:
+        """
+        Return the entry for (kind, key), building it with `builder` on first use.
+        Concurrent callers for the same key wait for a single build instead of
+        building twice; builds for different keys run in parallel.
+        """
+        full_key = (kind, key)
+
+        with self._lock:
+            if full_key in self._entries:
+                self._kind_stats(kind)["hits"] += 1
+                return self._entries[full_key]
+            key_lock = self._key_locks.setdefault(full_key, threading.Lock())
+
+        with key_lock:
+            # Another thread may have finished building while we waited
+            with self._lock:
+                if full_key in self._entries:
+                    self._kind_stats(kind)["hits"] += 1
+                    return self._entries[full_key]
+
+            start = time.perf_counter()
+            entry = builder()
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                self._entries[full_key] = entry
+                self._entry_ids.add(id(entry))
+                self._key_locks.pop(full_key, None)
+                stats = self._kind_stats(kind)
+                stats["misses"] += 1
+                stats["builds"] += 1
+                stats["build_time_seconds"] += elapsed
+
+            logger.info(f"Built {kind} entry in {elapsed * 1000:.1f} ms (key={key})")
+            return entry
+
+    def holds(self, entry: Any) -> bool:
+        """Whether `entry` is one of the registry's entries (so its id is stable while it is registered)."""
+        with self._lock:
+            return id(entry) in self._entry_ids
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Hit/miss/build counters and cumulative build time, per kind."""
+        with self._lock:
+            result = {kind: dict(values) for kind, values in self._stats.items()}
+            for kind in result:
+                result[kind]["entries"] = sum(1 for k in self._entries if k[0] == kind)
+            return result
+
+    def clear(self) -> None:
+        """Drop all entries and counters (e.g. after changing credentials)."""
+        with self._lock:
+            self._entries.clear()
+            self._entry_ids.clear()
+            self._key_locks.clear()
+            self._stats.clear()
+
+
+# Shared process-wide instance
+agent_registry = AgentRegistry()
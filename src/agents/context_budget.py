@@ -0,0 +1,234 @@
+import json
+import logging
+import os
+import re
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+
+from src.agents.agent_registry import agent_registry
+
+logger = logging.getLogger(__name__)
+
+# Per-message framing tokens in chat completions (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_PIECE = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Offline BPE-like estimate: one token per punctuation mark, about one per 4 characters of a word."""
+    return sum(1 + (len(piece) - 1) // 4 for piece in _PIECE.findall(text))
+
+
+def get_token_counter() -> Callable[[str], int]:
+    """
+    Token counter for prompt budgeting. Uses the tiktoken encoding named by
+    TOKEN_ENCODING (e.g. o200k_base) when set and loadable, else estimate_tokens.
+    The encoding is opt-in because tiktoken downloads it on first use.
+    """
+    name = os.getenv("TOKEN_ENCODING", "")
+
+    def build() -> Callable[[str], int]:
+        if name:
+            try:
+                import tiktoken
+                encoding = tiktoken.get_encoding(name)
+                return lambda text: len(encoding.encode(text, disallowed_special=()))
+            except Exception as e:
+                logger.warning(f"Token encoding {name} unavailable, estimating token counts instead: {e}")
+        return estimate_tokens
+
+    return agent_registry.get_or_build("token_counter", name, build)
+
+
+@dataclass
+class BudgetReport:
+    """Prompt tokens of the history before and after budgeting, and what was changed to fit."""
+    tokens_before: int = 0
+    tokens_after: int = 0
+    stripped: int = 0
+    summarized: int = 0
+    dropped: int = 0
+
+    @property
+    def saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+    def summary(self) -> str:
+        return (f"{self.tokens_before} -> {self.tokens_after} tokens "
+                f"(stripped {self.stripped}, summarized {self.summarized}, dropped {self.dropped})")
+
+
+class ContextBudget:
+    """
+    Fits the supervisor history into a token budget before the agent graph runs:
+      - the last `keep_recent` messages (from a user turn on) are kept verbatim
+      - older supervisor replies are reduced from the structured JSON
+        ({"context", "response"}) to the response text, and older tool outputs
+        are truncated; the latest structured reply is always kept, since routing
+        and caching read the conversation state from it
+      - if that is still over `max_tokens`, the oldest turns are folded into a
+        short extractive summary, written in blocks of `summary_block` messages
+        counted from the start of the conversation; turns that don't fit even
+        there are dropped
+    Token counts are cached per message object, so a turn only counts new messages.
+    A summary block never changes once written, so the summarized head of the
+    prompt stays byte-stable from turn to turn for provider-side prefix caching.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 6000,
+        keep_recent: int = 12,
+        summary_tokens: int = 400,
+        tool_output_chars: int = 400,
+        summary_block: int = 4,
+        counter: Optional[Callable[[str], int]] = None,
+    ):
+        self.max_tokens = max_tokens
+        self.keep_recent = keep_recent
+        self.summary_tokens = summary_tokens
+        self.tool_output_chars = tool_output_chars
+        self.summary_block = summary_block
+        self.count_text = counter or get_token_counter()
+        self._counts: Dict[int, Tuple[weakref.ref, int]] = {}
+        self._stripped: Dict[int, Tuple[weakref.ref, Optional[BaseMessage]]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"turns": 0, "trimmed_turns": 0, "tokens_before": 0, "tokens_after": 0}
+
+    def _memo(self, cache: Dict[int, Tuple[weakref.ref, Any]], msg: BaseMessage, compute: Callable[[BaseMessage], Any]) -> Any:
+        """Per-message-object memo; entries go away with the message (history messages are cached objects)."""
+        key = id(msg)
+        cached = cache.get(key)
+        if cached is not None and cached[0]() is msg:
+            return cached[1]
+        value = compute(msg)
+        cache[key] = (weakref.ref(msg, lambda _, key=key: cache.pop(key, None)), value)
+        return value
+
+    def _count(self, msg: BaseMessage) -> int:
+        tokens = MESSAGE_OVERHEAD_TOKENS + self.count_text(msg.text)
+        for tc in getattr(msg, "tool_calls", None) or []:
+            tokens += self.count_text(json.dumps(tc.get("args", {}))) + MESSAGE_OVERHEAD_TOKENS
+        return tokens
+
+    def count(self, msg: BaseMessage) -> int:
+        return self._memo(self._counts, msg, self._count)
+
+    def _recent_start(self, messages: List[BaseMessage]) -> int:
+        start = max(0, len(messages) - self.keep_recent)
+        # Start the verbatim window on a user turn so no reply loses its question
+        while start > 0 and not isinstance(messages[start], HumanMessage):
+            start -= 1
+        return start
+
+    def _strip(self, msg: BaseMessage) -> Optional[BaseMessage]:
+        """Compact form of an older message, or None if there is nothing to strip."""
+        if isinstance(msg, AIMessage) and msg.text.startswith("{") and not msg.tool_calls:
+            try:
+                payload = json.loads(msg.text)
+            except json.JSONDecodeError:
+                return None
+            if isinstance(payload, dict) and "response" in payload:
+                return AIMessage(content=str(payload["response"]))
+        if isinstance(msg, ToolMessage) and len(msg.text) > self.tool_output_chars:
+            return msg.model_copy(update={"content": msg.text[:self.tool_output_chars] + " …[truncated]"})
+        return None
+
+    def _summarize_block(self, block: List[BaseMessage]) -> str:
+        """One line per user or assistant message; depends on nothing but the block itself."""
+        lines = []
+        for msg in block:
+            if isinstance(msg, (HumanMessage, AIMessage)) and msg.text:
+                role = "User" if isinstance(msg, HumanMessage) else "Assistant"
+                lines.append(f"- {role}: {' '.join(msg.text.split()[:24])}")
+        return "\n".join(lines)
+
+    def _summarize(self, folded: List[BaseMessage]) -> Tuple[Optional[SystemMessage], int]:
+        """
+        Summary of `folded` (whole blocks from the start of the conversation) within
+        summary_tokens; returns (summary, messages covered). Once the blocks outgrow
+        the budget the oldest are dropped in batches of as many blocks as fit, so
+        the head of the summary only changes every few blocks rather than every turn.
+        """
+        blocks = [self._summarize_block(folded[i:i + self.summary_block]) for i in range(0, len(folded), self.summary_block)]
+        fit, used = 0, 0
+        for block in reversed(blocks):
+            used += self.count_text(block) + 1
+            if used > self.summary_tokens:
+                break
+            fit += 1
+        drop = len(blocks) - fit
+        if drop:
+            # Drop in batches of what fits, aligned to the start of the conversation
+            drop = min(len(blocks), -(-drop // max(1, fit)) * max(1, fit))
+        kept = [block for block in blocks[drop:] if block]
+        if not kept:
+            return None, 0
+        text = "Summary of earlier conversation (oldest first):\n" + "\n".join(kept)
+        return SystemMessage(content=text), len(folded) - drop * self.summary_block
+
+    def apply(self, messages: List[BaseMessage]) -> Tuple[List[BaseMessage], BudgetReport]:
+        report = BudgetReport(tokens_before=sum(self.count(m) for m in messages))
+        start = self._recent_start(messages)
+        latest_structured = next((i for i in range(len(messages) - 1, -1, -1)
+                                  if isinstance(messages[i], AIMessage) and messages[i].text.startswith("{")), -1)
+
+        older = []
+        for i, msg in enumerate(messages[:start]):
+            stripped = None if i == latest_structured else self._memo(self._stripped, msg, self._strip)
+            report.stripped += stripped is not None
+            stripped = stripped or msg
+            older.append(stripped)
+        recent = messages[start:]
+
+        total = sum(self.count(m) for m in older) + sum(self.count(m) for m in recent)
+        # Fold whole blocks only, so each block covers the same messages on every turn
+        fold_end = start - start % self.summary_block
+        if total > self.max_tokens and fold_end:
+            # Blocks are summarized from the stripped messages (even the latest structured
+            # reply, which is kept as is after the summary) so they don't change later
+            folded = [self._memo(self._stripped, m, self._strip) or m for m in messages[:fold_end]]
+            summary, covered = self._summarize(folded)
+            report.summarized = covered
+            report.dropped = fold_end - covered
+            pinned = [older[latest_structured]] if 0 <= latest_structured < fold_end else []
+            older = ([summary] if summary else []) + pinned + older[fold_end:]
+
+        budgeted = older + recent
+        report.tokens_after = sum(self.count(m) for m in budgeted)
+        with self._lock:
+            self._stats["turns"] += 1
+            self._stats["trimmed_turns"] += report.saved > 0
+            self._stats["tokens_before"] += report.tokens_before
+            self._stats["tokens_after"] += report.tokens_after
+        return budgeted, report
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            before, after = self._stats["tokens_before"], self._stats["tokens_after"]
+            return {
+                **self._stats,
+                "tokens_saved": before - after,
+                "saved_ratio": round((before - after) / before, 3) if before else 0.0,
+            }
+
+
+def get_context_budget() -> Optional[ContextBudget]:
+    """
+    Shared budgeter for supervisor prompts; CONTEXT_BUDGET_TOKENS (default 6000)
+    and CONTEXT_KEEP_RECENT (messages kept verbatim, default 12). CONTEXT_BUDGET=0 disables it.
+    """
+    if os.getenv("CONTEXT_BUDGET", "1").lower() in ("0", "false", "no"):
+        return None
+    max_tokens = int(os.getenv("CONTEXT_BUDGET_TOKENS") or 6000)
+    keep_recent = int(os.getenv("CONTEXT_KEEP_RECENT") or 12)
+    return agent_registry.get_or_build(
+        "context_budget",
+        (max_tokens, keep_recent, os.getenv("TOKEN_ENCODING", "")),
+        lambda: ContextBudget(max_tokens=max_tokens, keep_recent=keep_recent),
+    )
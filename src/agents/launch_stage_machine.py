@@ -0,0 +1,113 @@
+import json
+import logging
+from typing import Any, List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+
+from src.states.launching_agent_state import LaunchingAgentState
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("CAMPAIGN_INFO", "CREATIVE", "LAUNCHING")
+# Required CAMPAIGN_INFO fields, in the order they are asked for
+CAMPAIGN_INFO_FIELDS = ("objective", "geo", "daily_budget", "start_time")
+
+FOLLOW_UP_QUESTIONS = {
+    "objective": "What is your campaign objective? (Traffic / Leads / Sales)",
+    "geo": "Which country or region should this campaign target?",
+    "daily_budget": "What is the daily budget (number only) for this campaign?",
+    "start_time": "When should the campaign start? (ISO format preferred)",
+    "creative_mode": "Do you want creatives GENERATED or USER_PROVIDED? (GENERATE / USER_PROVIDED)",
+    "product_url": "Please share the product/landing page URL to generate creatives.",
+    "creative_urls": "Please provide the creative asset URL(s) you want to use.",
+    "user_confirmation": "Please confirm if you want to proceed with launching this campaign (YES / NO).",
+}
+
+
+def pending_field(state: LaunchingAgentState) -> Optional[str]:
+    """The field the flow is currently waiting on, or None once the launch is decided by the model."""
+    for name in CAMPAIGN_INFO_FIELDS:
+        if getattr(state, name) is None:
+            return name
+    if state.creative_mode is None:
+        return "creative_mode"
+    if state.creative_mode == "GENERATE" and not state.product_url:
+        return "product_url"
+    if not state.creative_urls:
+        return "creative_urls" if state.creative_mode == "USER_PROVIDED" else None
+    if state.stage == "LAUNCHING" and state.user_confirmation is None:
+        return "user_confirmation"
+    return None
+
+
+def next_state(state: LaunchingAgentState) -> Optional[LaunchingAgentState]:
+    """
+    Advance the stage and set the follow-up question when that only depends on
+    which fields are filled. Returns None for steps that need the model: running
+    image generation, creative selection, and acting on the final confirmation.
+    """
+    name = pending_field(state)
+    if name is None:
+        return None
+    stage = "CAMPAIGN_INFO" if name in CAMPAIGN_INFO_FIELDS else "LAUNCHING" if name == "user_confirmation" else "CREATIVE"
+    return state.model_copy(update={"stage": stage, "follow_up_question": FOLLOW_UP_QUESTIONS[name]})
+
+
+def allowed_stage(state: LaunchingAgentState) -> str:
+    """Furthest stage the filled fields permit: CAMPAIGN_INFO -> CREATIVE -> LAUNCHING, never skipping one."""
+    if any(getattr(state, name) is None for name in CAMPAIGN_INFO_FIELDS):
+        return "CAMPAIGN_INFO"
+    if not state.creative_mode or not state.creative_urls or state.creative_mode == "GENERATE" and not state.product_url:
+        return "CREATIVE"
+    return "LAUNCHING"
+
+
+def enforce_transitions(proposed: LaunchingAgentState) -> LaunchingAgentState:
+    """
+    Clamp a state returned by the model to the stage order: it cannot move past
+    a stage whose required fields are missing, and it is only completed after a
+    YES confirmation in LAUNCHING. A clamped state gets the follow-up question
+    for the field that is actually missing.
+    """
+    limit = allowed_stage(proposed)
+    update = {}
+    if STAGES.index(proposed.stage) > STAGES.index(limit):
+        update["stage"] = limit
+    stage = update.get("stage", proposed.stage)
+    if proposed.state == "completed" and (stage != "LAUNCHING" or proposed.user_confirmation != "YES"):
+        update["state"] = "ongoing"
+    if not update:
+        return proposed
+
+    logger.info(f"Launch state clamped from stage={proposed.stage} state={proposed.state} to {update}")
+    clamped = proposed.model_copy(update=update)
+    name = pending_field(clamped)
+    if name is not None:
+        clamped = clamped.model_copy(update={"follow_up_question": FOLLOW_UP_QUESTIONS[name]})
+    return clamped
+
+
+def load_state(conversation: Any, agent_name: str = "LAUNCHING_AGENT") -> Optional[LaunchingAgentState]:
+    """
+    Current launch state of a conversation: the state stored with the agent's
+    latest reply that carried one (error replies don't). None when there is no
+    launch in progress: none yet, or the last one completed.
+    """
+    message = conversation.last_message(agent_name=agent_name, roles=("assistant",), with_field="formatted_output")
+    payload = (message or {}).get("formatted_output")
+    if not payload:
+        return None
+    try:
+        state = LaunchingAgentState.model_validate(json.loads(payload))
+    except ValueError:
+        return None
+    return None if state.state == "completed" else state
+
+
+def state_messages(state: Optional[LaunchingAgentState], query: str) -> List[BaseMessage]:
+    """The model input for one turn: the current state (if any) and the latest user input, nothing older."""
+    messages: List[BaseMessage] = []
+    if state is not None:
+        messages.append(AIMessage(content=state.model_dump_json()))
+    messages.append(HumanMessage(content=query))
+    return messages
@@ -1,14 +1,25 @@
 from dotenv import load_dotenv
 import logging
 import json
+import os
+import time
 
-from typing import List, Dict, Union, Any
+from typing import List, Dict, Union, Any, Optional, Tuple
 from langchain.agents import create_agent
 from langchain.agents.structured_output import ProviderStrategy
-from langchain_core.messages import BaseMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 
-from src.states.launching_agent_state import LaunchingAgentOutput
+from src.agents.agent_registry import agent_registry, model_key, prompt_version, tools_key
+from src.agents.launch_stage_machine import FOLLOW_UP_QUESTIONS, enforce_transitions, next_state, pending_field
+from src.agents.slot_extractor import Extraction, extract_slots
+from src.conversation.session import current_conversation_id
+from src.observability.prompt_cache import get_prompt_cache_tracker
+from src.observability.tracing import get_tracing_handler, span
+from src.observability.turn_log import log_turn
+from src.observability.usage import get_usage_ledger
+from src.states.launching_agent_state import LaunchingAgentOutput, LaunchingAgentState
 from src.system_prompts.launching_agent_system_prompt import get_launching_agent_system_prompt
+from src.system_prompts.prompt_prefix import freeze_prefix
 
 from src.tools.image_generation_tool import image_generation_tool
 from src.tools.launch_campaign_tool import launch_campaign_tool
@@ -17,58 +28,161 @@ load_dotenv()
 logger = logging.getLogger(__name__)
 
 class LaunchingAgent:
-    def __init__(self, model: str):
+    def __init__(self, model: str, fast_path: Optional[bool] = None):
         self.name = "Launching Agent"
         self.instructions = get_launching_agent_system_prompt()
         self.model = model
         self.tools = [image_generation_tool, launch_campaign_tool]
+        # Answer turns the stage machine can compute without the model; disable with LAUNCH_FAST_PATH=0
+        self.fast_path = fast_path if fast_path is not None else os.getenv("LAUNCH_FAST_PATH", "1").lower() not in ("0", "false", "no")
 
-        # Create the agent executable upon initialization
-        self.agent = create_agent(
+        # System prompt + tool schemas are the byte-stable head of every request;
+        # calls are tagged with its version so cached input tokens can be attributed
+        self.prompt_prefix = freeze_prefix("LAUNCHING_AGENT", self.instructions, self.tools, LaunchingAgentOutput)
+        self.run_config = {
+            "callbacks": [get_prompt_cache_tracker(), get_tracing_handler(), get_usage_ledger()],
+            "metadata": {"agent_name": "LAUNCHING_AGENT", "prompt_prefix": self.prompt_prefix.version},
+        }
+
+        # Reuse the compiled agent graph for this (model, prompt version, tool set);
+        # a model the registry didn't hand out gets a graph of its own
+        build = lambda: create_agent(
             model=self.model,
             system_prompt=self.instructions,
             tools=self.tools,
             response_format=ProviderStrategy(LaunchingAgentOutput)
         )
+        key = model_key(self.model)
+        self.agent = build() if key is None else agent_registry.get_or_build(
+            "agent", ("LAUNCHING_AGENT", key, prompt_version(self.instructions), tools_key(self.tools)), build
+        )
 
-    def invoke(self, messages: Union[List[Dict[str, str]], List[BaseMessage]]) -> Dict[str, Any]:
+    def _format_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert the agent graph output into a plain LaunchingAgentState dict."""
+        # Handle the structured_response - convert Pydantic model to dict if needed
+        if "structured_response" in response:
+            structured_response = response["structured_response"]
+            
+            # If it's a Pydantic model, convert to dict
+            if hasattr(structured_response, 'model_dump'):
+                response["structured_response"] = structured_response.model_dump()
+            elif isinstance(structured_response, str):
+                # If it's a string, try to parse as JSON
+                try:
+                    response["structured_response"] = json.loads(structured_response)
+                except json.JSONDecodeError:
+                    # If not valid JSON, wrap it in a dict
+                    response["structured_response"] = {"raw_response": structured_response}
+            elif not isinstance(structured_response, dict):
+                # If it's some other type, convert to dict
+                response["structured_response"] = dict(structured_response) if hasattr(structured_response, '__dict__') else {"raw_response": str(structured_response)}
+        
+        return response["structured_response"]
+
+    def _previous_state(self, messages: List[BaseMessage]) -> Optional[LaunchingAgentState]:
+        """The last state this agent returned (assistant messages carry the state JSON), or None on the first turn."""
+        for msg in reversed(messages):
+            if isinstance(msg, AIMessage) and msg.text.startswith("{"):
+                try:
+                    return LaunchingAgentState.model_validate_json(msg.text)
+                except ValueError:
+                    return None
+        return None
+
+    def _deterministic_turn(self, messages: Union[List[Dict[str, str]], List[BaseMessage]]) -> Tuple[Optional[Extraction], Optional[Dict[str, Any]]]:
         """
-        Invoke the agent and return properly formatted response.
-        Handles errors and ensures proper JSON serialization.
+        Extract slots from the latest user input. Returns (extraction, state), where
+        state is the next LaunchingAgentState when the model call can be skipped
+        (every value was read deterministically and the stage machine knows the
+        next follow-up question), else None.
         """
+        if not self.fast_path or not messages or not isinstance(messages[-1], HumanMessage):
+            return None, None
+
+        previous = self._previous_state(messages)
+        state = previous or LaunchingAgentState()
+        expected = pending_field(state) if previous else None
+        extraction = extract_slots(messages[-1].text, expected)
+
+        if expected in extraction.errors:
+            # Re-ask the same question with the validation error
+            retry = state.model_copy(update={"follow_up_question": f"{extraction.errors[expected]} {FOLLOW_UP_QUESTIONS[expected]}"})
+            return extraction, retry.model_dump()
+        if previous and not extraction.slots:
+            return extraction, None  # nothing recognized; let the model interpret the answer
+
+        advanced = next_state(state.model_copy(update=extraction.slots))
+        return extraction, advanced.model_dump() if advanced else None
+
+    def _prefill(self, result: Dict[str, Any], extraction: Optional[Extraction]) -> Dict[str, Any]:
+        """Fill fields the model left empty with the validated extracted values, then enforce the stage order."""
+        if not isinstance(result, dict) or result.get("error"):
+            return result
+        if extraction:
+            for name, value in extraction.slots.items():
+                if result.get(name) is None:
+                    result[name] = value
         try:
-            response = self.agent.invoke({"messages": messages})
-            
-            # Handle the structured_response - convert Pydantic model to dict if needed
-            if "structured_response" in response:
-                structured_response = response["structured_response"]
-                
-                # If it's a Pydantic model, convert to dict
-                if hasattr(structured_response, 'model_dump'):
-                    response["structured_response"] = structured_response.model_dump()
-                elif isinstance(structured_response, str):
-                    # If it's a string, try to parse as JSON
-                    try:
-                        response["structured_response"] = json.loads(structured_response)
-                    except json.JSONDecodeError:
-                        # If not valid JSON, wrap it in a dict
-                        response["structured_response"] = {"raw_response": structured_response}
-                elif not isinstance(structured_response, dict):
-                    # If it's some other type, convert to dict
-                    response["structured_response"] = dict(structured_response) if hasattr(structured_response, '__dict__') else {"raw_response": str(structured_response)}
-            
-            return response["structured_response"]
-            
-        except Exception as e:
-            logger.error(f"Error in LaunchingAgent.invoke: {e}", exc_info=True)
-            # Return error response in expected format
-            return {
+            return enforce_transitions(LaunchingAgentState.model_validate(result)).model_dump()
+        except ValueError as e:
+            logger.warning(f"Launching agent returned an invalid state: {e}")
+            return result
+
+    def _error_response(self, e: Exception) -> Dict[str, Any]:
+        # Return error response in expected format
+        return {
+            "error": True,
+            "error_message": str(e),
+            "structured_response": {
                 "error": True,
                 "error_message": str(e),
-                "structured_response": {
-                    "error": True,
-                    "error_message": str(e),
-                    "brief_summary": f"Error during launching campaign: {str(e)}"
-                }
+                "brief_summary": f"Error during launching campaign: {str(e)}"
             }
+        }
+
+    def _skip_model(self, messages: Union[List[Dict[str, str]], List[BaseMessage]], started: float) -> Tuple[Optional[Extraction], Optional[Dict[str, Any]]]:
+        """_deterministic_turn(), logging the turn when it answers without the model."""
+        extraction, state = self._deterministic_turn(messages)
+        if state is not None:
+            log_turn("LAUNCHING_AGENT", started, conversation_id=current_conversation_id(),
+                     input_messages=len(messages), model_skipped=True, slots=sorted(extraction.slots))
+        return extraction, state
+
+    def _finish(self, messages: Union[List[Dict[str, str]], List[BaseMessage]], response: Dict[str, Any],
+                extraction: Optional[Extraction], started: float) -> Dict[str, Any]:
+        """Log the turn and turn the graph output into the next state."""
+        log_turn("LAUNCHING_AGENT", started, conversation_id=current_conversation_id(),
+                 messages=response.get("messages", [])[len(messages):], input_messages=len(messages))
+        return self._prefill(self._format_response(response), extraction)
+
+    def _failed(self, e: Exception, started: float) -> Dict[str, Any]:
+        logger.error(f"Error in LaunchingAgent: {e}", exc_info=True)
+        log_turn("LAUNCHING_AGENT", started, conversation_id=current_conversation_id(), error=str(e))
+        return self._error_response(e)
+
+    def invoke(self, messages: Union[List[Dict[str, str]], List[BaseMessage]]) -> Dict[str, Any]:
+        """
+        Invoke the agent and return properly formatted response.
+        Handles errors and ensures proper JSON serialization.
+        """
+        started = time.perf_counter()
+        with span("LAUNCHING_AGENT", "agent", input_messages=len(messages)):
+            try:
+                extraction, state = self._skip_model(messages, started)
+                if state is not None:
+                    return state
+                return self._finish(messages, self.agent.invoke({"messages": messages}, config=self.run_config), extraction, started)
+            except Exception as e:
+                return self._failed(e, started)
 
+    async def ainvoke(self, messages: Union[List[Dict[str, str]], List[BaseMessage]]) -> Dict[str, Any]:
+        """Async variant of invoke(); runs the agent graph on the caller's event loop."""
+        started = time.perf_counter()
+        with span("LAUNCHING_AGENT", "agent", input_messages=len(messages)):
+            try:
+                extraction, state = self._skip_model(messages, started)
+                if state is not None:
+                    return state
+                return self._finish(messages, await self.agent.ainvoke({"messages": messages}, config=self.run_config), extraction, started)
+            except Exception as e:
+                return self._failed(e, started)
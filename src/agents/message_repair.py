@@ -0,0 +1,100 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+
+
+@dataclass
+class RepairReport:
+    """What repair_tool_messages() changed, for logging."""
+    dropped_tool_messages: List[Dict[str, Any]] = field(default_factory=list)
+    stripped_tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+    dropped_ai_messages: List[int] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.dropped_tool_messages or self.stripped_tool_calls or self.dropped_ai_messages)
+
+    def summary(self) -> str:
+        return (
+            f"dropped {len(self.dropped_tool_messages)} tool message(s), "
+            f"stripped {len(self.stripped_tool_calls)} unanswered tool call(s), "
+            f"dropped {len(self.dropped_ai_messages)} empty AI message(s)"
+        )
+
+
+def _tool_call_id(tool_call: Any) -> Optional[str]:
+    # Handle both dict and object formats
+    if isinstance(tool_call, dict):
+        return tool_call.get("id")
+    return getattr(tool_call, "id", None)
+
+
+def repair_tool_messages(messages: List[BaseMessage]) -> Tuple[List[BaseMessage], RepairReport]:
+    """
+    Make a history valid for the OpenAI API in a single pass:
+    - a ToolMessage is kept only if the most recent AIMessage has a tool call with
+      its tool_call_id that has not been answered yet;
+    - tool calls of an AIMessage that no ToolMessage answers are stripped (the API
+      rejects assistant tool calls without responses), and an AIMessage left with
+      neither content nor tool calls is dropped.
+    Open tool-call IDs are tracked in a set, so this is O(messages + tool calls).
+    """
+    report = RepairReport()
+    cleaned: List[BaseMessage] = []
+
+    open_ids: Set[str] = set()
+    answered_ids: Set[str] = set()
+    pending_ai_index: Optional[int] = None   # position in `cleaned` of the last AIMessage with tool calls
+    pending_ai_source: Optional[int] = None  # its position in `messages`
+
+    def close_pending() -> None:
+        nonlocal pending_ai_index, pending_ai_source
+        if pending_ai_index is None:
+            return
+        ai = cleaned[pending_ai_index]
+        if len(answered_ids) < len(ai.tool_calls):
+            kept = [tc for tc in ai.tool_calls if _tool_call_id(tc) in answered_ids]
+            for tc in ai.tool_calls:
+                if _tool_call_id(tc) not in answered_ids:
+                    report.stripped_tool_calls.append({"index": pending_ai_source, "tool_call_id": _tool_call_id(tc)})
+            if kept or ai.content:
+                # The raw provider tool calls in additional_kwargs would be sent otherwise
+                additional_kwargs = {k: v for k, v in ai.additional_kwargs.items() if k != "tool_calls"}
+                cleaned[pending_ai_index] = ai.model_copy(update={"tool_calls": kept, "additional_kwargs": additional_kwargs})
+            else:
+                cleaned[pending_ai_index] = None
+                report.dropped_ai_messages.append(pending_ai_source)
+        pending_ai_index = None
+        pending_ai_source = None
+
+    for i, msg in enumerate(messages):
+        if isinstance(msg, ToolMessage):
+            tool_call_id = getattr(msg, "tool_call_id", None)
+            if pending_ai_index is None:
+                report.dropped_tool_messages.append({"index": i, "tool_call_id": tool_call_id, "reason": "no preceding AIMessage with tool_calls"})
+            elif not tool_call_id or tool_call_id not in open_ids:
+                reason = "already answered" if tool_call_id in answered_ids else "unknown tool_call_id"
+                report.dropped_tool_messages.append({"index": i, "tool_call_id": tool_call_id, "reason": reason})
+            else:
+                open_ids.discard(tool_call_id)
+                answered_ids.add(tool_call_id)
+                cleaned.append(msg)
+            continue
+
+        # Any other message closes the previous tool-call group; tool messages
+        # after a human/system message have no AIMessage to answer
+        close_pending()
+
+        open_ids = set()
+        answered_ids = set()
+        tool_calls = (getattr(msg, "tool_calls", None) or []) if isinstance(msg, AIMessage) else []
+        if tool_calls:
+            open_ids = {tc_id for tc_id in map(_tool_call_id, tool_calls) if tc_id}
+            pending_ai_index = len(cleaned)
+            pending_ai_source = i
+
+        cleaned.append(msg)
+
+    close_pending()
+    return [m for m in cleaned if m is not None], report
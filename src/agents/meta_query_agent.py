@@ -1,14 +1,30 @@
 from dotenv import load_dotenv
 import logging
 import json
+import time
+import uuid
 
-from typing import List, Dict, Union, Any
+from dataclasses import dataclass, replace
+from typing import List, Dict, Union, Any, Iterator, AsyncIterator, Optional
 from langchain.agents import create_agent
 from langchain.agents.structured_output import ProviderStrategy
-from langchain_core.messages import BaseMessage, ToolMessage, AIMessage
+from langchain_core.messages import BaseMessage, ToolMessage, AIMessage, AIMessageChunk
 
+from src.agents.agent_registry import agent_registry, model_key, prompt_version, tools_key
+from src.agents.context_budget import ContextBudget, get_context_budget
+from src.agents.message_repair import repair_tool_messages
+from src.agents.pre_router import PreRouter, RouteDecision, get_pre_router
+from src.agents.response_cache import ResponseCache, get_response_cache
+from src.agents.structured_stream_parser import StructuredStreamParser
+from src.conversation.session import current_conversation_id
+from src.observability.prompt_cache import get_prompt_cache_tracker
+from src.observability.tracing import get_tracing_handler, span, traced_aiter, traced_iter
+from src.observability.turn_log import log_turn
+from src.observability.usage import get_usage_ledger
+from src.states.launching_agent_state import LaunchingAgentOutput
 from src.states.meta_query_agent_state import MetaQueryAgentOutput
 from src.system_prompts.meta_query_agent_system_prompt import get_meta_query_agent_system_prompt
+from src.system_prompts.prompt_prefix import freeze_prefix
 
 from src.tools.launching_agent_tool import launching_agent_tool
 from src.tools.reporting_agent_tool import reporting_agent_tool
@@ -16,21 +32,72 @@ from src.tools.reporting_agent_tool import reporting_agent_tool
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Graph stream modes consumed by stream()/astream()
+STREAM_MODES = ["messages", "updates", "custom", "values"]
+
+
+@dataclass
+class _Turn:
+    """One supervisor turn after the pre-model steps; see MetaQueryAgent._pre_model()."""
+    started: float
+    messages: List[BaseMessage]
+    cache_key: Any = None
+    result: Optional[Dict[str, Any]] = None
+    decision: Optional[RouteDecision] = None
+    tool_call: Optional[Dict[str, Any]] = None
+    # Output of the pre-routed call, when the model still phrases the reply
+    tool_message: Optional[ToolMessage] = None
+
+
 class MetaQueryAgent:
-    def __init__(self, model: str):
+    def __init__(
+        self,
+        model: str,
+        response_cache: Optional[ResponseCache] = None,
+        pre_router: Optional[PreRouter] = None,
+        context_budget: Optional[ContextBudget] = None,
+    ):
         self.name = "Meta Query Agent"
         self.instructions = get_meta_query_agent_system_prompt()
         self.model = model
         self.tools = [launching_agent_tool, reporting_agent_tool]
+        # Opt-in: pass a cache, or enable the shared one with RESPONSE_CACHE=1
+        self.response_cache = response_cache if response_cache is not None else get_response_cache()
+        # Obvious intents skip the supervisor LLM; disable the shared router with PRE_ROUTER=0
+        self.pre_router = pre_router if pre_router is not None else get_pre_router()
+        self._tools_by_name = {t.name: t for t in self.tools}
+        # Fits the history into a token budget before each model call; disable with CONTEXT_BUDGET=0
+        self.context_budget = context_budget if context_budget is not None else get_context_budget()
+        # Tokens and cost per conversation; conversations near their budget get a tighter history budget
+        self.usage_ledger = get_usage_ledger()
+        self.degraded_budget = self._degraded_budget() if self.usage_ledger.budget.enabled else None
 
-        # Create the agent executable upon initialization
-        self.agent = create_agent(
+        # System prompt + tool schemas are the byte-stable head of every request;
+        # calls are tagged with its version so cached input tokens can be attributed
+        self.prompt_prefix = freeze_prefix("META_QUERY_AGENT", self.instructions, self.tools, MetaQueryAgentOutput)
+        self.run_config = {
+            "callbacks": [get_prompt_cache_tracker(), get_tracing_handler(), get_usage_ledger()],
+            "metadata": {"agent_name": "META_QUERY_AGENT", "prompt_prefix": self.prompt_prefix.version},
+        }
+
+        # Reuse the compiled agent graph for this (model, prompt version, tool set);
+        # a model the registry didn't hand out gets a graph of its own
+        build = lambda: create_agent(
             model=self.model,
             system_prompt=self.instructions,
             tools=self.tools,
             response_format=ProviderStrategy(MetaQueryAgentOutput)
         )
+        key = model_key(self.model)
+        self.agent = build() if key is None else agent_registry.get_or_build(
+            "agent", ("META_QUERY_AGENT", key, prompt_version(self.instructions), tools_key(self.tools)), build
+        )
         
+    def _degraded_budget(self) -> ContextBudget:
+        """A quarter of the normal history budget, with only the last few messages kept verbatim."""
+        max_tokens = (self.context_budget.max_tokens if self.context_budget is not None else 6000) // 4
+        return agent_registry.get_or_build("context_budget", ("degraded", max_tokens), lambda: ContextBudget(max_tokens=max_tokens, keep_recent=4))
+
     def _serialize_message(self, msg) -> dict:
         if hasattr(msg, "model_dump"):
             return msg.model_dump()
@@ -55,67 +122,244 @@ class MetaQueryAgent:
     def _clean_messages(self, messages: List[BaseMessage]) -> List[BaseMessage]:
         """
         Clean messages to ensure valid structure for OpenAI API.
-        Tool messages must be preceded by an AIMessage with tool_calls.
-        Removes orphaned tool messages that don't have a valid preceding AIMessage.
+        Tool messages must answer a tool call of the AIMessage right before them, and
+        every tool call must be answered. Repairs the history in one pass and logs
+        what was dropped.
         """
-        cleaned = []
-        i = 0
-        
-        while i < len(messages):
-            msg = messages[i]
-            
-            # If it's a tool message, check if the previous message is an AIMessage with tool_calls
-            if isinstance(msg, ToolMessage):
-                # Look back to find the most recent AIMessage
-                prev_ai_idx = None
-                for j in range(i - 1, -1, -1):
-                    if isinstance(messages[j], AIMessage):
-                        prev_ai_idx = j
-                        break
-                
-                # Only include tool message if there's a preceding AIMessage with tool_calls
-                if prev_ai_idx is not None:
-                    prev_ai = messages[prev_ai_idx]
-                    # Check if the AIMessage has tool_calls
-                    tool_calls = getattr(prev_ai, 'tool_calls', None) or []
-                    if tool_calls:
-                        # Check if this tool message's tool_call_id matches one of the tool_calls
-                        tool_call_id = getattr(msg, 'tool_call_id', None) or getattr(msg, 'id', None)
-                        if tool_call_id:
-                            # Verify the tool_call_id exists in the previous AIMessage's tool_calls
-                            matching_tool_call = False
-                            for tc in tool_calls:
-                                # Handle both dict and object formats
-                                tc_id = None
-                                if isinstance(tc, dict):
-                                    tc_id = tc.get('id')
-                                elif hasattr(tc, 'id'):
-                                    tc_id = tc.id
-                                
-                                if tc_id == tool_call_id:
-                                    matching_tool_call = True
-                                    break
-                            
-                            if matching_tool_call:
-                                cleaned.append(msg)
-                            # If no match, skip this tool message (it's orphaned)
-                        else:
-                            # No tool_call_id, skip it (invalid tool message)
-                            pass
-                    else:
-                        # Previous AIMessage has no tool_calls, skip this tool message
-                        pass
-                else:
-                    # No preceding AIMessage, skip this tool message (orphaned)
-                    pass
-            else:
-                # Not a tool message, include it
-                cleaned.append(msg)
-            
-            i += 1
-        
+        cleaned, report = repair_tool_messages(messages)
+        if report.changed:
+            logger.info(f"Repaired message history: {report.summary()}")
+            logger.debug(f"Dropped tool messages: {report.dropped_tool_messages}; stripped tool calls: {report.stripped_tool_calls}")
         return cleaned
 
+    def _prepare_messages(self, messages: Union[List[Dict[str, str]], List[BaseMessage]], degraded: bool = False) -> List[BaseMessage]:
+        """
+        Convert dict messages to BaseMessage if needed, drop orphaned tool messages and fit the token budget
+        (the tighter degraded one when the conversation is close to its usage budget).
+        """
+        # Convert dict messages to BaseMessage if needed
+        if messages and isinstance(messages[0], dict):
+            from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
+            base_messages = []
+            for msg in messages:
+                role = msg.get("role", "user")
+                if role == "user":
+                    base_messages.append(HumanMessage(content=msg.get("content", "")))
+                elif role == "assistant":
+                    base_messages.append(AIMessage(content=msg.get("content", "")))
+                elif role == "tool":
+                    base_messages.append(ToolMessage(
+                        content=msg.get("content", ""),
+                        tool_call_id=msg.get("tool_call_id", "unknown"),
+                        name=msg.get("name")
+                    ))
+            messages = base_messages
+
+        # Clean messages to ensure valid structure
+        # Remove orphaned tool messages and unanswered tool calls up front
+        cleaned_messages = self._clean_messages(messages)
+
+        # Additional safety: if we still have issues, filter out all tool messages
+        # (The agent will make its own tool calls, so previous tool messages aren't strictly necessary)
+        if not cleaned_messages:
+            # If cleaning removed everything, fall back to just human/assistant messages
+            cleaned_messages = [msg for msg in messages if not isinstance(msg, ToolMessage)]
+
+        context_budget = self.degraded_budget if degraded and self.degraded_budget is not None else self.context_budget
+        if context_budget is not None:
+            cleaned_messages, report = context_budget.apply(cleaned_messages)
+            if report.saved:
+                logger.debug(f"Context budget: {report.summary()}")
+
+        return cleaned_messages
+
+    def _format_result(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn the raw agent graph output into the invoke() result shape."""
+        # Serialize ALL returned messages
+        raw_msgs = response.get("messages", []) or []
+        serializable_messages = [self._serialize_message(m) for m in raw_msgs]
+
+        # Extract tool call messages (can be multiple)
+        tool_calls = []
+        for m in serializable_messages:
+            # LangChain tool messages typically have type == "tool"
+            if (m.get("type") == "tool") or (m.get("name") in {
+                "weather_agent_tool",
+                "meta_campaign_agent_tool",
+                "brand_profile_context_tool",
+            }):
+                tool_calls.append(m)
+
+        # Handle structured_response
+        structured_response = response.get("structured_response")
+
+        if hasattr(structured_response, "model_dump"):
+            structured_response = structured_response.model_dump()
+        elif isinstance(structured_response, str):
+            try:
+                structured_response = json.loads(structured_response)
+            except Exception:
+                structured_response = {"raw_response": structured_response}
+        elif structured_response is None:
+            structured_response = {"response": "", "context": {}}
+        elif not isinstance(structured_response, dict):
+            structured_response = dict(structured_response) if hasattr(structured_response, "__dict__") else {"raw_response": str(structured_response)}
+
+        return {
+            "structured_response": structured_response,
+            "tool_calls": tool_calls,
+            "messages": serializable_messages,  # keep for debugging; remove if you want
+        }
+
+    def _log_turn(self, started: float, input_count: int, response: Optional[Dict[str, Any]] = None, error: Optional[Exception] = None, new_messages: Optional[List[BaseMessage]] = None, tools: Optional[List[str]] = None, **fields: Any) -> None:
+        """Queue a turn record (only this turn's new messages) for the background log writer."""
+        if new_messages is None:
+            new_messages = (response or {}).get("messages", [])[input_count:]
+        log_turn(
+            "META_QUERY_AGENT",
+            started,
+            conversation_id=current_conversation_id(),
+            messages=new_messages,
+            error=str(error) if error else None,
+            input_messages=input_count,
+            tools=tools if tools is not None else [tc.get("name") for m in new_messages for tc in (getattr(m, "tool_calls", None) or [])],
+            **fields,
+        )
+
+    def _cache_lookup(self, cleaned_messages: List[BaseMessage], started: float) -> tuple:
+        """Return (cache key, cached result); both None when the cache is off or the request bypasses it."""
+        if self.response_cache is None:
+            return None, None
+        key = self.response_cache.request_key(cleaned_messages)
+        cached = self.response_cache.get(key) if key else None
+        if cached is None:
+            return key, None
+        result, kind = cached
+        self._log_turn(started, len(cleaned_messages), cached=kind)
+        return key, {**result, "messages": [], "cached": kind}
+
+    def _cache_store(self, key: Any, result: Dict[str, Any], started: float) -> None:
+        if key is not None:
+            self.response_cache.put(key, result, time.perf_counter() - started)
+
+    def _pre_route(self, cleaned_messages: List[BaseMessage]) -> Optional[RouteDecision]:
+        if self.pre_router is None:
+            return None
+        decision = self.pre_router.route(cleaned_messages)
+        if decision is not None and decision.tool not in self._tools_by_name:
+            logger.warning(f"Pre-router rule {decision.rule} picked unknown tool {decision.tool}; falling back to the LLM")
+            return None
+        return decision
+
+    def _routed_call(self, decision: RouteDecision) -> Dict[str, Any]:
+        return {"name": decision.tool, "args": decision.args, "id": f"call_{uuid.uuid4().hex[:24]}", "type": "tool_call"}
+
+    def _routed_result(self, decision: RouteDecision, tool_message: ToolMessage, started: float, input_count: int) -> Dict[str, Any]:
+        """Result for a pre-routed turn: the tool output is relayed as the supervisor response."""
+        self._log_turn(started, input_count, new_messages=[tool_message], tools=[decision.tool], routed=decision.rule)
+        return {
+            "structured_response": {
+                "context": f"mode={decision.mode} | stage=pre_routed | tool={decision.tool} | rule={decision.rule}",
+                "response": tool_message.text,
+            },
+            "tool_calls": [self._serialize_message(tool_message)],
+            "messages": [],
+            "routed": decision.rule,
+        }
+
+    def _budget_status(self) -> str:
+        return self.usage_ledger.budget_status(current_conversation_id())
+
+    def _budget_result(self, started: float, input_count: int) -> Dict[str, Any]:
+        """Result for a turn rejected because the conversation used up its budget; the supervisor model is not called."""
+        usage = self.usage_ledger.conversation_usage(current_conversation_id())
+        self.usage_ledger.record_rejection()
+        self._log_turn(started, input_count, new_messages=[], tools=[], budget="exhausted")
+        return {
+            "structured_response": {
+                "context": "mode=clarify | stage=budget_exhausted",
+                "response": (f"This conversation has reached its usage budget ({usage.tokens} tokens, ${usage.cost_usd:.4f}). "
+                             "Campaign reports and launch confirmations still work here; please start a new conversation for anything else."),
+            },
+            "tool_calls": [],
+            "messages": [],
+            "budget": "exhausted",
+        }
+
+    def _pre_model(self, messages: Union[List[Dict[str, str]], List[BaseMessage]], started: float) -> _Turn:
+        """
+        Everything before the supervisor model: usage budget, history preparation,
+        response cache and pre-router. The returned turn carries a finished result
+        (cache hit, budget exhausted), a pre-routed tool call to run, or neither,
+        in which case the model is called.
+        """
+        budget = self._budget_status()
+        cleaned_messages = self._prepare_messages(messages, degraded=budget == "degraded")
+        cache_key, cached = self._cache_lookup(cleaned_messages, started)
+        turn = _Turn(started, cleaned_messages, cache_key, result=cached)
+        if cached is not None:
+            return turn
+
+        turn.decision = self._pre_route(cleaned_messages)
+        if turn.decision is not None:
+            if budget == "exhausted" and turn.decision.summarize:
+                # Out of budget: relay the tool output rather than calling the model
+                turn.decision = replace(turn.decision, summarize=False)
+            turn.tool_call = self._routed_call(turn.decision)
+        elif budget == "exhausted":
+            turn.result = self._budget_result(started, len(cleaned_messages))
+        return turn
+
+    def _after_routed_call(self, turn: _Turn, tool_message: ToolMessage) -> Optional[Dict[str, Any]]:
+        """The finished result when the pre-routed tool output is the reply; None when the model still has to phrase it."""
+        if turn.decision.summarize:
+            turn.tool_message = tool_message
+            return None
+        return self._finish(turn, tool_message=tool_message)
+
+    def _model_input(self, turn: _Turn) -> Dict[str, Any]:
+        """Graph input: the history, followed by the pre-routed call and its output when there is one."""
+        messages = turn.messages
+        if turn.tool_message is not None:
+            messages = messages + [AIMessage(content="", tool_calls=[turn.tool_call]), turn.tool_message]
+        return {"messages": messages}
+
+    def _finish(self, turn: _Turn, response: Optional[Dict[str, Any]] = None, tool_message: Optional[ToolMessage] = None) -> Dict[str, Any]:
+        """Log the turn and build its result from the graph output (or the pre-routed tool output), then cache it."""
+        if tool_message is not None:
+            result = self._routed_result(turn.decision, tool_message, turn.started, len(turn.messages))
+        elif turn.decision is not None:
+            self._log_turn(turn.started, len(turn.messages), response=response, routed=turn.decision.rule)
+            result = {**self._format_result(response or {}), "routed": turn.decision.rule}
+        else:
+            self._log_turn(turn.started, len(turn.messages), response=response)
+            result = self._format_result(response or {})
+        self._cache_store(turn.cache_key, result, turn.started)
+        return result
+
+    def _tool_event(self, turn: _Turn, tool_message: Optional[ToolMessage] = None) -> Dict[str, Any]:
+        """tool_start (or tool_end, given the tool output) event for a pre-routed call."""
+        event = {"name": turn.decision.tool, "tool_call_id": turn.tool_call["id"]}
+        if tool_message is None:
+            return {"type": "tool_start", **event, "args": turn.decision.args}
+        return {"type": "tool_end", **event, "status": getattr(tool_message, "status", "success")}
+
+    def _reply_events(self, result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Events closing a turn that did not stream from the model: the whole response as one token, then final."""
+        return [{"type": "token", "text": result["structured_response"].get("response", "")}, {"type": "final", "result": result}]
+
+    def _error_result(self, e: Exception) -> Dict[str, Any]:
+        return {
+            "structured_response": {
+                "context": {"stage": "error"},
+                "response": f"Error during master agent: {str(e)}"
+            },
+            "tool_calls": [],
+            "messages": [],
+            "error": True,
+            "error_message": str(e),
+        }
+
     def invoke(self, messages: Union[List[Dict[str, str]], List[BaseMessage]]) -> Dict[str, Any]:
         """
         Returns:
@@ -125,103 +369,167 @@ class MetaQueryAgent:
           "messages": [<all message dicts>...]   # optional but useful
         }
         """
-        try:
-            # Convert dict messages to BaseMessage if needed
-            if messages and isinstance(messages[0], dict):
-                from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
-                base_messages = []
-                for msg in messages:
-                    role = msg.get("role", "user")
-                    if role == "user":
-                        base_messages.append(HumanMessage(content=msg.get("content", "")))
-                    elif role == "assistant":
-                        base_messages.append(AIMessage(content=msg.get("content", "")))
-                    elif role == "tool":
-                        base_messages.append(ToolMessage(
-                            content=msg.get("content", ""),
-                            tool_call_id=msg.get("tool_call_id", "unknown"),
-                            name=msg.get("name")
-                        ))
-                messages = base_messages
-            
-            # Clean messages to ensure valid structure
-            # Remove orphaned tool messages that don't have a valid preceding AIMessage with tool_calls
-            cleaned_messages = self._clean_messages(messages)
-            
-            # Additional safety: if we still have issues, filter out all tool messages
-            # (The agent will make its own tool calls, so previous tool messages aren't strictly necessary)
-            if not cleaned_messages:
-                # If cleaning removed everything, fall back to just human/assistant messages
-                cleaned_messages = [msg for msg in messages if not isinstance(msg, ToolMessage)]
-            
-            # Try to invoke with cleaned messages, with fallback to removing all tool messages
+        started = time.perf_counter()
+        with span("META_QUERY_AGENT", "agent", input_messages=len(messages)):
             try:
-                response = self.agent.invoke({"messages": cleaned_messages})
-            except Exception as invoke_error:
-                # If there's still an error about tool messages, remove all tool messages and retry
-                if "tool" in str(invoke_error).lower() and "tool_calls" in str(invoke_error).lower():
-                    logger.warning(f"Tool message error detected, retrying without tool messages: {invoke_error}")
-                    # Remove all tool messages as a last resort
-                    cleaned_messages = [msg for msg in cleaned_messages if not isinstance(msg, ToolMessage)]
-                    response = self.agent.invoke({"messages": cleaned_messages})
-                else:
-                    # Re-raise if it's a different error
-                    raise
-
-            # Serialize ALL returned messages
-            raw_msgs = response.get("messages", []) or []
-            serializable_messages = [self._serialize_message(m) for m in raw_msgs]
-
-            # Extract tool call messages (can be multiple)
-            tool_calls = []
-            for m in serializable_messages:
-                # LangChain tool messages typically have type == "tool"
-                if (m.get("type") == "tool") or (m.get("name") in {
-                    "weather_agent_tool",
-                    "meta_campaign_agent_tool",
-                    "brand_profile_context_tool",
-                }):
-                    tool_calls.append(m)
-
-            # Handle structured_response
-            structured_response = response.get("structured_response")
-
-            if hasattr(structured_response, "model_dump"):
-                structured_response = structured_response.model_dump()
-            elif isinstance(structured_response, str):
-                import json
-                try:
-                    structured_response = json.loads(structured_response)
-                except Exception:
-                    structured_response = {"raw_response": structured_response}
-            elif structured_response is None:
-                structured_response = {"response": "", "context": {}}
-            elif not isinstance(structured_response, dict):
-                structured_response = dict(structured_response) if hasattr(structured_response, "__dict__") else {"raw_response": str(structured_response)}
-
-            # (Optional) log messages to file
-            import os, json
-            os.makedirs("logs", exist_ok=True)
-            with open("logs/messages.json", "w") as f:
-                json.dump(serializable_messages, f, indent=2)
-
-            return {
-                "structured_response": structured_response,
-                "tool_calls": tool_calls,
-                "messages": serializable_messages,  # keep for debugging; remove if you want
-            }
+                turn = self._pre_model(messages, started)
+                if turn.result is not None:
+                    return turn.result
+                if turn.decision is not None:
+                    result = self._after_routed_call(turn, self._tools_by_name[turn.decision.tool].invoke(turn.tool_call))
+                    if result is not None:
+                        return result
+                return self._finish(turn, response=self.agent.invoke(self._model_input(turn), config=self.run_config))
+
+            except Exception as e:
+                logger.error(f"Error in MasterAgent.invoke: {e}", exc_info=True)
+                self._log_turn(started, 0, error=e)
+                return self._error_result(e)
+
+    async def ainvoke(self, messages: Union[List[Dict[str, str]], List[BaseMessage]]) -> Dict[str, Any]:
+        """
+        Async variant of invoke(), returning the same result shape.
+        Lets a single event loop serve many concurrent conversations.
+        """
+        started = time.perf_counter()
+        with span("META_QUERY_AGENT", "agent", input_messages=len(messages)):
+            try:
+                turn = self._pre_model(messages, started)
+                if turn.result is not None:
+                    return turn.result
+                if turn.decision is not None:
+                    result = self._after_routed_call(turn, await self._tools_by_name[turn.decision.tool].ainvoke(turn.tool_call))
+                    if result is not None:
+                        return result
+                return self._finish(turn, response=await self.agent.ainvoke(self._model_input(turn), config=self.run_config))
+
+            except Exception as e:
+                logger.error(f"Error in MasterAgent.ainvoke: {e}", exc_info=True)
+                self._log_turn(started, 0, error=e)
+                return self._error_result(e)
+
+    def _stream_events(self, namespace: tuple, mode: str, chunk: Any, parsers: Dict[str, StructuredStreamParser]) -> List[Dict[str, Any]]:
+        """
+        Translate one (namespace, mode, chunk) item from the agent graph stream into UI events.
+        A non-empty namespace means the item comes from a sub-agent graph running inside a tool.
+        """
+        events = []
+
+        if mode == "messages":
+            message_chunk, metadata = chunk
+            text = message_chunk.text if isinstance(message_chunk, AIMessageChunk) else ""
+            if not text:
+                return events
+
+            if not namespace and metadata.get("langgraph_node") == "model":
+                # Supervisor tokens: MetaQueryAgentResponse, streamed field by field
+                parser = parsers.setdefault(message_chunk.id, StructuredStreamParser(MetaQueryAgentOutput))
+                for parsed in parser.feed(text):
+                    if parsed["type"] == "delta" and parsed["field"] == "response":
+                        events.append({"type": "token", "text": parsed["text"]})
+                    elif parsed["type"] == "field":
+                        events.append({"type": "field", "agent_name": "META_QUERY_AGENT", "field": parsed["field"], "value": parsed["value"]})
+            elif namespace:
+                # Tokens produced by the launching sub-agent running inside a tool call
+                events.append({"type": "sub_agent_progress", "node": metadata.get("langgraph_node"), "chars": len(text)})
+                parser = parsers.setdefault(message_chunk.id, StructuredStreamParser(LaunchingAgentOutput))
+                for parsed in parser.feed(text):
+                    if parsed["type"] == "field":
+                        events.append({"type": "sub_agent_field", "agent_name": "LAUNCHING_AGENT", "field": parsed["field"], "value": parsed["value"]})
+
+        elif mode == "updates" and not namespace:
+            for node, update in (chunk or {}).items():
+                for m in (update or {}).get("messages", []) if isinstance(update, dict) else []:
+                    if isinstance(m, AIMessage) and m.tool_calls:
+                        for tc in m.tool_calls:
+                            events.append({"type": "tool_start", "name": tc.get("name"), "tool_call_id": tc.get("id"), "args": tc.get("args", {})})
+                    elif isinstance(m, ToolMessage):
+                        events.append({"type": "tool_end", "name": m.name, "tool_call_id": m.tool_call_id, "status": getattr(m, "status", "success")})
+
+        elif mode == "custom":
+            # Progress events written by tools via langgraph's stream writer
+            if isinstance(chunk, dict):
+                events.append({"type": "sub_agent", **chunk})
+
+        return events
+
+    def stream(self, messages: Union[List[Dict[str, str]], List[BaseMessage]]) -> Iterator[Dict[str, Any]]:
+        """
+        Stream incremental events while the supervisor runs:
+          {"type": "token", "text": ...}            # next characters of the `response` field
+          {"type": "field", "field": ..., "value": ...}  # a validated MetaQueryAgentResponse field
+          {"type": "tool_start" | "tool_end", ...}  # tool call lifecycle
+          {"type": "sub_agent" | "sub_agent_progress" | "sub_agent_field", ...}
+          {"type": "final", "result": <same shape as invoke()>}
+        The agent span is current only while the turn runs, not while the caller holds an event.
+        """
+        return traced_iter(span("META_QUERY_AGENT", "agent", input_messages=len(messages)), self._stream(messages))
+
+    def astream(self, messages: Union[List[Dict[str, str]], List[BaseMessage]]) -> AsyncIterator[Dict[str, Any]]:
+        """Async variant of stream(), yielding the same events."""
+        return traced_aiter(span("META_QUERY_AGENT", "agent", input_messages=len(messages)), self._astream(messages))
+
+    def _stream(self, messages: Union[List[Dict[str, str]], List[BaseMessage]]) -> Iterator[Dict[str, Any]]:
+        started = time.perf_counter()
+        try:
+            turn = self._pre_model(messages, started)
+            if turn.result is not None:
+                yield from self._reply_events(turn.result)
+                return
+            if turn.decision is not None:
+                yield self._tool_event(turn)
+                tool_message = self._tools_by_name[turn.decision.tool].invoke(turn.tool_call)
+                yield self._tool_event(turn, tool_message)
+                result = self._after_routed_call(turn, tool_message)
+                if result is not None:
+                    yield from self._reply_events(result)
+                    return
+
+            parsers: Dict[str, StructuredStreamParser] = {}
+            final_state = None
+            for namespace, mode, chunk in self.agent.stream(self._model_input(turn), config=self.run_config, stream_mode=STREAM_MODES, subgraphs=True):
+                if mode == "values":
+                    if not namespace:
+                        final_state = chunk
+                    continue
+                yield from self._stream_events(namespace, mode, chunk, parsers)
+            yield {"type": "final", "result": self._finish(turn, response=final_state)}
 
         except Exception as e:
-            logger.error(f"Error in MasterAgent.invoke: {e}", exc_info=True)
-            return {
-                "structured_response": {
-                    "context": {"stage": "error"},
-                    "response": f"Error during master agent: {str(e)}"
-                },
-                "tool_calls": [],
-                "messages": [],
-                "error": True,
-                "error_message": str(e),
-            }
+            logger.error(f"Error in MasterAgent.stream: {e}", exc_info=True)
+            self._log_turn(started, 0, error=e)
+            yield {"type": "final", "result": self._error_result(e)}
+
+    async def _astream(self, messages: Union[List[Dict[str, str]], List[BaseMessage]]) -> AsyncIterator[Dict[str, Any]]:
+        started = time.perf_counter()
+        try:
+            turn = self._pre_model(messages, started)
+            if turn.result is not None:
+                for event in self._reply_events(turn.result):
+                    yield event
+                return
+            if turn.decision is not None:
+                yield self._tool_event(turn)
+                tool_message = await self._tools_by_name[turn.decision.tool].ainvoke(turn.tool_call)
+                yield self._tool_event(turn, tool_message)
+                result = self._after_routed_call(turn, tool_message)
+                if result is not None:
+                    for event in self._reply_events(result):
+                        yield event
+                    return
 
+            parsers: Dict[str, StructuredStreamParser] = {}
+            final_state = None
+            async for namespace, mode, chunk in self.agent.astream(self._model_input(turn), config=self.run_config, stream_mode=STREAM_MODES, subgraphs=True):
+                if mode == "values":
+                    if not namespace:
+                        final_state = chunk
+                    continue
+                for event in self._stream_events(namespace, mode, chunk, parsers):
+                    yield event
+            yield {"type": "final", "result": self._finish(turn, response=final_state)}
 
+        except Exception as e:
+            logger.error(f"Error in MasterAgent.astream: {e}", exc_info=True)
+            self._log_turn(started, 0, error=e)
+            yield {"type": "final", "result": self._error_result(e)}
@@ -0,0 +1,168 @@
+import json
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+
+from src.agents.agent_registry import agent_registry
+from src.reporting.date_ranges import DATE_RANGE_IN_TEXT, MONTH_YEAR_IN_TEXT, find_date_ranges, unparsed_period_phrases
+
+logger = logging.getLogger(__name__)
+
+LAUNCH_KEYWORDS = re.compile(r"\b(launch|create (?:a )?(?:new )?campaign|start ads|set ?up (?:a )?campaign|run ads|campaign setup)\b", re.I)
+REPORT_KEYWORDS = re.compile(r"\b(report|reporting|performance|results|analytics|stats|insights|spend|ctr|roas|conversions|breakdown)\b", re.I)
+# Campaign IDs only where they are named as such: "campaign 123", "campaigns 123, 456 and 789", "campaign id #123"
+CAMPAIGN_IDS = re.compile(
+    r"\bcampaign(?:s|[ _]ids?)?\s*(?:#|no\.?|number)?\s*[:=]?\s*(\d{3,}(?:\s*(?:,|&|/|and|or)\s*(?:#\s*)?\d{3,})*)\b",
+    re.I,
+)
+CAMPAIGN_ID = re.compile(r"\d{3,}")
+QUESTION = re.compile(r"\?\s*$|^\s*(?:how|what|why|when|where|which|who|did|do|does|can|could|should|would|will|is|are|was|were)\b", re.I)
+CONFIRMATION = re.compile(r"^\s*(yes|no|y|n)\s*[.!]*\s*$", re.I)
+
+
+@dataclass
+class RouteDecision:
+    """A tool call decided without the supervisor LLM."""
+    rule: str
+    tool: str
+    args: Dict[str, Any]
+    mode: str = ""
+    # Let the supervisor model phrase the reply from the tool output (one model call
+    # instead of two); otherwise the tool output is the reply
+    summarize: bool = False
+
+
+# A rule looks at the trailing user text and the previous supervisor reply
+# (its structured JSON, {} if none) and returns a decision, or None if unsure.
+Rule = Callable[[str, Dict[str, Any]], Optional[RouteDecision]]
+
+
+def previous_reply(messages: List[BaseMessage]) -> Dict[str, Any]:
+    """The last structured (JSON) supervisor reply before the trailing user turn, or {}."""
+    for msg in reversed(messages[:-1]):
+        if isinstance(msg, AIMessage) and msg.text.startswith("{"):
+            try:
+                reply = json.loads(msg.text)
+            except json.JSONDecodeError:
+                return {}
+            return reply if isinstance(reply, dict) else {}
+    return {}
+
+
+def launch_in_progress(reply: Dict[str, Any]) -> bool:
+    context = str(reply.get("context", ""))
+    return context.startswith("mode=launch") and "launch successfully" not in str(reply.get("response", ""))
+
+
+def launch_confirmation_rule(text: str, reply: Dict[str, Any]) -> Optional[RouteDecision]:
+    """YES/NO while a launch is waiting for input goes straight back to the launching agent."""
+    match = CONFIRMATION.match(text)
+    if match and launch_in_progress(reply):
+        answer = "YES" if match.group(1).lower().startswith("y") else "NO"
+        return RouteDecision("launch_confirmation", "launching_agent_tool", {"query": answer}, "launch")
+    return None
+
+
+def explicit_launch_rule(text: str, reply: Dict[str, Any]) -> Optional[RouteDecision]:
+    """An explicit launch request that doesn't also ask for reporting. Questions ("how do I launch?") go to the LLM."""
+    if LAUNCH_KEYWORDS.search(text) and not REPORT_KEYWORDS.search(text) and not QUESTION.search(text):
+        return RouteDecision("explicit_launch", "launching_agent_tool", {"query": text}, "launch")
+    return None
+
+
+def campaign_report_rule(text: str, reply: Dict[str, Any]) -> Optional[RouteDecision]:
+    """
+    A reporting request naming one or more campaign IDs ("campaign 123"), outside
+    of a launch; all of them go in one tool call. Any other number left in the
+    text ("top 100", "budget of 5000", "in 2025") may change the question, so
+    those requests go to the LLM.
+    """
+    if launch_in_progress(reply) or LAUNCH_KEYWORDS.search(text) or not REPORT_KEYWORDS.search(text):
+        return None
+    # A period the range parser doesn't understand ("last quarter", "past 30 days",
+    # "march") would silently become the default range; leave it to the LLM
+    if unparsed_period_phrases(text):
+        return None
+    date_ranges = find_date_ranges(text)
+    # Digits inside date specs (2025-01-31, last 120 days, march 2025) are not campaign IDs
+    remainder = MONTH_YEAR_IN_TEXT.sub(" ", DATE_RANGE_IN_TEXT.sub(" ", text))
+    campaign_ids = list(dict.fromkeys(i for ids in CAMPAIGN_IDS.findall(remainder) for i in CAMPAIGN_ID.findall(ids)))
+    if not campaign_ids or re.search(r"\d", CAMPAIGN_IDS.sub(" ", remainder)):
+        return None
+    args: Dict[str, Any] = {"campaign_ids": campaign_ids}
+    if date_ranges:
+        args["date_ranges"] = date_ranges
+    return RouteDecision("campaign_report", "reporting_agent_tool", args, "reporting", summarize=True)
+
+
+DEFAULT_RULES: List[Tuple[str, Rule]] = [
+    ("launch_confirmation", launch_confirmation_rule),
+    ("explicit_launch", explicit_launch_rule),
+    ("campaign_report", campaign_report_rule),
+]
+
+
+class PreRouter:
+    """
+    Ordered list of cheap routing rules tried before the supervisor LLM. The first
+    rule returning a RouteDecision wins; if none does, the turn falls back to the
+    LLM. Rules can be added or replaced with register().
+    """
+
+    def __init__(self, rules: Optional[List[Tuple[str, Rule]]] = None):
+        self._rules: List[Tuple[str, Rule]] = list(DEFAULT_RULES if rules is None else rules)
+        self._lock = threading.Lock()
+        self._hits: Dict[str, int] = {name: 0 for name, _ in self._rules}
+        self._fallbacks = 0
+
+    def register(self, name: str, rule: Rule, before: Optional[str] = None) -> None:
+        """Add (or replace) a rule, at the end or before the rule named `before`."""
+        with self._lock:
+            self._rules = [(n, r) for n, r in self._rules if n != name]
+            position = next((i for i, (n, _) in enumerate(self._rules) if n == before), len(self._rules))
+            self._rules.insert(position, (name, rule))
+            self._hits.setdefault(name, 0)
+
+    def route(self, messages: List[BaseMessage]) -> Optional[RouteDecision]:
+        if not messages or not isinstance(messages[-1], HumanMessage):
+            return None
+        text = messages[-1].text.strip()
+        reply = previous_reply(messages)
+
+        for name, rule in self._rules:
+            try:
+                decision = rule(text, reply)
+            except Exception as e:
+                logger.warning(f"Pre-router rule {name} failed: {e}")
+                continue
+            if decision is not None:
+                with self._lock:
+                    self._hits[name] = self._hits.get(name, 0) + 1
+                return decision
+
+        with self._lock:
+            self._fallbacks += 1
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            routed = sum(self._hits.values())
+            total = routed + self._fallbacks
+            return {
+                "rules": dict(self._hits),
+                "routed": routed,
+                "fallbacks": self._fallbacks,
+                "routed_ratio": round(routed / total, 3) if total else 0.0,
+            }
+
+
+def get_pre_router() -> Optional[PreRouter]:
+    """Shared pre-router with the default rules; disable with PRE_ROUTER=0."""
+    if os.getenv("PRE_ROUTER", "1").lower() in ("0", "false", "no"):
+        return None
+    return agent_registry.get_or_build("pre_router", "default", PreRouter)
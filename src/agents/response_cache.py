@@ -0,0 +1,227 @@
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from langchain_core.messages import BaseMessage, HumanMessage
+
+from src.agents.agent_registry import agent_registry
+from src.agents.pre_router import previous_reply
+from src.reporting.date_ranges import find_date_ranges, period_phrases
+
+logger = logging.getLogger(__name__)
+
+# Tools whose results can be replayed for an equivalent question. The launching
+# tool drives a per-conversation state machine, so its turns are never cached.
+CACHEABLE_TOOLS = frozenset({"reporting_agent_tool"})
+
+_WORD = re.compile(r"[a-z0-9]+")
+_NUMBER = re.compile(r"\d+")
+# Words a rephrasing may add, drop or swap without changing the question. Any
+# other differing word ("excluding" vs "including", "not", "top", "ctr") can
+# change the answer, so a similar match must not differ in one.
+FILLER_WORDS = frozenset({
+    "a", "an", "the", "me", "my", "our", "please", "pls", "can", "could", "would", "you", "i", "we",
+    "like", "want", "to", "show", "give", "get", "see", "tell", "let", "know", "what", "whats",
+    "is", "are", "was", "were", "how", "did", "do", "does", "for", "of", "on", "in", "over", "during", "and",
+})
+
+
+def normalize_query(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return " ".join(_WORD.findall(text.lower()))
+
+
+def _trigrams(text: str) -> Counter:
+    padded = f"  {text} "
+    return Counter(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _cosine(a: Counter, b: Counter, norm_a: float, norm_b: float) -> float:
+    if not norm_a or not norm_b:
+        return 0.0
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(count * b.get(gram, 0) for gram, count in a.items()) / (norm_a * norm_b)
+
+
+def _content_words(query: str) -> FrozenSet[str]:
+    return frozenset(query.split()) - FILLER_WORDS
+
+
+@dataclass
+class _Entry:
+    query: str
+    words: FrozenSet[str]
+    grams: Counter
+    norm: float
+    result: Dict[str, Any]
+    latency: float
+    size: int
+    created_at: float = field(default_factory=time.monotonic)
+
+
+class ResponseCache:
+    """
+    Cache of supervisor turn results keyed by the normalized trailing user turn
+    plus the conversation state it was asked in (the previous supervisor
+    `context`). Lookups try an exact match first, then the most similar cached
+    question in the same state bucket by character-trigram cosine similarity,
+    among those with the same words apart from FILLER_WORDS (so "excluding
+    weekends" never matches "including weekends"). Numbers (campaign IDs,
+    amounts) and period mentions ("last month", "last week") are part of the
+    bucket, so "campaign 12" never matches "campaign 13" and "last month"
+    never matches "last week". Only turns that called a cacheable tool are
+    stored: other replies depend on the conversation they were given in. Entries expire after `ttl`
+    seconds and the least recently used ones are evicted to stay within
+    `max_bytes`.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_bytes: int = 8 * 1024 * 1024, similarity: float = 0.9):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.similarity = similarity
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, FrozenSet[str], str], _Entry]" = OrderedDict()
+        self._buckets: Dict[Tuple[str, FrozenSet[str]], Dict[str, _Entry]] = {}
+        self._bytes = 0
+        self._stats = {
+            "exact_hits": 0, "similar_hits": 0, "misses": 0, "stores": 0,
+            "skipped": 0, "expired": 0, "evicted": 0, "saved_seconds": 0.0,
+        }
+
+    @staticmethod
+    def request_key(messages: List[BaseMessage]) -> Optional[Tuple[str, FrozenSet[str], str]]:
+        """
+        (state, numbers and periods, normalized query) for a supervisor request, or
+        None when the request should bypass the cache (no trailing user turn, or a
+        launch in progress).
+        """
+        if not messages or not isinstance(messages[-1], HumanMessage):
+            return None
+        query = normalize_query(messages[-1].text)
+        if not query:
+            return None
+
+        # Only the mode/stage part of the previous context identifies the state
+        state = str(previous_reply(messages).get("context", ""))
+        state = " | ".join(state.split(" | ")[:2])
+        if state.startswith("mode=launch"):
+            return None
+        # Periods are read from the raw text: normalizing turns last_7d or 2025-01-01 into loose words
+        text = messages[-1].text
+        periods = {spec.lower() for spec in find_date_ranges(text)} | set(period_phrases(text))
+        return state, frozenset(_NUMBER.findall(query)) | frozenset(periods), query
+
+    def get(self, key: Tuple[str, FrozenSet[str], str]) -> Optional[Tuple[Dict[str, Any], str]]:
+        """Cached result and match kind ("exact" / "similar"), or None."""
+        state, numbers, query = key
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            kind = "exact"
+            if entry is None:
+                grams = _trigrams(query)
+                norm = math.sqrt(sum(c * c for c in grams.values()))
+                words = _content_words(query)
+                best, best_score = None, self.similarity
+                for candidate in self._buckets.get((state, numbers), {}).values():
+                    if candidate.words != words:
+                        continue
+                    score = _cosine(grams, candidate.grams, norm, candidate.norm)
+                    if score >= best_score:
+                        best, best_score = candidate, score
+                entry, kind = best, "similar"
+
+            if entry is not None and now - entry.created_at > self.ttl:
+                self._remove((state, numbers, entry.query))
+                self._stats["expired"] += 1
+                entry = None
+
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end((state, numbers, entry.query))
+            self._stats[f"{kind}_hits"] += 1
+            self._stats["saved_seconds"] += entry.latency
+            return entry.result, kind
+
+    def put(self, key: Tuple[str, FrozenSet[str], str], result: Dict[str, Any], latency: float) -> bool:
+        """Store a turn result if it is cacheable; returns whether it was stored."""
+        tools = {t.get("name") for t in result.get("tool_calls", [])}
+        if result.get("error") or not tools or not tools <= CACHEABLE_TOOLS:
+            with self._lock:
+                self._stats["skipped"] += 1
+            return False
+
+        # Only what the caller needs to render and record the turn
+        cached = {"structured_response": result.get("structured_response"), "tool_calls": result.get("tool_calls", [])}
+        size = len(json.dumps(cached, ensure_ascii=False, default=str)) + len(key[2]) * 4
+        if size > self.max_bytes:
+            return False
+
+        state, numbers, query = key
+        grams = _trigrams(query)
+        entry = _Entry(query, _content_words(query), grams, math.sqrt(sum(c * c for c in grams.values())), cached, latency, size)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._buckets.setdefault((state, numbers), {})[query] = entry
+            self._bytes += size
+            self._stats["stores"] += 1
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats["evicted"] += 1
+        return True
+
+    def _remove(self, key: Tuple[str, FrozenSet[str], str]) -> None:
+        entry = self._entries.pop(key)
+        bucket = self._buckets.get(key[:2], {})
+        bucket.pop(key[2], None)
+        if not bucket:
+            self._buckets.pop(key[:2], None)
+        self._bytes -= entry.size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self._stats["exact_hits"] + self._stats["similar_hits"]
+            lookups = hits + self._stats["misses"]
+            return {
+                **self._stats,
+                "saved_seconds": round(self._stats["saved_seconds"], 3),
+                "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Shared cache when enabled with RESPONSE_CACHE=1 (opt-in); tuned with
+    RESPONSE_CACHE_TTL (seconds), RESPONSE_CACHE_MAX_BYTES and RESPONSE_CACHE_SIMILARITY (0-1).
+    """
+    if os.getenv("RESPONSE_CACHE", "").lower() not in ("1", "true", "yes"):
+        return None
+    ttl = float(os.getenv("RESPONSE_CACHE_TTL") or 300)
+    max_bytes = int(os.getenv("RESPONSE_CACHE_MAX_BYTES") or 8 * 1024 * 1024)
+    similarity = float(os.getenv("RESPONSE_CACHE_SIMILARITY") or 0.9)
+    return agent_registry.get_or_build(
+        "response_cache",
+        (ttl, max_bytes, similarity),
+        lambda: ResponseCache(ttl=ttl, max_bytes=max_bytes, similarity=similarity),
+    )
@@ -0,0 +1,183 @@
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+# Lookup tables map user phrasing to the canonical LaunchingAgentState values
+OBJECTIVES = {
+    "traffic": "Traffic", "clicks": "Traffic", "link clicks": "Traffic", "visits": "Traffic", "website visits": "Traffic",
+    "leads": "Leads", "lead": "Leads", "lead generation": "Leads", "lead gen": "Leads", "signups": "Leads", "sign ups": "Leads",
+    "sales": "Sales", "sale": "Sales", "conversions": "Sales", "purchases": "Sales", "orders": "Sales",
+}
+
+GEOS = {
+    "india": "India", "united states": "United States", "usa": "United States", "america": "United States",
+    "united kingdom": "United Kingdom", "uk": "United Kingdom", "great britain": "United Kingdom", "england": "United Kingdom",
+    "canada": "Canada", "australia": "Australia", "new zealand": "New Zealand", "germany": "Germany", "france": "France",
+    "spain": "Spain", "italy": "Italy", "netherlands": "Netherlands", "ireland": "Ireland", "sweden": "Sweden",
+    "brazil": "Brazil", "mexico": "Mexico", "japan": "Japan", "singapore": "Singapore", "indonesia": "Indonesia",
+    "malaysia": "Malaysia", "philippines": "Philippines", "uae": "United Arab Emirates",
+    "united arab emirates": "United Arab Emirates", "saudi arabia": "Saudi Arabia", "south africa": "South Africa",
+    "nigeria": "Nigeria", "europe": "Europe", "north america": "North America", "latin america": "Latin America",
+    "asia": "Asia", "middle east": "Middle East", "worldwide": "Worldwide", "global": "Worldwide",
+}
+
+# Country codes are only trusted when they are the whole answer to the geo question
+GEO_CODES = {"in": "India", "us": "United States", "gb": "United Kingdom", "ca": "Canada", "au": "Australia", "de": "Germany", "fr": "France"}
+
+CREATIVE_MODES = {
+    "generate": "GENERATE", "generated": "GENERATE", "auto": "GENERATE", "create them": "GENERATE", "make them": "GENERATE",
+    "user_provided": "USER_PROVIDED", "user provided": "USER_PROVIDED", "upload": "USER_PROVIDED",
+    "my own": "USER_PROVIDED", "i will provide": "USER_PROVIDED", "i'll provide": "USER_PROVIDED", "provided": "USER_PROVIDED",
+}
+
+CONFIRMATIONS = {
+    "yes": "YES", "y": "YES", "yeah": "YES", "yep": "YES", "sure": "YES", "confirm": "YES", "confirmed": "YES",
+    "go ahead": "YES", "launch it": "YES", "ok": "YES", "okay": "YES",
+    "no": "NO", "n": "NO", "nope": "NO", "cancel": "NO", "stop": "NO", "wait": "NO", "not yet": "NO",
+}
+
+MAX_DAILY_BUDGET = 10_000_000
+
+_URL = re.compile(r"https?://[^\s<>\"']+", re.I)
+_ISO_TIME = re.compile(r"\b\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2})?)?\b")
+_AMOUNT = re.compile(r"(?<![\w.])([$€£₹]|rs\.?|inr|usd|eur)?\s*(-?\d[\d,]*(?:\.\d+)?)\s*(k\b)?", re.I)
+# What ties a number to the budget: "budget of 500", "500/day", "500 usd"
+_BUDGET_BEFORE = re.compile(r"\b(?:budget|spend|daily)(?:\s+(?:of|is|at|to|be|around|about|roughly))*\s*[:=]?\s*$", re.I)
+_BUDGET_AFTER = re.compile(r"^\s*(?:/\s*day|per\s+day|a\s+day|each\s+day|daily|usd|inr|eur|rs|rupees|dollars|euros)\b", re.I)
+# A number counting something else: "2 weeks", "top 3 cities", "5 ads"
+_COUNT_AFTER = re.compile(
+    r"^\s*(?:%|x\b|(?:days?|weeks?|months?|years?|hours?|hrs?|minutes?|mins?|times|cit(?:y|ies)|countr(?:y|ies)|regions?|states?"
+    r"|locations?|markets?|ads?|images?|creatives?|campaigns?|variants?|versions?|people|users|audiences?|keywords?)\b)",
+    re.I,
+)
+_BUDGET_HINT = re.compile(r"\b(budget|per day|a day|daily|/day)\b", re.I)
+_PLACE = re.compile(r"^[A-Za-z][A-Za-z .,'-]{1,48}$")
+_NOT_A_PLACE = re.compile(r"\b(not|sure|know|what|which|why|how|maybe|idk|hmm|later|help|unsure|anything|skip)\b", re.I)
+
+
+def _phrase_table(table: Dict[str, str]) -> re.Pattern:
+    # Longest phrases first so "lead generation" wins over "lead"
+    phrases = sorted(table, key=len, reverse=True)
+    return re.compile(r"\b(" + "|".join(re.escape(p) for p in phrases) + r")\b", re.I)
+
+
+_OBJECTIVE = _phrase_table(OBJECTIVES)
+_GEO = _phrase_table(GEOS)
+_CREATIVE_MODE = _phrase_table(CREATIVE_MODES)
+
+
+@dataclass
+class Extraction:
+    """Slots read from one user message, plus validation errors for values that were present but invalid."""
+    slots: Dict[str, Any] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+
+def extract_product_url(text: str) -> Optional[str]:
+    match = _URL.search(text)
+    if not match:
+        return None
+    url = match.group().rstrip(".,;:!?)]}")
+    parsed = urlparse(url)
+    return url if parsed.netloc and "." in parsed.netloc else None
+
+
+def extract_start_time(text: str) -> Optional[str]:
+    """ISO date/datetime normalized to YYYY-MM-DDTHH:MM:SS; raises ValueError for impossible dates."""
+    match = _ISO_TIME.search(text)
+    if not match:
+        return None
+    return datetime.fromisoformat(match.group().replace(" ", "T")).isoformat(timespec="seconds")
+
+
+def extract_daily_budget(text: str) -> Optional[int]:
+    """
+    Budget amount in the text ("500", "$1,200", "2k"): the one tied to the budget
+    by a currency, "budget of" or "per day", else the only amount. None when no
+    amount or several candidates remain; raises ValueError when it is out of range.
+    """
+    attached: List[float] = []
+    bare: List[float] = []
+    for match in _AMOUNT.finditer(text):
+        if _ISO_TIME.search(text[max(0, match.start() - 5):match.end() + 6]):
+            continue  # part of a date
+        after = text[match.end():]
+        if _COUNT_AFTER.match(after):
+            continue
+        amount = float(match.group(2).replace(",", "")) * (1000 if match.group(3) else 1)
+        tied = match.group(1) or match.group(3) or _BUDGET_BEFORE.search(text[:match.start()]) or _BUDGET_AFTER.match(after)
+        candidates = attached if tied else bare
+        if amount not in candidates:
+            candidates.append(amount)
+
+    candidates = attached or bare
+    if len(candidates) != 1:
+        return None
+    amount = candidates[0]
+    if amount <= 0 or amount > MAX_DAILY_BUDGET:
+        raise ValueError(f"Daily budget must be between 1 and {MAX_DAILY_BUDGET:,}.")
+    return int(round(amount))
+
+
+def extract_slots(text: str, expected: Optional[str] = None) -> Extraction:
+    """
+    Deterministically extract LaunchingAgentState fields from a user message.
+    Unambiguous values (URLs, ISO timestamps, known objectives/regions, explicit
+    budgets) are read wherever they appear; bare answers such as "500", "yes" or a
+    free-text place name are only accepted for the `expected` field, i.e. the
+    question the user is answering.
+    """
+    result = Extraction()
+    text = text.strip()
+    lowered = text.lower().rstrip(".!")
+
+    url = extract_product_url(text)
+    if url:
+        result.slots["product_url"] = url
+
+    try:
+        start_time = extract_start_time(text)
+        if start_time:
+            result.slots["start_time"] = start_time
+    except ValueError:
+        result.errors["start_time"] = "That date doesn't look valid; please use YYYY-MM-DD or YYYY-MM-DDTHH:MM."
+
+    objective = _OBJECTIVE.search(text)
+    if objective:
+        result.slots["objective"] = OBJECTIVES[objective.group(1).lower()]
+
+    geo = _GEO.search(text)
+    if geo:
+        result.slots["geo"] = GEOS[geo.group(1).lower()]
+    elif expected == "geo":
+        if lowered in GEO_CODES:
+            result.slots["geo"] = GEO_CODES[lowered]
+        elif _PLACE.match(text) and len(text.split()) <= 4 and not _NOT_A_PLACE.search(text):
+            result.slots["geo"] = text.title()
+
+    if expected == "daily_budget" or _BUDGET_HINT.search(text):
+        # Strip URLs and dates so their digits are not read as an amount
+        remainder = _ISO_TIME.sub(" ", _URL.sub(" ", text))
+        try:
+            budget = extract_daily_budget(remainder)
+            if budget is not None:
+                result.slots["daily_budget"] = budget
+        except ValueError as e:
+            result.errors["daily_budget"] = str(e)
+
+    mode = _CREATIVE_MODE.search(text)
+    if mode and (expected == "creative_mode" or "creative" in lowered):
+        result.slots["creative_mode"] = CREATIVE_MODES[mode.group(1).lower()]
+
+    if expected == "user_confirmation" and lowered in CONFIRMATIONS:
+        result.slots["user_confirmation"] = CONFIRMATIONS[lowered]
+
+    if expected == "creative_urls":
+        urls: List[str] = [u.rstrip(".,;:!?)]}") for u in _URL.findall(text)]
+        if urls:
+            result.slots["creative_urls"] = urls
+            result.slots.pop("product_url", None)
+
+    return result
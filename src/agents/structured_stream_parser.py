@@ -0,0 +1,196 @@
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+logger = logging.getLogger(__name__)
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class IncrementalJSONParser:
+    """
+    Incremental parser for a single JSON object arriving in arbitrary chunks.
+
+    feed() returns events as soon as they can be known:
+      ("delta", key, text)   next decoded characters of a top-level string value
+      ("field", key, value)  a top-level value is complete (already json-decoded)
+    Nested values are surfaced once, when the whole top-level value is complete.
+    """
+
+    def __init__(self):
+        self._stack: List[str] = []       # open containers: "{" or "["
+        self._in_string = False
+        self._string_is_key = False
+        self._expect_key = False
+        self._escape = False
+        self._unicode: Optional[str] = None  # pending \uXXXX hex digits
+        self._high_surrogate: Optional[str] = None  # first half of an escaped surrogate pair
+        self._key_buffer: List[str] = []
+        self._key: Optional[str] = None
+        self._value_raw: Optional[List[str]] = None  # raw text of the current top-level value
+        self._value_is_string = False
+        self.done = False
+
+    def _at_top_level(self) -> bool:
+        return self._stack == ["{"]
+
+    def _finish_value(self, events: List[Tuple[str, str, Any]]) -> None:
+        raw = "".join(self._value_raw).strip()
+        self._value_raw = None
+        if not raw:
+            return
+        try:
+            events.append(("field", self._key, json.loads(raw)))
+        except json.JSONDecodeError:
+            logger.warning(f"Could not decode streamed value for field {self._key!r}: {raw[:80]}")
+
+    def _decoded(self, char: str, escaped: bool) -> str:
+        """
+        Text to emit for one decoded string character. An escaped surrogate pair
+        (\\ud83d\\ude00) is held until both halves are in and becomes one character;
+        an unpaired surrogate becomes U+FFFD, since it can't be encoded as UTF-8.
+        """
+        held, self._high_surrogate = self._high_surrogate, None
+        code = ord(char)
+        if escaped and 0xD800 <= code < 0xDC00:
+            self._high_surrogate = char
+            return "\ufffd" if held else ""
+        if escaped and 0xDC00 <= code < 0xE000:
+            return chr(0x10000 + ((ord(held) - 0xD800) << 10) + (code - 0xDC00)) if held else "\ufffd"
+        return "\ufffd" + char if held else char
+
+    def feed(self, text: str) -> List[Tuple[str, str, Any]]:
+        events: List[Tuple[str, str, Any]] = []
+        delta: List[str] = []
+
+        for c in text:
+            if self.done:
+                break
+
+            if self._in_string:
+                if self._value_raw is not None:
+                    self._value_raw.append(c)
+
+                char = None
+                if self._unicode is not None:
+                    self._unicode += c
+                    if len(self._unicode) == 4:
+                        char = self._decoded(chr(int(self._unicode, 16)), escaped=True)
+                        self._unicode = None
+                elif self._escape:
+                    self._escape = False
+                    if c == "u":
+                        self._unicode = ""
+                    else:
+                        char = self._decoded(_ESCAPES.get(c, c), escaped=False)
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._high_surrogate is not None:
+                        self._high_surrogate = None
+                        char = "\ufffd"
+                else:
+                    char = self._decoded(c, escaped=False)
+
+                if char:
+                    if self._string_is_key:
+                        self._key_buffer.append(char)
+                    elif self._value_is_string and self._at_top_level():
+                        delta.append(char)
+                if not self._in_string and self._string_is_key and self._at_top_level():
+                    self._key = "".join(self._key_buffer)
+                continue
+
+            # A top-level value ends at the next "," or "}" outside any string
+            if self._value_raw is not None and self._at_top_level() and c in ",}":
+                if delta:
+                    events.append(("delta", self._key, "".join(delta)))
+                    delta = []
+                self._finish_value(events)
+            elif self._value_raw is not None and not c.isspace():
+                if not self._value_raw:
+                    self._value_is_string = c == '"' and self._at_top_level()
+                self._value_raw.append(c)
+
+            if c == '"':
+                self._in_string = True
+                self._string_is_key = self._expect_key
+                self._key_buffer = []
+            elif c in "{[":
+                self._stack.append(c)
+                self._expect_key = c == "{"
+            elif c in "}]":
+                if self._stack:
+                    self._stack.pop()
+                self._expect_key = False
+                if not self._stack:
+                    self.done = True
+            elif c == ",":
+                self._expect_key = bool(self._stack) and self._stack[-1] == "{"
+            elif c == ":":
+                self._expect_key = False
+                if self._at_top_level():
+                    self._value_raw = []
+                    self._value_is_string = False
+
+        if delta:
+            events.append(("delta", self._key, "".join(delta)))
+        return events
+
+
+class StructuredStreamParser:
+    """
+    Streams a ProviderStrategy structured output (e.g. MetaQueryAgentResponse or
+    LaunchingAgentState) and validates each top-level field against the Pydantic
+    model as soon as it is complete, so callers can act before the object ends.
+    """
+
+    def __init__(self, schema: Type[BaseModel]):
+        self.schema = schema
+        self.fields: Dict[str, Any] = {}
+        self._parser = IncrementalJSONParser()
+
+    @staticmethod
+    def _adapter(schema: Type[BaseModel], name: str) -> Optional[TypeAdapter]:
+        key = (schema, name)
+        if key not in _ADAPTERS:
+            field = schema.model_fields.get(name)
+            _ADAPTERS[key] = TypeAdapter(field.annotation) if field is not None else None
+        return _ADAPTERS[key]
+
+    @property
+    def done(self) -> bool:
+        return self._parser.done
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Returns events:
+          {"type": "delta", "field": <name>, "text": <chars>}
+          {"type": "field", "field": <name>, "value": <validated value>}
+          {"type": "field_error", "field": <name>, "error": <message>}
+        """
+        events = []
+        for kind, name, payload in self._parser.feed(text):
+            if kind == "delta":
+                events.append({"type": "delta", "field": name, "text": payload})
+                continue
+
+            adapter = self._adapter(self.schema, name)
+            if adapter is None:
+                events.append({"type": "field_error", "field": name, "error": "unknown field"})
+                continue
+            try:
+                value = adapter.validate_python(payload)
+            except ValidationError as e:
+                events.append({"type": "field_error", "field": name, "error": str(e)})
+                continue
+            self.fields[name] = value
+            events.append({"type": "field", "field": name, "value": value})
+        return events
+
+
+# Per-(schema, field) TypeAdapters, shared across parser instances
+_ADAPTERS: Dict[Tuple[Type[BaseModel], str], Optional[TypeAdapter]] = {}
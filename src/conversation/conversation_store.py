@@ -0,0 +1,464 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence
+
+from langchain_core.messages import BaseMessage
+
+from src.agents.agent_registry import agent_registry
+from src.conversation.message_log import MessageLog
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationStore(ABC):
+    """
+    Storage for conversation histories (the message dicts previously kept in
+    st.session_state.messages), with lookups by conversation and agent name.
+    Implementations must be safe to share across threads.
+    """
+
+    def __init__(self):
+        self._handles: Dict[str, "Conversation"] = {}
+        self._handles_lock = threading.Lock()
+
+    @abstractmethod
+    def create_conversation(self, conversation_id: Optional[str] = None) -> str:
+        ...
+
+    @abstractmethod
+    def has_conversation(self, conversation_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def append(self, conversation_id: str, message: Dict[str, str]) -> None:
+        ...
+
+    @abstractmethod
+    def get_messages(self, conversation_id: str, agent_name: Optional[str] = None, since: int = 0) -> List[Dict[str, str]]:
+        """
+        Messages of a conversation in order, optionally only those of one agent.
+        `since` skips the first N messages of the conversation (for incremental reads).
+        """
+        ...
+
+    @abstractmethod
+    def clear(self, conversation_id: str) -> None:
+        ...
+
+    @abstractmethod
+    def generation(self, conversation_id: str) -> int:
+        """How many times the conversation was cleared; message positions restart at 0 with each one."""
+        ...
+
+    @abstractmethod
+    def add_usage(self, conversation_id: str, usage: Dict[str, float]) -> None:
+        """Add to the conversation's running usage totals (tokens, cost); they are kept across clear()."""
+        ...
+
+    @abstractmethod
+    def usage(self, conversation_id: str) -> Dict[str, float]:
+        """Usage totals added so far; empty if there are none."""
+        ...
+
+    def conversation(self, conversation_id: Optional[str] = None) -> "Conversation":
+        """
+        Handle for an existing conversation, creating it if needed. Handles are
+        cached per conversation so their message log is kept between turns.
+        """
+        if conversation_id is None or not self.has_conversation(conversation_id):
+            conversation_id = self.create_conversation(conversation_id)
+
+        with self._handles_lock:
+            if conversation_id not in self._handles:
+                self._handles[conversation_id] = Conversation(self, conversation_id)
+            return self._handles[conversation_id]
+
+
+class Conversation:
+    """
+    Handle bound to one conversation of a store; list-like append().
+    Keeps a MessageLog of the conversation that is synced incrementally from the
+    store (picking up messages written by other workers), so per-agent views and
+    LangChain messages are never rebuilt from the full history.
+    """
+
+    def __init__(self, store: ConversationStore, conversation_id: str):
+        self.store = store
+        self.id = conversation_id
+        self._log = MessageLog()
+        self._generation = 0
+        self._lock = threading.RLock()
+
+    def _sync(self) -> None:
+        # A clear() by another worker restarts positions at 0: start over from the new history
+        while True:
+            generation = self.store.generation(self.id)
+            if generation != self._generation:
+                self._log, self._generation = MessageLog(), generation
+            messages = self.store.get_messages(self.id, since=len(self._log))
+            if self.store.generation(self.id) == generation:
+                self._log.extend(messages)
+                return
+
+    def append(self, message: Dict[str, str]) -> None:
+        with self._lock:
+            self._sync()
+            self.store.append(self.id, message)
+            self._log.append(dict(message))
+
+    def messages(self, agent_name: Optional[str] = None, roles: Optional[Sequence[str]] = None) -> List[Dict[str, str]]:
+        with self._lock:
+            self._sync()
+            return [dict(m) for m in self._log.messages(agent_name, roles)]
+
+    def last_message(self, agent_name: Optional[str] = None, roles: Optional[Sequence[str]] = None, with_field: Optional[str] = None) -> Optional[Dict[str, str]]:
+        with self._lock:
+            self._sync()
+            message = self._log.last(agent_name, roles, with_field)
+            return dict(message) if message is not None else None
+
+    def langchain_messages(self, agent_name: Optional[str] = None, roles: Optional[Sequence[str]] = None) -> List[BaseMessage]:
+        """Cached LangChain messages for the whole conversation or one agent's view of it."""
+        with self._lock:
+            self._sync()
+            return self._log.langchain_messages(agent_name, roles)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.store.clear(self.id)
+            self._log, self._generation = MessageLog(), self.store.generation(self.id)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._sync()
+            return len(self._log)
+
+
+class InMemoryConversationStore(ConversationStore):
+    """Process-local store; histories are lost on restart."""
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._messages: Dict[str, List[Dict[str, str]]] = {}
+        self._by_agent: Dict[str, Dict[str, List[Dict[str, str]]]] = {}
+        self._generations: Dict[str, int] = defaultdict(int)
+        self._usage: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+
+    def create_conversation(self, conversation_id: Optional[str] = None) -> str:
+        conversation_id = conversation_id or uuid.uuid4().hex
+        with self._lock:
+            self._messages.setdefault(conversation_id, [])
+            self._by_agent.setdefault(conversation_id, defaultdict(list))
+        return conversation_id
+
+    def has_conversation(self, conversation_id: str) -> bool:
+        with self._lock:
+            return conversation_id in self._messages
+
+    def append(self, conversation_id: str, message: Dict[str, str]) -> None:
+        with self._lock:
+            if conversation_id not in self._messages:
+                raise KeyError(conversation_id)
+            message = {**message, "_seq": len(self._messages[conversation_id])}
+            self._messages[conversation_id].append(message)
+            self._by_agent[conversation_id][message.get("agent_name", "")].append(message)
+
+    def get_messages(self, conversation_id: str, agent_name: Optional[str] = None, since: int = 0) -> List[Dict[str, str]]:
+        with self._lock:
+            if conversation_id not in self._messages:
+                raise KeyError(conversation_id)
+            if agent_name is None:
+                messages = self._messages[conversation_id][since:]
+            else:
+                messages = [m for m in self._by_agent[conversation_id].get(agent_name, []) if m["_seq"] >= since]
+            return [{k: v for k, v in m.items() if k != "_seq"} for m in messages]
+
+    def clear(self, conversation_id: str) -> None:
+        with self._lock:
+            self._messages[conversation_id] = []
+            self._by_agent[conversation_id] = defaultdict(list)
+            self._generations[conversation_id] += 1
+
+    def generation(self, conversation_id: str) -> int:
+        with self._lock:
+            return self._generations[conversation_id]
+
+    def add_usage(self, conversation_id: str, usage: Dict[str, float]) -> None:
+        with self._lock:
+            totals = self._usage[conversation_id]
+            for name, value in usage.items():
+                totals[name] += value
+
+    def usage(self, conversation_id: str) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._usage.get(conversation_id) or {})
+
+
+class SQLiteConversationStore(ConversationStore):
+    """
+    SQLite store in WAL mode: readers never block the writer, and several worker
+    processes on one host can share the same database file.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS conversations (
+                id TEXT PRIMARY KEY,
+                created_at REAL NOT NULL,
+                generation INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS messages (
+                conversation_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                agent_name TEXT NOT NULL DEFAULT '',
+                payload TEXT NOT NULL,
+                PRIMARY KEY (conversation_id, seq)
+            );
+            CREATE INDEX IF NOT EXISTS idx_messages_agent
+                ON messages (conversation_id, agent_name, seq);
+            CREATE TABLE IF NOT EXISTS usage (
+                conversation_id TEXT NOT NULL,
+                name TEXT NOT NULL,
+                value REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (conversation_id, name)
+            );
+        """)
+        # Databases created before clears were counted
+        columns = {name for _, name, *_ in conn.execute("PRAGMA table_info(conversations)")}
+        if "generation" not in columns:
+            conn.execute("ALTER TABLE conversations ADD COLUMN generation INTEGER NOT NULL DEFAULT 0")
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread; sqlite3 connections must not be shared
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def create_conversation(self, conversation_id: Optional[str] = None) -> str:
+        conversation_id = conversation_id or uuid.uuid4().hex
+        self._connection().execute(
+            "INSERT OR IGNORE INTO conversations (id, created_at) VALUES (?, ?)",
+            (conversation_id, time.time()),
+        )
+        return conversation_id
+
+    def has_conversation(self, conversation_id: str) -> bool:
+        row = self._connection().execute("SELECT 1 FROM conversations WHERE id = ?", (conversation_id,)).fetchone()
+        return row is not None
+
+    def append(self, conversation_id: str, message: Dict[str, str]) -> None:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM conversations WHERE id = ?", (conversation_id,)).fetchone() is None:
+                raise KeyError(conversation_id)
+            conn.execute(
+                """
+                INSERT INTO messages (conversation_id, seq, agent_name, payload)
+                VALUES (?, (SELECT COALESCE(MAX(seq), -1) + 1 FROM messages WHERE conversation_id = ?), ?, ?)
+                """,
+                (conversation_id, conversation_id, message.get("agent_name", ""), json.dumps(message, ensure_ascii=False)),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get_messages(self, conversation_id: str, agent_name: Optional[str] = None, since: int = 0) -> List[Dict[str, str]]:
+        conn = self._connection()
+        if not self.has_conversation(conversation_id):
+            raise KeyError(conversation_id)
+        if agent_name is None:
+            rows = conn.execute(
+                "SELECT payload FROM messages WHERE conversation_id = ? AND seq >= ? ORDER BY seq",
+                (conversation_id, since),
+            )
+        else:
+            rows = conn.execute(
+                "SELECT payload FROM messages WHERE conversation_id = ? AND agent_name = ? AND seq >= ? ORDER BY seq",
+                (conversation_id, agent_name, since),
+            )
+        return [json.loads(payload) for (payload,) in rows]
+
+    def clear(self, conversation_id: str) -> None:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM messages WHERE conversation_id = ?", (conversation_id,))
+            conn.execute("UPDATE conversations SET generation = generation + 1 WHERE id = ?", (conversation_id,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def generation(self, conversation_id: str) -> int:
+        row = self._connection().execute("SELECT generation FROM conversations WHERE id = ?", (conversation_id,)).fetchone()
+        if row is None:
+            raise KeyError(conversation_id)
+        return row[0]
+
+    def add_usage(self, conversation_id: str, usage: Dict[str, float]) -> None:
+        # Added in SQL, so workers charging the same conversation don't lose updates
+        self._connection().executemany(
+            """
+            INSERT INTO usage (conversation_id, name, value) VALUES (?, ?, ?)
+            ON CONFLICT (conversation_id, name) DO UPDATE SET value = value + excluded.value
+            """,
+            [(conversation_id, name, value) for name, value in usage.items()],
+        )
+
+    def usage(self, conversation_id: str) -> Dict[str, float]:
+        rows = self._connection().execute("SELECT name, value FROM usage WHERE conversation_id = ?", (conversation_id,))
+        return dict(rows)
+
+
+class FileConversationStore(ConversationStore):
+    """
+    Append-only JSONL log. Every write is one line; an in-memory index of byte
+    offsets per conversation and per (conversation, agent) is rebuilt on open,
+    so lookups seek straight to the relevant lines.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._offsets: Dict[str, List[int]] = {}
+        self._agent_offsets: Dict[str, Dict[str, List[int]]] = {}
+        self._generations: Dict[str, int] = defaultdict(int)
+        self._usage: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self._writer = open(path, "ab")
+        self._load_index()
+
+    def _load_index(self) -> None:
+        with open(self.path, "rb") as f:
+            offset = 0
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn final line from a crash; ignore it
+                    logger.warning(f"Skipping unreadable record at offset {offset} in {self.path}")
+                    offset += len(line)
+                    continue
+                self._apply(record, offset)
+                offset += len(line)
+
+    def _apply(self, record: Dict, offset: int) -> None:
+        conversation_id = record["conversation_id"]
+        op = record["op"]
+        if op == "create":
+            self._offsets.setdefault(conversation_id, [])
+            self._agent_offsets.setdefault(conversation_id, defaultdict(list))
+        elif op == "append":
+            self._offsets[conversation_id].append(offset)
+            self._agent_offsets[conversation_id][record["message"].get("agent_name", "")].append(offset)
+        elif op == "clear":
+            self._offsets[conversation_id] = []
+            self._agent_offsets[conversation_id] = defaultdict(list)
+            self._generations[conversation_id] += 1
+        elif op == "usage":
+            totals = self._usage[conversation_id]
+            for name, value in record["usage"].items():
+                totals[name] += value
+
+    def _write(self, record: Dict) -> None:
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        offset = self._writer.tell()
+        self._writer.write(line)
+        self._writer.flush()
+        self._apply(record, offset)
+
+    def create_conversation(self, conversation_id: Optional[str] = None) -> str:
+        conversation_id = conversation_id or uuid.uuid4().hex
+        with self._lock:
+            if conversation_id not in self._offsets:
+                self._write({"op": "create", "conversation_id": conversation_id})
+        return conversation_id
+
+    def has_conversation(self, conversation_id: str) -> bool:
+        with self._lock:
+            return conversation_id in self._offsets
+
+    def append(self, conversation_id: str, message: Dict[str, str]) -> None:
+        with self._lock:
+            if conversation_id not in self._offsets:
+                raise KeyError(conversation_id)
+            self._write({"op": "append", "conversation_id": conversation_id, "message": message})
+
+    def get_messages(self, conversation_id: str, agent_name: Optional[str] = None, since: int = 0) -> List[Dict[str, str]]:
+        with self._lock:
+            if conversation_id not in self._offsets:
+                raise KeyError(conversation_id)
+            if agent_name is None:
+                offsets = self._offsets[conversation_id][since:]
+            else:
+                # Offsets grow with position, so skip those before the since-th message
+                all_offsets = self._offsets[conversation_id]
+                floor = all_offsets[since] if since < len(all_offsets) else None
+                agent_offsets = self._agent_offsets[conversation_id].get(agent_name, [])
+                offsets = [] if floor is None else [o for o in agent_offsets if o >= floor]
+        if not offsets:
+            return []
+
+        messages = []
+        with open(self.path, "rb") as f:
+            for offset in offsets:
+                f.seek(offset)
+                messages.append(json.loads(f.readline())["message"])
+        return messages
+
+    def clear(self, conversation_id: str) -> None:
+        with self._lock:
+            self._write({"op": "clear", "conversation_id": conversation_id})
+
+    def generation(self, conversation_id: str) -> int:
+        with self._lock:
+            return self._generations[conversation_id]
+
+    def add_usage(self, conversation_id: str, usage: Dict[str, float]) -> None:
+        with self._lock:
+            self._write({"op": "usage", "conversation_id": conversation_id, "usage": usage})
+
+    def usage(self, conversation_id: str) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._usage.get(conversation_id) or {})
+
+
+def get_conversation_store() -> ConversationStore:
+    """
+    Process-wide store selected by environment:
+      CONVERSATION_STORE       sqlite (default) | file | memory
+      CONVERSATION_STORE_PATH  database / log path (default data/conversations.db or .jsonl)
+    """
+    kind = os.getenv("CONVERSATION_STORE", "sqlite").lower()
+    path = os.getenv("CONVERSATION_STORE_PATH")
+
+    def build() -> ConversationStore:
+        if kind == "memory":
+            return InMemoryConversationStore()
+        if kind == "file":
+            return FileConversationStore(path or "data/conversations.jsonl")
+        if kind == "sqlite":
+            return SQLiteConversationStore(path or "data/conversations.db")
+        raise ValueError(f"Unknown CONVERSATION_STORE: {kind}")
+
+    return agent_registry.get_or_build("conversation_store", (kind, path), build)
@@ -0,0 +1,90 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+
+
+def to_langchain_message(msg: Dict[str, str]) -> Optional[BaseMessage]:
+    """Convert one stored message dict to its LangChain message (None for unknown roles)."""
+    role = msg.get("role")
+
+    if role == "user":
+        return HumanMessage(content=msg.get("content", ""))
+
+    if role == "assistant":
+        # Pass the formatted output JSON string if available, else fallback to visible content
+        assistant_payload = msg.get("formatted_output") or msg.get("formated_output") or msg.get("content", "")
+        return AIMessage(content=assistant_payload)
+
+    if role == "tool":
+        # ToolMessage requires tool_call_id for best compatibility
+        return ToolMessage(
+            content=msg.get("content", ""),
+            tool_call_id=msg.get("tool_call_id", "unknown_tool_call_id"),
+            name=msg.get("name"),
+        )
+
+    return None
+
+
+class MessageLog:
+    """
+    Append-only message log with per-agent and per-role position indexes that are
+    maintained on append, plus a lazily filled cache of LangChain message objects.
+    Building the context for one agent touches only that agent's messages, and
+    each message is converted to a LangChain object at most once.
+    """
+
+    def __init__(self, messages: Iterable[Dict[str, str]] = ()):
+        self._messages: List[Dict[str, str]] = []
+        self._langchain: List[Optional[BaseMessage]] = []
+        self._by_agent: Dict[str, List[int]] = defaultdict(list)
+        self._by_role: Dict[str, List[int]] = defaultdict(list)
+        self.extend(messages)
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def append(self, message: Dict[str, str]) -> None:
+        position = len(self._messages)
+        self._messages.append(message)
+        self._langchain.append(None)
+        self._by_agent[message.get("agent_name", "")].append(position)
+        self._by_role[message.get("role", "")].append(position)
+
+    def extend(self, messages: Iterable[Dict[str, str]]) -> None:
+        for message in messages:
+            self.append(message)
+
+    def _positions(self, agent_name: Optional[str], roles: Optional[Sequence[str]]) -> List[int]:
+        if agent_name is None and roles is None:
+            return list(range(len(self._messages)))
+        if agent_name is not None:
+            positions = self._by_agent.get(agent_name, [])
+            if roles is not None:
+                positions = [p for p in positions if self._messages[p].get("role") in roles]
+            return positions
+        # Roles only: merge the (already sorted) per-role position lists
+        return sorted(p for role in roles for p in self._by_role.get(role, []))
+
+    def last(self, agent_name: Optional[str] = None, roles: Optional[Sequence[str]] = None, with_field: Optional[str] = None) -> Optional[Dict[str, str]]:
+        """Most recent message of a view (optionally one with a non-empty `with_field`), scanning backwards from the end of its index."""
+        positions = self._by_agent.get(agent_name, []) if agent_name is not None else range(len(self._messages))
+        for p in reversed(positions):
+            message = self._messages[p]
+            if (roles is None or message.get("role") in roles) and (with_field is None or message.get(with_field)):
+                return message
+        return None
+
+    def messages(self, agent_name: Optional[str] = None, roles: Optional[Sequence[str]] = None) -> List[Dict[str, str]]:
+        return [self._messages[p] for p in self._positions(agent_name, roles)]
+
+    def langchain_messages(self, agent_name: Optional[str] = None, roles: Optional[Sequence[str]] = None) -> List[BaseMessage]:
+        """LangChain messages for a view, converting (and caching) only messages not seen before."""
+        result = []
+        for p in self._positions(agent_name, roles):
+            if self._langchain[p] is None:
+                self._langchain[p] = to_langchain_message(self._messages[p])
+            if self._langchain[p] is not None:
+                result.append(self._langchain[p])
+        return result
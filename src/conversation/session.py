@@ -0,0 +1,41 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+import streamlit as st
+
+from src.conversation.conversation_store import Conversation, get_conversation_store
+
+# Conversation currently being served. Tools read it through current_conversation().
+_current_conversation: ContextVar[Optional[Conversation]] = ContextVar("current_conversation", default=None)
+
+
+def current_conversation() -> Conversation:
+    """
+    Return the conversation of the current turn.
+    Uses the one bound by bind_conversation() if any, else the Streamlit session's.
+    """
+    conversation = _current_conversation.get()
+    if conversation is not None:
+        return conversation
+
+    # Initialize the Streamlit session's conversation if not exists
+    if "conversation" not in st.session_state:
+        st.session_state.conversation = get_conversation_store().conversation()
+    return st.session_state.conversation
+
+
+def current_conversation_id() -> Optional[str]:
+    """ID of the conversation bound with bind_conversation(), if any (never touches Streamlit)."""
+    conversation = _current_conversation.get()
+    return conversation.id if conversation is not None else None
+
+
+@contextmanager
+def bind_conversation(conversation: Conversation) -> Iterator[Conversation]:
+    """Make `conversation` the current one for tools running in this context."""
+    token = _current_conversation.set(conversation)
+    try:
+        yield conversation
+    finally:
+        _current_conversation.reset(token)
@@ -0,0 +1,65 @@
+import json
+from typing import Any, Dict, List
+
+from src.conversation.conversation_store import Conversation
+
+# Sub-agent each tool belongs to, used to tag stored tool messages
+TOOL_AGENT_NAMES = {
+    "launching_agent_tool": "LAUNCHING_AGENT",
+    "reporting_agent_tool": "REPORTING_AGENT",
+}
+
+
+def split_result(result: Any) -> tuple:
+    """Return (structured_response dict, tool_calls list) from a MetaQueryAgent result."""
+    if isinstance(result, dict) and "structured_response" in result:
+        return result.get("structured_response") or {}, result.get("tool_calls") or []
+    # fallback if invoke returns only structured_response
+    structured = result if isinstance(result, dict) else {"response": str(result), "context": {}}
+    return structured, []
+
+
+def record_turn_result(conversation: Conversation, structured: Dict[str, Any], tool_calls: List[Dict[str, Any]]) -> str:
+    """Append the assistant reply and its tool messages to the conversation; return the reply text."""
+    response_text = structured.get("response", str(structured))
+
+    # Store assistant message (include full structured JSON as string so it can be replayed)
+    conversation.append({
+        "role": "assistant",
+        "content": response_text,
+        "agent_name": "META_QUERY_AGENT",
+        "formatted_output": json.dumps(structured, ensure_ascii=False),
+    })
+
+    # Store tool calls as separate messages
+    for t in tool_calls:
+        tool_name = t.get("name", "")
+        conversation.append({
+            "role": "tool",
+            "name": tool_name,
+            "content": t.get("content", ""),
+            "agent_name": TOOL_AGENT_NAMES.get(tool_name, "META_QUERY_AGENT"),
+            "tool_call_id": t.get("tool_call_id") or t.get("id") or "unknown_tool_call_id",
+            "status": t.get("status", "success"),
+            "formatted_output": ""
+        })
+
+    return response_text
+
+
+def record_user_message(conversation: Conversation, content: str) -> None:
+    conversation.append({
+        "role": "user",
+        "content": content,
+        "agent_name": "",
+        "formatted_output": ""
+    })
+
+
+def record_error(conversation: Conversation, error_message: str) -> None:
+    conversation.append({
+        "role": "assistant",
+        "content": error_message,
+        "agent_name": "META_QUERY_AGENT",
+        "formatted_output": ""
+    })
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import logging
+import os
+import struct
+import time
+import zlib
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+
+from src.agents.agent_registry import agent_registry
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_product_url(url: str) -> str:
+    """Strip whitespace, a trailing slash and the fragment, so equivalent URLs share creatives."""
+    return url.strip().split("#", 1)[0].rstrip("/")
+
+
+@dataclass(frozen=True)
+class CreativeSpec:
+    """Everything that determines one generated creative."""
+    product_url: str
+    variant: int = 0
+    size: str = "1080x1080"
+    style: str = "default"
+
+    def content_hash(self) -> str:
+        """sha256 of the product URL and parameters: the creative's identity in the cache."""
+        canonical = json.dumps({**asdict(self), "product_url": normalize_product_url(self.product_url)}, sort_keys=True)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class GenerationBackend(ABC):
+    """
+    Turns a CreativeSpec into image bytes. Backends are called from a worker
+    pool, so they must be safe to call from several threads at once.
+    """
+
+    name = "base"
+    extension = "png"
+
+    @abstractmethod
+    def generate(self, spec: CreativeSpec) -> bytes:
+        ...
+
+
+def _png(width: int, height: int, rows: bytes) -> bytes:
+    def block(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + block(b"IHDR", header) + block(b"IDAT", zlib.compress(rows)) + block(b"IEND", b"")
+
+
+class LocalGenerationBackend(GenerationBackend):
+    """
+    Local stand-in for an image model: a small deterministic PNG (a gradient
+    coloured by the spec hash) after a simulated generation time of `latency`
+    seconds, varying by variant between half and one and a half times that.
+    """
+
+    name = "local"
+
+    def __init__(self, latency: float = 0.2, size: int = 64):
+        self.latency = latency
+        self.size = size
+
+    def generate(self, spec: CreativeSpec) -> bytes:
+        digest = bytes.fromhex(spec.content_hash())
+        time.sleep(self.latency * (0.5 + digest[3] / 255))
+        r, g, b = digest[0], digest[1], digest[2]
+        step = 256 // self.size
+        # Every row starts with PNG filter type 0
+        rows = b"".join(
+            b"\x00" + bytes(c for x in range(self.size) for c in ((r + step * x) % 256, (g + step * y) % 256, b))
+            for y in range(self.size)
+        )
+        return _png(self.size, self.size, rows)
+
+
+def get_generation_backend() -> GenerationBackend:
+    """
+    Backend named by CREATIVE_BACKEND: local (default, the stand-in generator;
+    CREATIVE_LOCAL_LATENCY sets its simulated seconds per image).
+    """
+    name = os.getenv("CREATIVE_BACKEND", "local").lower()
+    if name != "local":
+        logger.warning(f"Unknown CREATIVE_BACKEND {name!r}; using the local stand-in generator")
+    latency = float(os.getenv("CREATIVE_LOCAL_LATENCY") or 0.2)
+    return agent_registry.get_or_build("generation_backend", ("local", latency), lambda: LocalGenerationBackend(latency))
@@ -0,0 +1,202 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.agents.agent_registry import agent_registry
+from src.creatives.backends import CreativeSpec, GenerationBackend, get_generation_backend
+
+logger = logging.getLogger(__name__)
+
+# Creatives per request; more is never useful for one ad set
+MAX_IMAGES = 10
+
+
+@dataclass
+class Creative:
+    content_hash: str
+    variant: int
+    path: str
+    url: str
+    cached: bool
+
+
+@dataclass
+class GenerationResult:
+    creatives: List[Creative]
+    cached: int = 0
+    generated: int = 0
+    failed: int = 0
+    pending: int = 0
+    seconds: float = 0.0
+
+
+class CreativeStore:
+    """
+    Content-addressed creative files: <root>/<hash[:2]>/<hash>.<ext>, where the
+    hash is the spec's content hash. Files are written atomically, so a file
+    that exists is complete.
+    """
+
+    def __init__(self, root: str, base_url: Optional[str] = None):
+        self.root = os.path.abspath(root)
+        self.base_url = (base_url or Path(self.root).as_uri()).rstrip("/")
+
+    def relative_path(self, content_hash: str, extension: str) -> str:
+        return f"{content_hash[:2]}/{content_hash}.{extension}"
+
+    def url_for(self, content_hash: str, extension: str) -> str:
+        return f"{self.base_url}/{self.relative_path(content_hash, extension)}"
+
+    def get(self, content_hash: str, extension: str) -> Optional[str]:
+        path = os.path.join(self.root, self.relative_path(content_hash, extension))
+        return path if os.path.exists(path) else None
+
+    def put(self, content_hash: str, extension: str, data: bytes) -> str:
+        path = os.path.join(self.root, self.relative_path(content_hash, extension))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        return path
+
+
+class CreativeGenerator:
+    """
+    Fans creative variants out over a worker pool and returns as soon as the
+    requested number is ready. Variants already in the store are returned
+    without calling the backend. A variant being generated for another request
+    is awaited rather than generated twice. `spare_variants` extra variants are
+    started so a slow one doesn't hold up the response; variants still running
+    at return time finish in the background and land in the store.
+    """
+
+    def __init__(self, backend: GenerationBackend, store: CreativeStore, workers: int = 4, spare_variants: int = 1):
+        self.backend = backend
+        self.store = store
+        self.spare_variants = spare_variants
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="creative-gen")
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._stats = {
+            "requests": 0, "returned": 0, "cache_hits": 0, "deduplicated": 0,
+            "generated": 0, "failed": 0, "generation_seconds": 0.0,
+        }
+
+    def _run(self, spec: CreativeSpec, content_hash: str) -> str:
+        started = time.perf_counter()
+        try:
+            path = self.store.put(content_hash, self.backend.extension, self.backend.generate(spec))
+        except Exception:
+            with self._lock:
+                self._stats["failed"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(content_hash, None)
+        with self._lock:
+            self._stats["generated"] += 1
+            self._stats["generation_seconds"] += time.perf_counter() - started
+        return path
+
+    def _submit(self, spec: CreativeSpec, content_hash: str) -> Future:
+        with self._lock:
+            future = self._inflight.get(content_hash)
+            if future is not None:
+                self._stats["deduplicated"] += 1
+                return future
+            # Finished since the caller looked in the store
+            path = self.store.get(content_hash, self.backend.extension)
+            if path is not None:
+                future = Future()
+                future.set_result(path)
+                return future
+            future = self._inflight[content_hash] = self._executor.submit(self._run, spec, content_hash)
+            return future
+
+    def generate(
+        self,
+        product_url: str,
+        num_images: int = 3,
+        size: str = "1080x1080",
+        style: str = "default",
+        timeout: float = 60.0,
+    ) -> GenerationResult:
+        """Up to `num_images` creatives ordered by variant; fewer only if generation failed or timed out."""
+        started = time.perf_counter()
+        num_images = max(1, min(num_images, MAX_IMAGES))
+        extension = self.backend.extension
+        specs = [CreativeSpec(product_url, v, size, style) for v in range(num_images + self.spare_variants)]
+
+        ready: List[Creative] = []
+        missing = []
+        for spec in specs:
+            content_hash = spec.content_hash()
+            path = self.store.get(content_hash, extension)
+            if path is not None:
+                ready.append(Creative(content_hash, spec.variant, path, self.store.url_for(content_hash, extension), cached=True))
+            else:
+                missing.append((spec, content_hash))
+        result = GenerationResult([], cached=len(ready))
+
+        if len(ready) < num_images:
+            # Only what is still needed, plus the spares
+            to_run = missing[:num_images - len(ready) + self.spare_variants]
+            futures = {self._submit(spec, content_hash): (spec, content_hash) for spec, content_hash in to_run}
+            pending = set(futures)
+            deadline = time.monotonic() + timeout
+            while pending and len(ready) < num_images:
+                done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+                if not done:
+                    break
+                for future in done:
+                    spec, content_hash = futures[future]
+                    try:
+                        path = future.result()
+                    except Exception as e:
+                        logger.warning(f"Creative generation failed for {spec.product_url} variant {spec.variant}: {e}")
+                        result.failed += 1
+                        continue
+                    ready.append(Creative(content_hash, spec.variant, path, self.store.url_for(content_hash, extension), cached=False))
+                    result.generated += 1
+            result.pending = len(pending)
+
+        result.creatives = sorted(ready, key=lambda c: c.variant)[:num_images]
+        result.seconds = time.perf_counter() - started
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["returned"] += len(result.creatives)
+            self._stats["cache_hits"] += result.cached
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "generation_seconds": round(self._stats["generation_seconds"], 3),
+                "in_flight": len(self._inflight),
+                "backend": self.backend.name,
+            }
+
+
+def get_creative_generator() -> CreativeGenerator:
+    """
+    Shared generator over get_generation_backend(), storing creatives under
+    CREATIVES_PATH (default data/creatives) and linking them from CREATIVES_BASE_URL
+    (default file:// URLs); CREATIVE_WORKERS and CREATIVE_SPARE_VARIANTS tune the fan-out.
+    """
+    backend = get_generation_backend()
+    path = os.path.abspath(os.getenv("CREATIVES_PATH", "data/creatives"))
+    base_url = os.getenv("CREATIVES_BASE_URL") or None
+    workers = int(os.getenv("CREATIVE_WORKERS") or 4)
+    spare_variants = int(os.getenv("CREATIVE_SPARE_VARIANTS") or 1)
+    return agent_registry.get_or_build(
+        "creative_generator",
+        (id(backend), path, base_url, workers, spare_variants),
+        lambda: CreativeGenerator(backend, CreativeStore(path, base_url), workers=workers, spare_variants=spare_variants),
+    )
@@ -0,0 +1,246 @@
+import hashlib
+import json
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import ConfigDict
+
+logger = logging.getLogger(__name__)
+
+# Data file record header: key digest, payload length. The payload is zlib-compressed JSON.
+_RECORD_HEADER = struct.Struct("<16sI")
+# Index file entry: key digest, data-file offset of the payload, payload length
+_INDEX_ENTRY = struct.Struct("<16sQI")
+
+CASSETTE_MODES = ("auto", "replay", "record")
+
+
+class CassetteMiss(KeyError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+def _normalize_message(msg: BaseMessage) -> Dict[str, Any]:
+    # Tool-call IDs are random per run, so they are left out of the key
+    normalized = {"role": msg.type, "content": msg.content}
+    if getattr(msg, "tool_calls", None):
+        normalized["tool_calls"] = [{"name": tc["name"], "args": tc.get("args", {})} for tc in msg.tool_calls]
+    if getattr(msg, "name", None) and msg.type == "tool":
+        normalized["name"] = msg.name
+    return normalized
+
+
+# Converted tool schemas by tool identity; conversion builds pydantic models and
+# the agent graph rebinds tools on every model call
+_tool_schemas: Dict[int, Tuple[Any, Dict[str, Any]]] = {}
+
+
+def _tool_schema(tool: Any) -> Dict[str, Any]:
+    if isinstance(tool, dict):
+        return convert_to_openai_tool(tool)
+    cached = _tool_schemas.get(id(tool))
+    if cached is None or cached[0] is not tool:
+        cached = _tool_schemas[id(tool)] = (tool, convert_to_openai_tool(tool))
+    return cached[1]
+
+
+def request_key(model_name: str, messages: List[BaseMessage], params: Dict[str, Any]) -> bytes:
+    """
+    Stable 16-byte digest of an LLM request: model name, messages (the system
+    prompt is the first one), tool schemas and other bound parameters such as
+    response_format.
+    """
+    canonical = json.dumps(
+        {"model": model_name, "messages": [_normalize_message(m) for m in messages], "params": params},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).digest()[:16]
+
+
+class Cassette:
+    """
+    On-disk store of recorded LLM responses: one append-only data file of
+    compressed records plus a fixed-width index file (`<path>.idx`) mapping request
+    keys to offsets, loaded into memory on open. If the index is missing or behind
+    the data file (e.g. after a crash), the tail of the data file is rescanned.
+    Re-recording a key appends a new record that wins over the old one.
+    """
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        self.index_path = self.path + ".idx"
+        self._lock = threading.Lock()
+        self._index: Dict[bytes, Tuple[int, int]] = {}
+        self._stats = {"hits": 0, "misses": 0, "recorded": 0, "saved_seconds": 0.0}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._load_index()
+
+    def _load_index(self) -> None:
+        data_size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        scanned_to = 0
+
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb") as f:
+                raw = f.read()
+            usable = len(raw) - len(raw) % _INDEX_ENTRY.size
+            for key, offset, length in _INDEX_ENTRY.iter_unpack(raw[:usable]):
+                if offset + length > data_size:
+                    break
+                self._index[key] = (offset, length)
+                scanned_to = max(scanned_to, offset + length)
+
+        if scanned_to < data_size:
+            self._rescan(scanned_to, data_size)
+
+    def _rescan(self, start: int, end: int) -> None:
+        recovered = []
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            position = start
+            while position + _RECORD_HEADER.size <= end:
+                key, length = _RECORD_HEADER.unpack(f.read(_RECORD_HEADER.size))
+                offset = position + _RECORD_HEADER.size
+                if offset + length > end:
+                    break  # torn write at the end of the file
+                f.seek(length, os.SEEK_CUR)
+                self._index[key] = (offset, length)
+                recovered.append(_INDEX_ENTRY.pack(key, offset, length))
+                position = offset + length
+        if recovered:
+            with open(self.index_path, "ab") as f:
+                f.write(b"".join(recovered))
+            logger.info(f"Rebuilt {len(recovered)} cassette index entries for {self.path}")
+
+    def get(self, key: bytes) -> Optional[Tuple[AIMessage, float]]:
+        """Recorded response for `key` and the seconds the original call took, or None."""
+        with self._lock:
+            location = self._index.get(key)
+        if location is None:
+            return None
+        offset, length = location
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            record = json.loads(zlib.decompress(f.read(length)))
+        return messages_from_dict([record["response"]])[0], record.get("elapsed", 0.0)
+
+    def put(self, key: bytes, response: AIMessage, model_name: str, elapsed: float) -> None:
+        record = {"model": model_name, "response": message_to_dict(response), "elapsed": round(elapsed, 4), "recorded_at": int(time.time())}
+        payload = zlib.compress(json.dumps(record, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+        with self._lock:
+            with open(self.path, "ab") as f:
+                offset = f.tell() + _RECORD_HEADER.size
+                f.write(_RECORD_HEADER.pack(key, len(payload)) + payload)
+            with open(self.index_path, "ab") as f:
+                f.write(_INDEX_ENTRY.pack(key, offset, len(payload)))
+            self._index[key] = (offset, len(payload))
+            self._stats["recorded"] += 1
+
+    def count(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self._stats[name] += amount
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "saved_seconds": round(self._stats["saved_seconds"], 3),
+                "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+                "entries": len(self._index),
+                "bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats = {"hits": 0, "misses": 0, "recorded": 0, "saved_seconds": 0.0}
+
+
+class CassetteChatModel(BaseChatModel):
+    """
+    Record/replay wrapper around a chat model.
+      auto:   replay recorded responses, call the wrapped model and record on a miss
+      replay: replay only; a miss raises CassetteMiss (deterministic CI runs)
+      record: always call the wrapped model and (re-)record its response
+    Tool schemas and response_format bound via bind_tools() are part of the key.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    inner: Any
+    cassette: Any
+    mode: str = "auto"
+    model_name: str = ""
+
+    def model_post_init(self, __context: Any) -> None:
+        if self.mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode {self.mode!r}, expected one of {CASSETTE_MODES}")
+        if not self.model_name:
+            self.model_name = getattr(self.inner, "model_name", None) or type(self.inner).__name__
+
+    @property
+    def _llm_type(self) -> str:
+        return "cassette"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> Any:
+        return self.bind(tools=[_tool_schema(t) for t in tools], **kwargs)
+
+    def _runnable(self, params: Dict[str, Any]) -> Any:
+        params = dict(params)
+        tools = params.pop("tools", None)
+        if tools is not None:
+            return self.inner.bind_tools(tools, **params)
+        return self.inner.bind(**params) if params else self.inner
+
+    def _lookup(self, messages: List[BaseMessage], params: Dict[str, Any]) -> Tuple[bytes, Optional[AIMessage]]:
+        key = request_key(self.model_name, messages, params)
+        if self.mode == "record":
+            return key, None
+        recorded = self.cassette.get(key)
+        if recorded is None:
+            self.cassette.count("misses")
+            if self.mode == "replay":
+                raise CassetteMiss(f"No recorded response for request {key.hex()} ({len(messages)} messages)")
+            return key, None
+        response, elapsed = recorded
+        self.cassette.count("hits")
+        self.cassette.count("saved_seconds", elapsed)
+        return key, response
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        key, response = self._lookup(messages, kwargs)
+        if response is None:
+            start = time.perf_counter()
+            response = self._runnable(kwargs).invoke(messages)
+            self.cassette.put(key, response, self.model_name, time.perf_counter() - start)
+        return ChatResult(generations=[ChatGeneration(message=response)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        key, response = self._lookup(messages, kwargs)
+        if response is None:
+            start = time.perf_counter()
+            response = await self._runnable(kwargs).ainvoke(messages)
+            self.cassette.put(key, response, self.model_name, time.perf_counter() - start)
+        return ChatResult(generations=[ChatGeneration(message=response)])
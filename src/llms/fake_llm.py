@@ -0,0 +1,299 @@
+import asyncio
+import hashlib
+import itertools
+import json
+import math
+import re
+import threading
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import BaseModel, ConfigDict, PrivateAttr
+
+
+def tool_call_message(name: str, args: Dict[str, Any], content: str = "") -> AIMessage:
+    """Scripted reply that calls tool `name` with `args`."""
+    return AIMessage(content=content, tool_calls=[{
+        "name": name, "args": args, "id": f"call_{uuid.uuid4().hex[:12]}", "type": "tool_call",
+    }])
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic stand-in for ChatOpenAI, for benchmarks and offline runs.
+    Replies cycle through `responses`. Each call waits `latency` seconds (time to
+    first token) plus `token_latency` seconds per output token of `token_chars`
+    characters, with time.sleep on the sync path and asyncio.sleep on the async
+    path; streaming emits one chunk per token. Replies carry usage_metadata with
+    estimated token counts, including the input tokens a provider prompt cache
+    would have served: the longest previously seen message prefix of at least
+    `prompt_cache_min_tokens`, rounded down to 128-token blocks.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    # Each scripted reply is plain content, a dict / pydantic model (sent as the
+    # JSON content ProviderStrategy parses into the structured response), a ready
+    # AIMessage (e.g. from tool_call_message()), or a callable computing any of
+    # these from the incoming messages.
+    responses: List[Any]
+    latency: float = 0.0
+    token_latency: float = 0.0
+    token_chars: int = 4
+    model_name: str = "fake-chat-model"
+    prompt_cache_min_tokens: int = 1024
+
+    _counter: Any = PrivateAttr(default=None)
+    _lock: Any = PrivateAttr(default=None)
+    _seen_prefixes: Any = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._seen_prefixes = set()
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "FakeChatModel":
+        # Replies are scripted, so tool schemas and response_format are not needed
+        return self
+
+    def _count_tokens(self, text: str) -> int:
+        return math.ceil(len(text) / self.token_chars) if text else 0
+
+    def _prompt_usage(self, messages: List[BaseMessage]) -> tuple:
+        """(input tokens, cached input tokens) for a request, remembering its message prefixes."""
+        digest = hashlib.sha1()
+        total = cached = 0
+        boundaries = []
+        for msg in messages:
+            digest.update(f"{msg.type}\0{msg.text}\0".encode("utf-8"))
+            total += self._count_tokens(msg.text)
+            boundaries.append((digest.hexdigest(), total))
+        with self._lock:
+            for prefix, tokens in boundaries:
+                if tokens >= self.prompt_cache_min_tokens and prefix in self._seen_prefixes:
+                    cached = tokens // 128 * 128
+            if len(self._seen_prefixes) > 100_000:
+                self._seen_prefixes.clear()
+            self._seen_prefixes.update(prefix for prefix, _ in boundaries)
+        return total, cached
+
+    def _next_reply(self, messages: List[BaseMessage]) -> AIMessage:
+        with self._lock:
+            index = next(self._counter)
+        reply = self.responses[index % len(self.responses)]
+        if callable(reply):
+            reply = reply(messages)
+        if isinstance(reply, BaseModel) and not isinstance(reply, BaseMessage):
+            reply = reply.model_dump_json()
+        elif isinstance(reply, dict):
+            reply = json.dumps(reply)
+        if not isinstance(reply, AIMessage):
+            reply = AIMessage(content=str(reply))
+
+        input_tokens, cached_tokens = self._prompt_usage(messages)
+        output_tokens = self._count_tokens(reply.text) + sum(
+            self._count_tokens(json.dumps(tc.get("args", {}))) for tc in reply.tool_calls
+        )
+        return reply.model_copy(update={
+            "id": reply.id or f"fake-{uuid.uuid4().hex[:12]}",
+            "usage_metadata": {
+                "input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens,
+                "input_token_details": {"cache_read": cached_tokens},
+            },
+            "response_metadata": {**reply.response_metadata, "model_name": self.model_name},
+        })
+
+    def _pieces(self, text: str) -> List[str]:
+        return [text[i:i + self.token_chars] for i in range(0, len(text), self.token_chars)]
+
+    def _last_chunk(self, reply: AIMessage) -> AIMessageChunk:
+        """Final chunk carrying tool calls and usage, after the content chunks."""
+        return AIMessageChunk(
+            content="",
+            id=reply.id,
+            tool_call_chunks=[
+                {"name": tc["name"], "args": json.dumps(tc.get("args", {})), "id": tc.get("id"), "index": i, "type": "tool_call_chunk"}
+                for i, tc in enumerate(reply.tool_calls)
+            ],
+            usage_metadata=reply.usage_metadata,
+            response_metadata=reply.response_metadata,
+            chunk_position="last",
+        )
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        reply = self._next_reply(messages)
+        delay = self.latency + self.token_latency * reply.usage_metadata["output_tokens"]
+        if delay:
+            time.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=reply)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        reply = self._next_reply(messages)
+        delay = self.latency + self.token_latency * reply.usage_metadata["output_tokens"]
+        if delay:
+            await asyncio.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=reply)])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        reply = self._next_reply(messages)
+        if self.latency:
+            time.sleep(self.latency)
+        for piece in self._pieces(reply.text):
+            if self.token_latency:
+                time.sleep(self.token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece, id=reply.id))
+            if run_manager:
+                run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+        yield ChatGenerationChunk(message=self._last_chunk(reply))
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        reply = self._next_reply(messages)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        for piece in self._pieces(reply.text):
+            if self.token_latency:
+                await asyncio.sleep(self.token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=piece, id=reply.id))
+            if run_manager:
+                await run_manager.on_llm_new_token(piece, chunk=chunk)
+            yield chunk
+        yield ChatGenerationChunk(message=self._last_chunk(reply))
+
+
+def _last_human_text(messages: List[BaseMessage]) -> str:
+    for msg in reversed(messages):
+        if isinstance(msg, HumanMessage):
+            return msg.text
+    return ""
+
+
+def _last_json_state(messages: List[BaseMessage]) -> Dict[str, Any]:
+    for msg in reversed(messages):
+        if isinstance(msg, AIMessage) and msg.text.startswith("{"):
+            try:
+                return json.loads(msg.text)
+            except json.JSONDecodeError:
+                return {}
+    return {}
+
+
+# Scripted launch flow: (stage, field, question asked to fill it)
+LAUNCH_FLOW_STEPS = [
+    ("CAMPAIGN_INFO", "objective", "What is your campaign objective? (Traffic / Leads / Sales)"),
+    ("CAMPAIGN_INFO", "geo", "Which country or region should the campaign target?"),
+    ("CAMPAIGN_INFO", "daily_budget", "What daily budget would you like to set?"),
+    ("CAMPAIGN_INFO", "start_time", "When should the campaign start?"),
+    ("CREATIVE", "creative_mode", "Should I generate creatives, or will you provide them? (GENERATE / USER_PROVIDED)"),
+    ("CREATIVE", "product_url", "What is the product or landing page URL?"),
+    ("LAUNCHING", "user_confirmation", "Everything is ready. Shall I launch the campaign? (YES / NO)"),
+]
+
+
+def launch_flow_reply(messages: List[BaseMessage]) -> Dict[str, Any]:
+    """
+    Scripted LaunchingAgent: fills the next missing field of the previous state
+    with the latest user input and asks for the one after it, walking
+    CAMPAIGN_INFO -> CREATIVE -> LAUNCHING until the user confirms.
+    """
+    state = {
+        "stage": "CAMPAIGN_INFO", "state": "ongoing", "objective": None, "geo": None, "daily_budget": None,
+        "start_time": None, "end_time": None, "creative_mode": None, "creative_urls": None, "product_url": None,
+        "user_confirmation": None, "follow_up_question": None,
+    }
+    previous = _last_json_state(messages)
+    state.update({k: v for k, v in previous.items() if k in state})
+    text = _last_human_text(messages).strip()
+
+    pending = [step for step in LAUNCH_FLOW_STEPS if state.get(step[1]) is None]
+    # The first message only opens the flow; later ones answer the pending question
+    if previous and pending and text:
+        _, field, _ = pending[0]
+        if field == "daily_budget":
+            amount = re.search(r"\d+", text)
+            state[field] = int(amount.group()) if amount else None
+        elif field in ("creative_mode", "user_confirmation"):
+            state[field] = text.upper()
+        else:
+            state[field] = text
+        if field == "product_url" and state["creative_mode"] == "GENERATE":
+            # Derived from the product URL so replays of the same conversation match
+            state["creative_urls"] = [f"https://example.com/creatives/{hashlib.sha1(text.encode()).hexdigest()[:8]}.png"]
+        if state[field] is not None:
+            pending = pending[1:]
+
+    if pending:
+        state["stage"], _, state["follow_up_question"] = pending[0]
+    else:
+        state["stage"], state["follow_up_question"] = "LAUNCHING", None
+        state["state"] = "completed" if state["user_confirmation"] == "YES" else "ongoing"
+    return state
+
+
+def stand_in_reply(messages: List[BaseMessage]) -> Any:
+    """
+    Minimal rule-based replies for running the whole app offline: the launching
+    agent walks the scripted launch flow, and the supervisor routes "launch" and
+    "report" requests (and answers during an ongoing launch) to their tools,
+    then relays the tool output.
+    """
+    system_prompt = messages[0].text if messages and isinstance(messages[0], SystemMessage) else ""
+
+    if "Launching Agent" in system_prompt:
+        return launch_flow_reply(messages)
+
+    last = messages[-1] if messages else None
+    if isinstance(last, ToolMessage):
+        mode = {"launching_agent_tool": "launch", "reporting_agent_tool": "reporting"}.get(last.name, "stand_in")
+        return {
+            "context": f"mode={mode} | stage=stand_in | tool={last.name}",
+            "response": last.text,
+        }
+
+    text = _last_human_text(messages)
+    previous_reply = _last_json_state(messages)
+    launch_ongoing = (
+        str(previous_reply.get("context", "")).startswith("mode=launch")
+        and "launch successfully" not in str(previous_reply.get("response", ""))
+    )
+    if "launch" in text.lower() or launch_ongoing:
+        return tool_call_message("launching_agent_tool", {"query": text})
+    campaign_ids = re.findall(r"\d+", text)
+    if "report" in text.lower() and campaign_ids:
+        return tool_call_message("reporting_agent_tool", {"campaign_ids": list(dict.fromkeys(campaign_ids))})
+    return {
+        "context": "mode=clarify | stage=intake | question=launch_or_reporting",
+        "response": "Would you like to launch a campaign or see a report?",
+    }
@@ -0,0 +1,223 @@
+import asyncio
+import importlib.util
+import logging
+import os
+import threading
+from dataclasses import dataclass, asdict
+from typing import Any, Dict
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+@dataclass(frozen=True)
+class HTTPTransportConfig:
+    """Connection-pool settings shared by every model handed out by OpenAILLM."""
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    timeout: float = 60.0
+    http2: bool = True
+
+    @classmethod
+    def from_env(cls) -> "HTTPTransportConfig":
+        return cls(
+            max_connections=_env_int("OPENAI_HTTP_MAX_CONNECTIONS", cls.max_connections),
+            max_keepalive_connections=_env_int("OPENAI_HTTP_MAX_KEEPALIVE", cls.max_keepalive_connections),
+            keepalive_expiry=_env_float("OPENAI_HTTP_KEEPALIVE_EXPIRY", cls.keepalive_expiry),
+            timeout=_env_float("OPENAI_HTTP_TIMEOUT", cls.timeout),
+            http2=os.getenv("OPENAI_HTTP2", "1").lower() not in ("0", "false", "no"),
+        )
+
+
+class _PoolCounters:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def start(self):
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def finish(self, failed: bool):
+        with self._lock:
+            self.in_flight -= 1
+            if failed:
+                self.errors += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+            }
+
+
+class _MeteredTransport(httpx.HTTPTransport):
+    def __init__(self, counters: _PoolCounters, **kwargs):
+        super().__init__(**kwargs)
+        self._counters = counters
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        self._counters.start()
+        failed = True
+        try:
+            response = super().handle_request(request)
+            failed = False
+            return response
+        finally:
+            self._counters.finish(failed)
+
+
+class _MeteredAsyncTransport(httpx.AsyncHTTPTransport):
+    def __init__(self, counters: _PoolCounters, **kwargs):
+        super().__init__(**kwargs)
+        self._counters = counters
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self._counters.start()
+        failed = True
+        try:
+            response = await super().handle_async_request(request)
+            failed = False
+            return response
+        finally:
+            self._counters.finish(failed)
+
+
+def _pool_connections(transport: Any) -> Dict[str, int]:
+    """Open/idle connection counts read from the underlying httpcore pool."""
+    try:
+        connections = list(transport._pool.connections)
+    except AttributeError:
+        return {"open_connections": 0, "idle_connections": 0}
+    idle = sum(1 for c in connections if c.is_idle())
+    return {"open_connections": len(connections), "idle_connections": idle}
+
+
+class _LoopLocalAsyncTransport(httpx.AsyncBaseTransport):
+    """
+    One metered async pool per event loop behind a single transport. httpx async
+    pools belong to the loop they were first used on, but the same client is used
+    from the server's scheduler loop and from asyncio.run() calls on other threads.
+    Pools of loops that have been closed are dropped.
+    """
+
+    def __init__(self, counters: _PoolCounters, **kwargs):
+        self._counters = counters
+        self._kwargs = kwargs
+        self._lock = threading.Lock()
+        self._pools: Dict[asyncio.AbstractEventLoop, _MeteredAsyncTransport] = {}
+
+    def _pool(self) -> _MeteredAsyncTransport:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            pool = self._pools.get(loop)
+            if pool is None:
+                # Connections of a closed loop can't be shut down any more, only forgotten
+                for closed in [l for l in self._pools if l.is_closed()]:
+                    del self._pools[closed]
+                pool = self._pools[loop] = _MeteredAsyncTransport(self._counters, **self._kwargs)
+            return pool
+
+    def pools(self) -> Dict[asyncio.AbstractEventLoop, _MeteredAsyncTransport]:
+        with self._lock:
+            return dict(self._pools)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._pool().handle_async_request(request)
+
+    async def aclose(self) -> None:
+        """Close the running loop's pool."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            pool = self._pools.pop(loop, None)
+        if pool is not None:
+            await pool.aclose()
+
+    def close_all(self) -> None:
+        """Close every loop's pool, each on its own loop; call from outside those loops."""
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for loop, pool in pools.items():
+            try:
+                if loop.is_closed():
+                    continue
+                if loop.is_running():
+                    asyncio.run_coroutine_threadsafe(pool.aclose(), loop).result(timeout=5)
+                else:
+                    loop.run_until_complete(pool.aclose())
+            except Exception as e:
+                logger.warning(f"Could not close an async HTTP pool cleanly: {e}")
+
+
+class SharedHTTPTransport:
+    """
+    Keep-alive, connection-pooled sync and async httpx clients shared across all
+    ChatOpenAI instances, so turns reuse open connections instead of redoing
+    TCP/TLS handshakes. The async client keeps one pool per event loop. HTTP/2 is
+    enabled only when the `h2` package is installed.
+    """
+
+    def __init__(self, config: HTTPTransportConfig = None):
+        self.config = config or HTTPTransportConfig.from_env()
+        self.http2 = self.config.http2 and importlib.util.find_spec("h2") is not None
+        if self.config.http2 and not self.http2:
+            logger.info("HTTP/2 requested but 'h2' is not installed; using HTTP/1.1 keep-alive")
+
+        limits = httpx.Limits(
+            max_connections=self.config.max_connections,
+            max_keepalive_connections=self.config.max_keepalive_connections,
+            keepalive_expiry=self.config.keepalive_expiry,
+        )
+        self._sync_counters = _PoolCounters()
+        self._async_counters = _PoolCounters()
+        self._sync_transport = _MeteredTransport(self._sync_counters, limits=limits, http2=self.http2)
+        self._async_transport = _LoopLocalAsyncTransport(self._async_counters, limits=limits, http2=self.http2)
+
+        self.sync_client = httpx.Client(transport=self._sync_transport, timeout=self.config.timeout)
+        self.async_client = httpx.AsyncClient(transport=self._async_transport, timeout=self.config.timeout)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Pool usage: request/error counters, in-flight and connection counts (async ones summed over loops)."""
+        pools = self._async_transport.pools()
+        async_connections = [_pool_connections(p) for p in pools.values()]
+        return {
+            "config": asdict(self.config),
+            "http2": self.http2,
+            "sync": {**self._sync_counters.snapshot(), **_pool_connections(self._sync_transport)},
+            "async": {
+                **self._async_counters.snapshot(),
+                "open_connections": sum(c["open_connections"] for c in async_connections),
+                "idle_connections": sum(c["idle_connections"] for c in async_connections),
+                "event_loops": len(pools),
+            },
+        }
+
+    async def aclose(self) -> None:
+        """Close the sync client and the running loop's async pool (e.g. on server shutdown, from the server's loop)."""
+        self.sync_client.close()
+        await self._async_transport.aclose()
+
+    def close(self) -> None:
+        """Close the sync client and every loop's async pool; call from outside those loops."""
+        self.sync_client.close()
+        self._async_transport.close_all()
@@ -1,13 +1,59 @@
+import atexit
 import os
+import threading
 from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
 
+from src.agents.agent_registry import agent_registry
+from src.llms.cassette import Cassette, CassetteChatModel
+from src.llms.fake_llm import FakeChatModel, stand_in_reply
+from src.llms.http_transport import SharedHTTPTransport, HTTPTransportConfig
+
+_dotenv_lock = threading.Lock()
+_dotenv_loaded = False
+
+
+def _load_dotenv_once():
+    global _dotenv_loaded
+    with _dotenv_lock:
+        if not _dotenv_loaded:
+            load_dotenv()
+            _dotenv_loaded = True
+
+
 class OpenAILLM:
     def __init__(self):
-        load_dotenv()        
+        _load_dotenv_once()
         self.model_name = "gpt-4.1"
 
+    @staticmethod
+    def get_transport() -> SharedHTTPTransport:
+        """Process-wide pooled HTTP transport injected into every model handed out."""
+        config = HTTPTransportConfig.from_env()
+
+        def build() -> SharedHTTPTransport:
+            transport = SharedHTTPTransport(config)
+            atexit.register(transport.close)
+            return transport
+
+        return agent_registry.get_or_build("http_transport", config, build)
+
+    @classmethod
+    def get_transport_metrics(cls) -> dict:
+        return cls.get_transport().metrics()
+
     def get_llm_model(self) -> ChatOpenAI:
+        # Offline mode: a shared rule-based stand-in model, no API key needed
+        if os.getenv("LLM_STAND_IN", "").lower() in ("1", "true", "yes"):
+            # Optional simulated latency: LLM_STAND_IN_LATENCY (s per call), LLM_STAND_IN_TOKEN_LATENCY (s per token)
+            latency = float(os.getenv("LLM_STAND_IN_LATENCY") or 0)
+            token_latency = float(os.getenv("LLM_STAND_IN_TOKEN_LATENCY") or 0)
+            self.llm = agent_registry.get_or_build(
+                "model",
+                ("stand-in", latency, token_latency),
+                lambda: FakeChatModel(responses=[stand_in_reply], latency=latency, token_latency=token_latency),
+            )
+            return self.with_cassette(self.llm)
 
         os.environ["OPENAI_API_KEY"] = self.api_key = os.getenv("OPENAI_API_KEY")
 
@@ -15,12 +61,44 @@ class OpenAILLM:
             raise ValueError("API key is required to call OpenAI.")
 
         try:
-            self.llm = ChatOpenAI(model=self.model_name)
-            return self.llm
+            transport = self.get_transport()
+
+            # One shared ChatOpenAI per model name (and transport) for the whole process
+            self.llm = agent_registry.get_or_build(
+                "model",
+                (self.model_name, id(transport)),
+                lambda: ChatOpenAI(
+                    model=self.model_name,
+                    http_client=transport.sync_client,
+                    http_async_client=transport.async_client,
+                ),
+            )
+            return self.with_cassette(self.llm)
         except Exception as e:
             error_msg = f"OpenAI initialization error: {e}"
             raise ValueError(error_msg)
-        
+
+    @staticmethod
+    def get_cassette(path: str) -> Cassette:
+        """Shared cassette for `path`, so every model wrapper appends to the same files."""
+        return agent_registry.get_or_build("cassette", os.path.abspath(path), lambda: Cassette(path))
+
+    def with_cassette(self, llm):
+        """
+        Wrap `llm` in a record/replay cassette when LLM_CASSETTE (a file path) is set.
+        LLM_CASSETTE_MODE: auto (default, replay hits and record misses), replay or record.
+        """
+        path = os.getenv("LLM_CASSETTE")
+        if not path:
+            return llm
+        mode = os.getenv("LLM_CASSETTE_MODE", "auto").lower()
+        cassette = self.get_cassette(path)
+        return agent_registry.get_or_build(
+            "model",
+            ("cassette", id(llm), id(cassette), mode),
+            lambda: CassetteChatModel(inner=llm, cassette=cassette, mode=mode),
+        )
+
     @staticmethod
     def get_llm_with_structure_output(llm, state):
         return llm.with_structured_output(state)
@@ -0,0 +1,93 @@
+import logging
+import threading
+from collections import deque
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from src.agents.agent_registry import agent_registry
+
+logger = logging.getLogger(__name__)
+
+
+def response_usage(response: LLMResult) -> Dict[str, Any]:
+    """usage_metadata of the first generation, falling back to the provider's raw token_usage."""
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return usage
+    raw = (response.llm_output or {}).get("token_usage") or {}
+    return {
+        "input_tokens": raw.get("prompt_tokens", 0),
+        "output_tokens": raw.get("completion_tokens", 0),
+        "input_token_details": {"cache_read": (raw.get("prompt_tokens_details") or {}).get("cached_tokens", 0)},
+    }
+
+
+class PromptCacheTracker(BaseCallbackHandler):
+    """
+    Callback handler recording, for every chat model call, how many input tokens
+    the provider served from its prompt cache (usage input_token_details.cache_read)
+    and how many were processed uncached. Calls are attributed to the agent_name
+    and prompt_prefix version passed in the run metadata.
+    """
+
+    def __init__(self, recent: int = 200):
+        self._lock = threading.Lock()
+        self._pending: Dict[UUID, tuple] = {}
+        self._recent: deque = deque(maxlen=recent)
+        self._totals: Dict[tuple, Dict[str, int]] = {}
+
+    def on_chat_model_start(self, serialized: Any, messages: Any, *, run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        metadata = metadata or {}
+        with self._lock:
+            self._pending[run_id] = (metadata.get("agent_name", ""), metadata.get("prompt_prefix", ""))
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self._pending.pop(run_id, None)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            key = self._pending.pop(run_id, None)
+        if key is None:
+            return  # not started through this tracker, or already recorded
+        usage = response_usage(response)
+        input_tokens = usage.get("input_tokens", 0) or 0
+        cached = (usage.get("input_token_details") or {}).get("cache_read", 0) or 0
+        call = {"agent": key[0], "prefix": key[1], "input_tokens": input_tokens, "cached_tokens": cached, "uncached_tokens": input_tokens - cached}
+        logger.debug(f"Model call {call}")
+        with self._lock:
+            self._recent.append(call)
+            totals = self._totals.setdefault(key, {"calls": 0, "input_tokens": 0, "cached_tokens": 0})
+            totals["calls"] += 1
+            totals["input_tokens"] += input_tokens
+            totals["cached_tokens"] += cached
+
+    def recent_calls(self) -> list:
+        with self._lock:
+            return list(self._recent)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = []
+            for (agent, prefix), totals in sorted(self._totals.items()):
+                input_tokens, cached = totals["input_tokens"], totals["cached_tokens"]
+                rows.append({
+                    "agent": agent, "prefix": prefix, **totals,
+                    "uncached_tokens": input_tokens - cached,
+                    "cached_ratio": round(cached / input_tokens, 3) if input_tokens else 0.0,
+                })
+            return {"by_prefix": rows}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._recent.clear()
+            self._totals.clear()
+
+
+def get_prompt_cache_tracker() -> PromptCacheTracker:
+    return agent_registry.get_or_build("prompt_cache_tracker", "default", PromptCacheTracker)
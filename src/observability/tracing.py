@@ -0,0 +1,323 @@
+import atexit
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, Generator, Iterator, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from src.agents.agent_registry import agent_registry
+
+logger = logging.getLogger(__name__)
+
+_enabled = os.getenv("TRACING", "").lower() in ("1", "true", "yes")
+# Per-session override of _enabled (None follows the process setting); see tracing_scope()
+_session_enabled: ContextVar[Optional[bool]] = ContextVar("session_tracing", default=None)
+_current: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+def tracing_enabled() -> bool:
+    enabled = _session_enabled.get()
+    return _enabled if enabled is None else enabled
+
+
+def set_tracing(enabled: bool) -> None:
+    """Turn span recording on or off for the process (TRACING=1 enables it at startup)."""
+    global _enabled
+    _enabled = enabled
+
+
+@contextmanager
+def tracing_scope(enabled: Optional[bool]) -> Iterator[None]:
+    """
+    Record spans in this context, or not, whatever the process setting; used for
+    one session's turns. None follows the process setting.
+    """
+    token = _session_enabled.set(enabled)
+    try:
+        yield
+    finally:
+        _session_enabled.reset(token)
+
+
+class Span:
+    """
+    One timed step of a turn. Spans nest through a context variable, so a span
+    opened inside another (also across threads and tasks started by the agent
+    graph, which copy the context) becomes its child. On exit the span is
+    exported as one JSONL record; root spans are also kept in memory with their
+    children for the app's trace panel.
+    """
+
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent", "attributes", "children",
+                 "start_ts", "_start", "duration_ms", "status", "_token")
+    recording = True
+
+    def __init__(self, name: str, kind: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.name = name
+        self.kind = kind
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent is not None else uuid.uuid4().hex[:16]
+        self.span_id = uuid.uuid4().hex[:16]
+        self.attributes = attributes
+        self.children: List["Span"] = []
+        self.start_ts = time.time()
+        self._start = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.status = "ok"
+        self._token = None
+        if parent is not None:
+            parent.children.append(self)
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def activated(self) -> "_Activation":
+        """Context manager making this span current for a block without ending it."""
+        return _Activation(self)
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        if self.duration_ms is not None:
+            return
+        self.duration_ms = round((time.perf_counter() - self._start) * 1000, 3)
+        if error is not None:
+            self.status = "error"
+            self.attributes["error"] = str(error)
+        get_trace_collector().export(self)
+
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Optional[BaseException], tb: Any) -> bool:
+        try:
+            _current.reset(self._token)
+        except ValueError:
+            # Exited from another context (e.g. a generator closed elsewhere)
+            _current.set(self.parent)
+        self.end(exc)
+        return False
+
+    def to_record(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent is not None else None,
+            "name": self.name,
+            "kind": self.kind,
+            "ts": round(self.start_ts, 6),
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            **self.attributes,
+        }
+
+
+class _Activation:
+    """Makes a span current for a block without ending it (Span.activated())."""
+
+    __slots__ = ("span", "_token")
+
+    def __init__(self, span: Span):
+        self.span = span
+
+    def __enter__(self) -> Span:
+        self._token = _current.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type: Any, exc: Optional[BaseException], tb: Any) -> bool:
+        _current.reset(self._token)
+        return False
+
+
+class _NoopSpan:
+    """Returned by span() while tracing is off: no allocation, no timing, no export."""
+
+    recording = False
+    trace_id = None
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def activated(self) -> "_NoopSpan":
+        return self
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Optional[BaseException], tb: Any) -> bool:
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str, kind: str = "internal", **attributes: Any) -> Any:
+    """Context manager for a child span of the current one (or a new trace). Costs a flag check or two when tracing is off."""
+    if not tracing_enabled():
+        return _NOOP
+    return Span(name, kind, _current.get(), attributes)
+
+
+def traced_iter(current: Any, events: Generator) -> Iterator:
+    """
+    Yield from `events` with `current` as the current span only while `events`
+    runs, never while the consumer holds an item (a span entered around `yield`
+    would leak into the consumer). Ends the span once `events` is done or closed.
+    """
+    error = None
+    try:
+        while True:
+            with current.activated():
+                try:
+                    item = next(events)
+                except StopIteration:
+                    return
+            yield item
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        with current.activated():
+            events.close()
+        current.end(error)
+
+
+async def traced_aiter(current: Any, events: AsyncGenerator) -> AsyncIterator:
+    """Async variant of traced_iter()."""
+    error = None
+    try:
+        while True:
+            with current.activated():
+                try:
+                    item = await events.__anext__()
+                except StopAsyncIteration:
+                    return
+            yield item
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        with current.activated():
+            await events.aclose()
+        current.end(error)
+
+
+def current_span() -> Any:
+    """The innermost open span, for adding attributes; a no-op span when there is none."""
+    if not tracing_enabled():
+        return _NOOP
+    return _current.get() or _NOOP
+
+
+class TraceCollector:
+    """Exports finished spans to a JSONL file (background writer) and keeps the latest root spans in memory."""
+
+    def __init__(self, path: str, keep: int = 50):
+        # Same batched, rotating background writer as the turn log (imported here: turn_log annotates spans)
+        from src.observability.turn_log import TurnLogConfig, TurnLogWriter
+        self.writer = TurnLogWriter(TurnLogConfig(path=path))
+        self._recent: deque = deque(maxlen=keep)
+        self._lock = threading.Lock()
+
+    def export(self, finished: Span) -> None:
+        self.writer.write(finished.to_record())
+        if finished.parent is None:
+            with self._lock:
+                self._recent.append(finished)
+
+    def recent(self) -> List[Span]:
+        with self._lock:
+            return list(self._recent)
+
+    def find(self, trace_id: str) -> Optional[Span]:
+        with self._lock:
+            return next((s for s in reversed(self._recent) if s.trace_id == trace_id), None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.writer.stats(), "recent_traces": len(self._recent)}
+
+
+def get_trace_collector() -> TraceCollector:
+    """Process-wide collector writing to TRACE_PATH (default logs/traces.jsonl)."""
+    path = os.path.abspath(os.getenv("TRACE_PATH", "logs/traces.jsonl"))
+
+    def build() -> TraceCollector:
+        collector = TraceCollector(path)
+        atexit.register(collector.writer.close)
+        return collector
+
+    return agent_registry.get_or_build("trace_collector", path, build)
+
+
+def format_trace(root: Span) -> str:
+    """Indented text tree of a trace: duration, tokens and payload sizes per span."""
+    lines = []
+
+    def walk(node: Span, depth: int) -> None:
+        details = [f"{node.duration_ms:.1f} ms" if node.duration_ms is not None else "open"]
+        for key in ("input_tokens", "output_tokens", "cached_tokens", "input_chars", "output_chars"):
+            if node.attributes.get(key) is not None:
+                details.append(f"{key}={node.attributes[key]}")
+        if node.status != "ok":
+            details.append(node.status)
+        lines.append(f"{'  ' * depth}{node.name} [{node.kind}] " + " ".join(details))
+        for child in sorted(node.children, key=lambda c: c.start_ts):
+            walk(child, depth + 1)
+
+    walk(root, 0)
+    return "\n".join(lines)
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """Opens a `model` span (child of the current span) for every chat model call, with token counts and payload sizes."""
+
+    run_inline = True
+
+    def __init__(self):
+        self._open: Dict[UUID, Span] = {}
+
+    def on_chat_model_start(self, serialized: Any, messages: Any, *, run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        if not tracing_enabled():
+            return
+        metadata = metadata or {}
+        flat = [m for batch in messages for m in batch]
+        self._open[run_id] = Span("model", "llm", _current.get(), {
+            "agent": metadata.get("agent_name"),
+            "model": metadata.get("ls_model_name"),
+            "input_messages": len(flat),
+            "input_chars": sum(len(m.text) for m in flat),
+        })
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        model_span = self._open.pop(run_id, None)
+        if model_span is None:
+            return
+        message = getattr(response.generations[0][0], "message", None) if response.generations and response.generations[0] else None
+        usage = getattr(message, "usage_metadata", None) or {}
+        model_span.set(
+            input_tokens=usage.get("input_tokens"),
+            output_tokens=usage.get("output_tokens"),
+            cached_tokens=(usage.get("input_token_details") or {}).get("cache_read"),
+            output_chars=len(message.text) if message is not None else None,
+            tool_calls=[tc["name"] for tc in getattr(message, "tool_calls", None) or []] or None,
+        )
+        model_span.end()
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        model_span = self._open.pop(run_id, None)
+        if model_span is not None:
+            model_span.end(error)
+
+
+def get_tracing_handler() -> TracingCallbackHandler:
+    return agent_registry.get_or_build("tracing_handler", "default", TracingCallbackHandler)
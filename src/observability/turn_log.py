@@ -0,0 +1,234 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from src.agents.agent_registry import agent_registry
+from src.observability.tracing import current_span
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+@dataclass(frozen=True)
+class TurnLogConfig:
+    """Where and how agent turns are logged."""
+    path: str = "logs/turns.jsonl"
+    max_bytes: int = 10 * 1024 * 1024
+    rotate_seconds: float = 24 * 3600.0
+    backups: int = 5
+    flush_interval: float = 1.0
+    batch_size: int = 256
+    max_queue: int = 10000
+
+    @classmethod
+    def from_env(cls) -> "TurnLogConfig":
+        return cls(
+            path=os.getenv("TURN_LOG_PATH", cls.path),
+            max_bytes=_env_int("TURN_LOG_MAX_BYTES", cls.max_bytes),
+            rotate_seconds=_env_float("TURN_LOG_ROTATE_SECONDS", cls.rotate_seconds),
+            backups=_env_int("TURN_LOG_BACKUPS", cls.backups),
+            flush_interval=_env_float("TURN_LOG_FLUSH_INTERVAL", cls.flush_interval),
+        )
+
+
+def _encode_default(obj: Any) -> Any:
+    # LangChain messages and pydantic models
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(exclude_none=True)
+    return str(obj)
+
+
+def compact_message(msg: Any) -> Dict[str, Any]:
+    """Small JSON-friendly view of a message: type, content and tool-call fields only."""
+    if isinstance(msg, dict):
+        return msg
+    record = {"type": getattr(msg, "type", type(msg).__name__), "content": getattr(msg, "content", str(msg))}
+    for k in ("name", "tool_call_id", "tool_calls"):
+        value = getattr(msg, k, None)
+        if value:
+            record[k] = value
+    return record
+
+
+class TurnLogWriter:
+    """
+    Background JSONL writer for per-turn records.
+    write() only enqueues (and drops the record if the queue is full), so logging
+    never blocks an agent call; a daemon thread serializes records, appends them
+    in batches and rotates the file by size and age, keeping `backups` old files.
+    """
+
+    def __init__(self, config: Optional[TurnLogConfig] = None):
+        self.config = config or TurnLogConfig()
+        self.path = os.path.abspath(self.config.path)
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=self.config.max_queue)
+        self._file = None
+        self._opened_at = 0.0
+        self._stats_lock = threading.Lock()
+        self._stats = {"written": 0, "dropped": 0, "errors": 0, "flushes": 0, "rotations": 0}
+        self._thread = threading.Thread(target=self._run, name="turn-log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, record: Dict[str, Any]) -> bool:
+        """Queue one record; returns False if it was dropped because the writer is behind."""
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            with self._stats_lock:
+                self._stats["dropped"] += 1
+            return False
+
+    def _open(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._opened_at = time.time()
+
+    def _rotate_if_needed(self) -> None:
+        if self._file is None:
+            self._open()
+            return
+        too_big = self._file.tell() >= self.config.max_bytes
+        too_old = time.time() - self._opened_at >= self.config.rotate_seconds
+        if not (too_big or too_old) or self._file.tell() == 0:
+            return
+
+        self._file.close()
+        stem, ext = os.path.splitext(self.path)
+        rotated = f"{stem}.{time.strftime('%Y%m%d-%H%M%S')}{ext}"
+        n = 1
+        while os.path.exists(rotated):
+            rotated = f"{stem}.{time.strftime('%Y%m%d-%H%M%S')}-{n}{ext}"
+            n += 1
+        os.replace(self.path, rotated)
+        self._prune_backups(stem, ext)
+        with self._stats_lock:
+            self._stats["rotations"] += 1
+        self._open()
+
+    def _prune_backups(self, stem: str, ext: str) -> None:
+        directory, base = os.path.split(stem)
+        backups = sorted(
+            (os.path.join(directory, name) for name in os.listdir(directory)
+             if name.startswith(base + ".") and name.endswith(ext) and name != os.path.basename(self.path)),
+            key=os.path.getmtime,
+        )
+        for path in backups[:-self.config.backups] if self.config.backups else backups:
+            os.remove(path)
+
+    def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        if not batch:
+            return
+        try:
+            self._rotate_if_needed()
+            lines = [json.dumps(r, ensure_ascii=False, separators=(",", ":"), default=_encode_default) for r in batch]
+            self._file.write("\n".join(lines) + "\n")
+            self._file.flush()
+            with self._stats_lock:
+                self._stats["written"] += len(batch)
+                self._stats["flushes"] += 1
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} turn log record(s): {e}")
+            with self._stats_lock:
+                self._stats["errors"] += 1
+
+    def _run(self) -> None:
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self.config.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._flush(batch)
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                return
+            if item is not None:
+                batch.append(item)
+
+            if len(batch) >= self.config.batch_size or time.monotonic() >= deadline:
+                self._flush(batch)
+                batch = []
+                deadline = time.monotonic() + self.config.flush_interval
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return {**self._stats, "queued": self._queue.qsize()}
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush pending records and stop the writer thread."""
+        if not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+
+def get_turn_log_writer() -> TurnLogWriter:
+    """Process-wide writer configured from TURN_LOG_* environment variables."""
+    def build() -> TurnLogWriter:
+        writer = TurnLogWriter(TurnLogConfig.from_env())
+        atexit.register(writer.close)
+        return writer
+
+    path = os.path.abspath(os.getenv("TURN_LOG_PATH", TurnLogConfig.path))
+    return agent_registry.get_or_build("turn_log_writer", path, build)
+
+
+def log_turn(
+    agent: str,
+    started: float,
+    conversation_id: Optional[str] = None,
+    messages: Optional[List[Any]] = None,
+    error: Optional[str] = None,
+    **fields: Any,
+) -> None:
+    """
+    Queue one turn record. `started` is a time.perf_counter() value; `messages`
+    should be only the messages produced during the turn (they are serialized on
+    the writer thread).
+    """
+    record = {
+        "ts": round(time.time(), 3),
+        "conversation_id": conversation_id,
+        "agent": agent,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+        "status": "error" if error else "ok",
+    }
+    if error:
+        record["error"] = error
+    if messages:
+        record["messages"] = [compact_message(m) for m in messages]
+    record.update(fields)
+
+    # The agent's span (if tracing) gets the same turn summary, minus the messages
+    active = current_span()
+    if active.recording:
+        active.set(**fields)
+        if error:
+            active.status = "error"
+            active.set(error=error)
+    try:
+        get_turn_log_writer().write(record)
+    except Exception as e:
+        logger.warning(f"Turn log unavailable: {e}")
@@ -0,0 +1,288 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from src.agents.agent_registry import agent_registry
+from src.conversation.conversation_store import ConversationStore, get_conversation_store
+from src.conversation.session import current_conversation_id
+from src.observability.prompt_cache import response_usage
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ModelPrice:
+    """USD per 1M tokens."""
+    input: float
+    cached_input: float
+    output: float
+
+
+MODEL_PRICES = {
+    "gpt-4.1": ModelPrice(2.00, 0.50, 8.00),
+    "gpt-4.1-mini": ModelPrice(0.40, 0.10, 1.60),
+    "gpt-4.1-nano": ModelPrice(0.10, 0.025, 0.40),
+    "gpt-4o": ModelPrice(2.50, 1.25, 10.00),
+    "gpt-4o-mini": ModelPrice(0.15, 0.075, 0.60),
+}
+# The stand-in and unknown models are priced as the model the app runs (OpenAILLM)
+DEFAULT_PRICED_MODEL = "gpt-4.1"
+
+
+def price_for(model: Optional[str]) -> ModelPrice:
+    """Price of `model`, matching dated snapshots (gpt-4.1-2025-04-14) by the longest known prefix."""
+    if model:
+        for name in sorted(MODEL_PRICES, key=len, reverse=True):
+            if model.startswith(name):
+                return MODEL_PRICES[name]
+    return MODEL_PRICES[DEFAULT_PRICED_MODEL]
+
+
+@dataclass
+class Usage:
+    """Token and cost totals for one slice (conversation, agent or tool)."""
+    calls: int = 0
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float = 0.0
+    tool_calls: int = 0
+
+    @property
+    def tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    def add(self, other: "Usage") -> None:
+        self.calls += other.calls
+        self.input_tokens += other.input_tokens
+        self.cached_tokens += other.cached_tokens
+        self.output_tokens += other.output_tokens
+        self.cost_usd += other.cost_usd
+        self.tool_calls += other.tool_calls
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "cost_usd": round(self.cost_usd, 6), "tokens": self.tokens}
+
+    @classmethod
+    def from_totals(cls, totals: Dict[str, float]) -> "Usage":
+        """Usage from stored totals, which may come back as floats."""
+        return cls(**{name: type(default)(totals.get(name, 0)) for name, default in asdict(cls()).items()})
+
+
+def call_usage(model: Optional[str], input_tokens: int, cached_tokens: int, output_tokens: int) -> Usage:
+    price = price_for(model)
+    cost = ((input_tokens - cached_tokens) * price.input + cached_tokens * price.cached_input + output_tokens * price.output) / 1_000_000
+    return Usage(calls=1, input_tokens=input_tokens, cached_tokens=cached_tokens, output_tokens=output_tokens, cost_usd=cost)
+
+
+@dataclass(frozen=True)
+class ConversationBudget:
+    """
+    Per-conversation spend limit. Past `degrade_at` of either limit a turn is
+    served in degraded mode (tighter history budget); at the limit the supervisor
+    model is no longer called. A limit of 0 means unlimited.
+    """
+    max_usd: float = 0.0
+    max_tokens: int = 0
+    degrade_at: float = 0.8
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_usd > 0 or self.max_tokens > 0
+
+    def used_ratio(self, usage: Usage) -> float:
+        ratios = []
+        if self.max_usd > 0:
+            ratios.append(usage.cost_usd / self.max_usd)
+        if self.max_tokens > 0:
+            ratios.append(usage.tokens / self.max_tokens)
+        return max(ratios, default=0.0)
+
+    def status(self, usage: Usage) -> str:
+        ratio = self.used_ratio(usage)
+        if ratio >= 1.0:
+            return "exhausted"
+        if ratio >= self.degrade_at:
+            return "degraded"
+        return "ok"
+
+    @classmethod
+    def from_env(cls) -> "ConversationBudget":
+        return cls(
+            max_usd=float(os.getenv("CONVERSATION_BUDGET_USD") or 0),
+            max_tokens=int(os.getenv("CONVERSATION_BUDGET_TOKENS") or 0),
+            degrade_at=float(os.getenv("CONVERSATION_BUDGET_DEGRADE_AT") or 0.8),
+        )
+
+
+# Tool currently running in this context; model calls made inside it are charged to it
+_current_tool: ContextVar[Optional[str]] = ContextVar("current_tool", default=None)
+
+
+class UsageLedger(BaseCallbackHandler):
+    """
+    Callback handler charging every chat model call (tokens and USD) to its
+    conversation, agent (run metadata agent_name) and tool (the tool_scope() it
+    runs in). Keeps the split by agent and tool per conversation, in memory, for
+    the most recent `max_conversations`. Given a store, each conversation's totals
+    are also added to it, and budgets are checked against those, so a budget
+    holds across workers, restarts and eviction.
+    """
+
+    run_inline = True
+
+    def __init__(self, budget: Optional[ConversationBudget] = None, max_conversations: int = 10000, store: Optional[ConversationStore] = None):
+        self.budget = budget or ConversationBudget()
+        self.max_conversations = max_conversations
+        self.store = store
+        self._lock = threading.Lock()
+        self._pending: Dict[UUID, Tuple[Optional[str], str, Optional[str], Optional[str]]] = {}
+        self._conversations: "OrderedDict[str, Dict[Tuple[str, str], Usage]]" = OrderedDict()
+        self._by_agent: Dict[str, Usage] = {}
+        self._by_tool: Dict[str, Usage] = {}
+        self._total = Usage()
+        self._rejected = 0
+
+    def on_chat_model_start(self, serialized: Any, messages: Any, *, run_id: UUID, metadata: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+        metadata = metadata or {}
+        with self._lock:
+            self._pending[run_id] = (current_conversation_id(), metadata.get("agent_name", ""), _current_tool.get(), metadata.get("ls_model_name"))
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self._pending.pop(run_id, None)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            pending = self._pending.pop(run_id, None)
+        if pending is None:
+            return
+        conversation_id, agent, tool, model = pending
+        usage = response_usage(response)
+        message = getattr(response.generations[0][0], "message", None) if response.generations and response.generations[0] else None
+        model = (getattr(message, "response_metadata", None) or {}).get("model_name") or model
+        self._charge(conversation_id, agent, tool, call_usage(
+            model,
+            usage.get("input_tokens", 0) or 0,
+            (usage.get("input_token_details") or {}).get("cache_read", 0) or 0,
+            usage.get("output_tokens", 0) or 0,
+        ))
+
+    def _charge(self, conversation_id: Optional[str], agent: str, tool: Optional[str], usage: Usage) -> None:
+        with self._lock:
+            self._total.add(usage)
+            if agent:
+                self._by_agent.setdefault(agent, Usage()).add(usage)
+            if tool:
+                self._by_tool.setdefault(tool, Usage()).add(usage)
+            if conversation_id:
+                slices = self._conversations.get(conversation_id)
+                if slices is None:
+                    slices = self._conversations[conversation_id] = {}
+                    if len(self._conversations) > self.max_conversations:
+                        self._conversations.popitem(last=False)
+                else:
+                    self._conversations.move_to_end(conversation_id)
+                slices.setdefault((agent, tool or ""), Usage()).add(usage)
+        if conversation_id and self.store is not None:
+            try:
+                self.store.add_usage(conversation_id, {name: value for name, value in asdict(usage).items() if value})
+            except Exception as e:
+                logger.warning(f"Could not store usage of conversation {conversation_id}: {e}")
+
+    def record_tool_call(self, tool: str) -> None:
+        """Count one tool invocation for the current conversation."""
+        self._charge(current_conversation_id(), "", tool, Usage(tool_calls=1))
+
+    def conversation_usage(self, conversation_id: Optional[str]) -> Usage:
+        """Totals of the conversation: from the store when there is one, else what this process charged."""
+        if conversation_id and self.store is not None:
+            return Usage.from_totals(self.store.usage(conversation_id))
+        total = Usage()
+        with self._lock:
+            for usage in (self._conversations.get(conversation_id) or {}).values():
+                total.add(usage)
+        return total
+
+    def budget_status(self, conversation_id: Optional[str]) -> str:
+        """ok, degraded or exhausted for the conversation under the ledger's budget."""
+        if not self.budget.enabled or not conversation_id:
+            return "ok"
+        return self.budget.status(self.conversation_usage(conversation_id))
+
+    def record_rejection(self) -> None:
+        with self._lock:
+            self._rejected += 1
+
+    def conversation_report(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Totals for one conversation, split by agent and by tool; None if it made no
+        charged calls in this process. The split covers this process's calls; the
+        budget section uses the stored totals.
+        """
+        with self._lock:
+            slices = self._conversations.get(conversation_id)
+            if slices is None:
+                return None
+            slices = {key: Usage(**asdict(usage)) for key, usage in slices.items()}
+        total, by_agent, by_tool = Usage(), {}, {}
+        for (agent, tool), usage in slices.items():
+            total.add(usage)
+            if agent:
+                by_agent.setdefault(agent, Usage()).add(usage)
+            if tool:
+                by_tool.setdefault(tool, Usage()).add(usage)
+        report = {
+            "conversation_id": conversation_id,
+            **total.to_dict(),
+            "by_agent": {name: u.to_dict() for name, u in sorted(by_agent.items())},
+            "by_tool": {name: u.to_dict() for name, u in sorted(by_tool.items())},
+        }
+        if self.budget.enabled:
+            report["budget"] = {
+                "max_usd": self.budget.max_usd or None,
+                "max_tokens": self.budget.max_tokens or None,
+                "used_ratio": round(self.budget.used_ratio(self.conversation_usage(conversation_id)), 3),
+                "status": self.budget_status(conversation_id),
+            }
+        return report
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._total.to_dict(),
+                "conversations": len(self._conversations),
+                "budget_rejections": self._rejected,
+                "by_agent": {name: u.to_dict() for name, u in sorted(self._by_agent.items())},
+                "by_tool": {name: u.to_dict() for name, u in sorted(self._by_tool.items())},
+            }
+
+
+def get_usage_ledger() -> UsageLedger:
+    """
+    Process-wide ledger; CONVERSATION_BUDGET_USD / CONVERSATION_BUDGET_TOKENS set the
+    per-conversation budget, whose totals are kept in the conversation store.
+    """
+    budget = ConversationBudget.from_env()
+    store = get_conversation_store() if budget.enabled else None
+    return agent_registry.get_or_build("usage_ledger", (budget, id(store)), lambda: UsageLedger(budget, store=store))
+
+
+@contextmanager
+def tool_scope(tool: str) -> Iterator[None]:
+    """Charge model calls made while a tool runs (e.g. its sub-agent) to that tool."""
+    get_usage_ledger().record_tool_call(tool)
+    token = _current_tool.set(tool)
+    try:
+        yield
+    finally:
+        _current_tool.reset(token)
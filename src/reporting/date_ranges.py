@@ -0,0 +1,102 @@
+import re
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import List, Optional
+
+DEFAULT_RANGE = "last_7d"
+
+_LAST_N = re.compile(r"^last[_ ]?(\d{1,4})[_ ]?(?:d|days?)$", re.I)
+_ISO_DAY = r"\d{4}-\d{2}-\d{2}"
+_BETWEEN = re.compile(rf"^({_ISO_DAY})\s*(?:\.\.|to|/|–|—)\s*({_ISO_DAY})$", re.I)
+
+# Range specs as they appear in free text (for the pre-router)
+DATE_RANGE_IN_TEXT = re.compile(
+    rf"\b(?:{_ISO_DAY}\s*(?:\.\.|to|–|—)\s*{_ISO_DAY}|{_ISO_DAY}|last[_ ]?\d{{1,4}}[_ ]?(?:d|days?)|today|yesterday|this[_ ]month|last[_ ]month)\b",
+    re.I,
+)
+
+_MONTHS = r"jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|june?|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?"
+# Any mention of a period, whether or not parse_date_range understands it: "last week",
+# "past 30 days", "q3", "march" ("may" only next to a number, it is usually a verb)
+PERIOD_IN_TEXT = re.compile(
+    r"\b(?:(?:last|past|this|previous|prior|current|next)\s+(?:\d{1,4}\s+)?)?"
+    rf"(?:today|yesterday|tomorrow|days?|weeks?|weekends?|fortnight|months?|quarters?|q[1-4]|years?|ytd|qtd|mtd|wtd|since|{_MONTHS}|may(?=\s+\d)|(?<=\d\s)may)\b",
+    re.I,
+)
+# A month next to a year ("march 2025", "2025 mar"): the year is part of the period
+MONTH_YEAR_IN_TEXT = re.compile(rf"\b(?:(?:{_MONTHS}|may)\s+\d{{4}}|\d{{4}}\s+(?:{_MONTHS}|may))\b", re.I)
+
+
+@dataclass(frozen=True)
+class DateRange:
+    """Inclusive range of days, with the spec it was parsed from as label."""
+    start: date
+    end: date
+    label: str
+
+    @property
+    def days(self) -> int:
+        return (self.end - self.start).days + 1
+
+
+def parse_date_range(spec: str, today: Optional[date] = None) -> DateRange:
+    """
+    Parse a range spec: today, yesterday, last_7d (last 7 days up to yesterday),
+    this_month, last_month, 2025-01-01..2025-01-31 or a single ISO day.
+    Raises ValueError for anything else.
+    """
+    today = today or date.today()
+    text = " ".join(spec.strip().lower().split())
+    key = text.replace(" ", "_")
+
+    if key == "today":
+        return DateRange(today, today, "today")
+    if key == "yesterday":
+        day = today - timedelta(days=1)
+        return DateRange(day, day, "yesterday")
+    if key == "this_month":
+        return DateRange(today.replace(day=1), today, "this_month")
+    if key == "last_month":
+        end = today.replace(day=1) - timedelta(days=1)
+        return DateRange(end.replace(day=1), end, "last_month")
+
+    match = _LAST_N.match(text)
+    if match:
+        days = int(match.group(1))
+        if days < 1:
+            raise ValueError(f"Empty date range: {spec}")
+        end = today - timedelta(days=1)
+        return DateRange(end - timedelta(days=days - 1), end, f"last_{days}d")
+
+    match = _BETWEEN.match(text)
+    if match:
+        start, end = date.fromisoformat(match.group(1)), date.fromisoformat(match.group(2))
+        if end < start:
+            raise ValueError(f"Date range ends before it starts: {spec}")
+        return DateRange(start, end, f"{start.isoformat()}..{end.isoformat()}")
+
+    try:
+        day = date.fromisoformat(text)
+    except ValueError:
+        raise ValueError(f"Unknown date range: {spec!r} (use e.g. last_7d, yesterday, this_month or 2025-01-01..2025-01-31)")
+    return DateRange(day, day, day.isoformat())
+
+
+def find_date_ranges(text: str) -> List[str]:
+    """Range specs mentioned in free text, in order, without duplicates."""
+    found: List[str] = []
+    for match in DATE_RANGE_IN_TEXT.finditer(text):
+        spec = " ".join(match.group().split())
+        if spec.lower() not in (f.lower() for f in found):
+            found.append(spec)
+    return found
+
+
+def period_phrases(text: str) -> List[str]:
+    """Lowercased mentions of a period in free text ("last week", "past 30 days", "march"), in order, without duplicates."""
+    return list(dict.fromkeys(" ".join(m.group().lower().split()) for m in PERIOD_IN_TEXT.finditer(text)))
+
+
+def unparsed_period_phrases(text: str) -> List[str]:
+    """Period mentions left once the range specs find_date_ranges() understands are removed."""
+    return period_phrases(DATE_RANGE_IN_TEXT.sub(" ", text))
@@ -0,0 +1,327 @@
+"""
+Streaming ingestion of Meta Ads insight exports (CSV or JSONL, one row per
+campaign and day) into the metrics store. Files are read in chunks of lines
+by a generator, so memory stays bounded by the chunk size whatever the file
+size. Rows are deduplicated by (campaign, date): the last row read wins, both
+within a chunk and against what is already stored, which makes re-delivered
+and restated exports (e.g. conversions attributed days later) safe to load.
+Running all-time totals are updated by each row's delta instead of being
+recomputed, and the byte offset reached in every file is saved, so re-running
+picks up appended rows and new files only.
+
+    python -m src.reporting.ingest exports/ --store data/metrics_store [--follow 30]
+"""
+import argparse
+import csv
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.reporting.metrics_source import BASE_METRICS
+from src.reporting.metrics_store import N_METRICS, MetricsStore
+
+logger = logging.getLogger(__name__)
+
+CHUNK_ROWS = 50_000
+EXPORT_PATTERNS = ("*.csv", "*.jsonl", "*.ndjson")
+
+# Export column names accepted for each field (Insights API and Ads Manager spellings)
+FIELD_ALIASES = {
+    "campaign_id": ("campaign_id", "campaign id", "campaign"),
+    "date": ("date_start", "date", "day", "reporting starts"),
+    "spend": ("spend", "amount spent", "amount_spent"),
+    "impressions": ("impressions",),
+    "clicks": ("clicks", "link_clicks", "link clicks"),
+    "conversions": ("conversions", "purchases", "results"),
+    "revenue": ("revenue", "purchase_value", "conversion_value", "purchases conversion value"),
+}
+
+
+@dataclass
+class Chunk:
+    """Parsed rows of one chunk; `values` columns follow BASE_METRICS."""
+    campaign_ids: List[str]
+    days: np.ndarray
+    values: np.ndarray
+    bad_rows: int = 0
+
+
+def _column_map(header: Sequence[str]) -> Dict[str, int]:
+    positions = {name.strip().lower(): i for i, name in enumerate(header)}
+    columns = {}
+    for field_name, aliases in FIELD_ALIASES.items():
+        position = next((positions[a] for a in aliases if a in positions), None)
+        if position is not None:
+            columns[field_name] = position
+    missing = {"campaign_id", "date"} - set(columns)
+    if missing:
+        raise ValueError(f"Export is missing required columns: {', '.join(sorted(missing))}")
+    return columns
+
+
+def _to_float(values: List[str]) -> np.ndarray:
+    try:
+        return np.array(values, dtype=np.float64)
+    except ValueError:
+        # Blank cells count as 0; malformed ones become NaN and their row is dropped
+        out = np.empty(len(values))
+        for i, v in enumerate(values):
+            try:
+                out[i] = float(v) if v != "" else 0.0
+            except (TypeError, ValueError):
+                out[i] = np.nan
+        return out
+
+
+class _DayParser:
+    """ISO date (or datetime) string -> ordinal, memoized since exports repeat few distinct days."""
+
+    def __init__(self):
+        self._cache: Dict[str, int] = {}
+
+    def __call__(self, text: str) -> int:
+        ordinal = self._cache.get(text)
+        if ordinal is None:
+            try:
+                ordinal = date.fromisoformat(text[:10]).toordinal()
+            except ValueError:
+                ordinal = -1
+            if len(self._cache) < 100_000:
+                self._cache[text] = ordinal
+        return ordinal
+
+
+def _build_chunk(campaign_ids: List[str], day_texts: List[str], metric_columns: Dict[str, List[Any]], parse_day: _DayParser) -> Chunk:
+    n = len(campaign_ids)
+    days = np.fromiter((parse_day(d) for d in day_texts), dtype=np.int64, count=n)
+    values = np.zeros((n, N_METRICS))
+    for j, metric in enumerate(BASE_METRICS):
+        if metric in metric_columns:
+            values[:, j] = _to_float(metric_columns[metric])
+    valid = (days > 0) & ~np.isnan(values).any(axis=1) & np.fromiter((bool(c) for c in campaign_ids), dtype=bool, count=n)
+    if valid.all():
+        return Chunk(campaign_ids, days, values)
+    keep = np.flatnonzero(valid)
+    return Chunk([campaign_ids[i] for i in keep], days[keep], values[keep], bad_rows=n - len(keep))
+
+
+def _parse_csv(lines: List[bytes], columns: Dict[str, int], parse_day: _DayParser) -> Chunk:
+    rows = [r for r in csv.reader(line.decode("utf-8") for line in lines) if r]
+    width = max(columns.values()) + 1
+    bad = sum(1 for r in rows if len(r) < width)
+    if bad:
+        rows = [r for r in rows if len(r) >= width]
+    fields = list(zip(*rows)) if rows else [()] * width
+    chunk = _build_chunk(
+        [c.strip() for c in fields[columns["campaign_id"]]],
+        list(fields[columns["date"]]),
+        {m: list(fields[columns[m]]) for m in BASE_METRICS if m in columns},
+        parse_day,
+    )
+    chunk.bad_rows += bad
+    return chunk
+
+
+def _parse_jsonl(lines: List[bytes], parse_day: _DayParser) -> Chunk:
+    campaign_ids, day_texts, bad = [], [], 0
+    metric_columns: Dict[str, List[Any]] = {m: [] for m in BASE_METRICS}
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = {k.lower(): v for k, v in json.loads(line).items()}
+        except (json.JSONDecodeError, AttributeError):
+            bad += 1
+            continue
+        values = {f: next((record[a] for a in aliases if a in record), None) for f, aliases in FIELD_ALIASES.items()}
+        campaign_ids.append(str(values["campaign_id"] or "").strip())
+        day_texts.append(str(values["date"] or ""))
+        for metric in BASE_METRICS:
+            metric_columns[metric].append(values[metric] if values[metric] is not None else 0)
+    chunk = _build_chunk(campaign_ids, day_texts, metric_columns, parse_day)
+    chunk.bad_rows += bad
+    return chunk
+
+
+def read_chunks(path: str, start_offset: int = 0, chunk_rows: int = CHUNK_ROWS) -> Iterator[Tuple[Chunk, int]]:
+    """
+    Yield (chunk, byte offset after it) from `start_offset` on. A trailing line
+    without a newline is left for the next run, since the exporter may still be
+    writing it.
+    """
+    is_jsonl = path.endswith((".jsonl", ".ndjson"))
+    parse_day = _DayParser()
+    with open(path, "rb") as f:
+        columns = None
+        if not is_jsonl:
+            header = f.readline()
+            if not header.endswith(b"\n"):
+                return
+            columns = _column_map(next(csv.reader([header.decode("utf-8-sig")])))
+            start_offset = max(start_offset, f.tell())
+        f.seek(start_offset)
+
+        offset, batch = start_offset, []
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            offset += len(line)
+            batch.append(line)
+            if len(batch) >= chunk_rows:
+                yield (_parse_jsonl(batch, parse_day) if is_jsonl else _parse_csv(batch, columns, parse_day)), offset
+                batch = []
+        if batch:
+            yield (_parse_jsonl(batch, parse_day) if is_jsonl else _parse_csv(batch, columns, parse_day)), offset
+
+
+def last_occurrences(rows: np.ndarray, days: np.ndarray) -> np.ndarray:
+    """Indexes of the last row for every distinct (row, day) pair, in input order."""
+    keys = rows * (1 << 24) + (days - days.min())
+    _, reversed_first = np.unique(keys[::-1], return_index=True)
+    return np.sort(len(keys) - 1 - reversed_first)
+
+
+@dataclass
+class IngestStats:
+    files: int = 0
+    rows_read: int = 0
+    rows_written: int = 0
+    duplicates: int = 0
+    restated: int = 0
+    bad_rows: int = 0
+    bytes_read: int = 0
+    seconds: float = 0.0
+    per_file: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "files": self.files, "rows_read": self.rows_read, "rows_written": self.rows_written,
+            "duplicates": self.duplicates, "restated": self.restated, "bad_rows": self.bad_rows,
+            "mib_read": round(self.bytes_read / 2**20, 1), "seconds": round(self.seconds, 2),
+            "rows_per_s": round(self.rows_read / self.seconds) if self.seconds else 0,
+        }
+
+
+class IngestPipeline:
+    """
+    Loads export files into a MetricsStore chunk by chunk and keeps all-time
+    totals per campaign up to date from the per-row deltas. The byte offset
+    reached in each file is kept in the store directory (ingest_state.json).
+    """
+
+    def __init__(self, store: MetricsStore, chunk_rows: int = CHUNK_ROWS):
+        self.store = store
+        self.chunk_rows = chunk_rows
+        self._lock = threading.Lock()
+        self._state_path = os.path.join(store.root, "ingest_state.json")
+        self._offsets: Dict[str, Dict[str, int]] = {}
+        if os.path.exists(self._state_path):
+            with open(self._state_path, encoding="utf-8") as f:
+                self._offsets = json.load(f)
+        # Seeded from what is already stored, then updated incrementally
+        self._totals = store.campaign_totals()
+
+    def _save_state(self) -> None:
+        tmp = f"{self._state_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._offsets, f)
+        os.replace(tmp, self._state_path)
+
+    def _apply(self, chunk: Chunk, stats: IngestStats) -> None:
+        stats.rows_read += len(chunk.campaign_ids) + chunk.bad_rows
+        stats.bad_rows += chunk.bad_rows
+        if not chunk.campaign_ids:
+            return
+        rows = self.store.rows(chunk.campaign_ids)
+        latest = last_occurrences(rows, chunk.days)
+        stats.duplicates += len(rows) - len(latest)
+        rows, days, values = rows[latest], chunk.days[latest], chunk.values[latest]
+
+        previous = self.store.cells(rows, days)
+        stats.restated += int(previous.any(axis=1).sum())
+        if len(self.store.campaigns) > len(self._totals):
+            grown = np.zeros((max(len(self.store.campaigns), 2 * len(self._totals)), N_METRICS))
+            grown[:len(self._totals)] = self._totals
+            self._totals = grown
+        np.add.at(self._totals, rows, values - previous)
+
+        self.store.upsert_rows(rows, days, values)
+        stats.rows_written += len(rows)
+
+    def ingest_file(self, path: str, stats: Optional[IngestStats] = None) -> IngestStats:
+        stats = stats or IngestStats()
+        key = os.path.abspath(path)
+        started = time.perf_counter()
+        with self._lock:
+            size = os.path.getsize(path)
+            state = self._offsets.get(key, {})
+            # A file that shrank was replaced: read it again from the start
+            offset = state.get("offset", 0) if state.get("size", 0) <= size else 0
+            if offset >= size:
+                return stats
+            rows_before = stats.rows_read
+            for chunk, offset_after in read_chunks(path, offset, self.chunk_rows):
+                self._apply(chunk, stats)
+                stats.bytes_read += offset_after - offset
+                offset = offset_after
+                self._offsets[key] = {"offset": offset, "size": size}
+                self._save_state()
+            stats.files += 1
+            stats.per_file[key] = stats.rows_read - rows_before
+        stats.seconds += time.perf_counter() - started
+        logger.info(f"Ingested {path}: {stats.per_file.get(key, 0)} rows")
+        return stats
+
+    def ingest_paths(self, paths: Sequence[str]) -> IngestStats:
+        """Ingest files and directories (their CSV/JSONL exports, oldest first)."""
+        files: List[str] = []
+        for path in paths:
+            if os.path.isdir(path):
+                found = [f for pattern in EXPORT_PATTERNS for f in glob.glob(os.path.join(path, pattern))]
+                files.extend(sorted(found, key=lambda f: (os.path.getmtime(f), f)))
+            else:
+                files.append(path)
+        stats = IngestStats()
+        for path in files:
+            self.ingest_file(path, stats)
+        return stats
+
+    def totals(self, campaign_ids: Sequence[str]) -> np.ndarray:
+        """Running all-time BASE_METRICS totals for the campaigns (zeros for unknown ones)."""
+        rows = self.store.lookup(campaign_ids)
+        out = np.zeros((len(campaign_ids), N_METRICS))
+        with self._lock:
+            known = (rows >= 0) & (rows < len(self._totals))
+            out[known] = self._totals[rows[known]]
+        return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="export files or directories")
+    parser.add_argument("--store", default=os.getenv("METRICS_STORE_PATH", "data/metrics_store"))
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--follow", type=float, default=0, help="keep polling for new rows every N seconds")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    pipeline = IngestPipeline(MetricsStore(args.store), chunk_rows=args.chunk_rows)
+    while True:
+        stats = pipeline.ingest_paths(args.paths)
+        if stats.rows_read or not args.follow:
+            print(json.dumps(stats.to_dict()), flush=True)
+        if not args.follow:
+            break
+        time.sleep(args.follow)
+
+
+if __name__ == "__main__":
+    main()
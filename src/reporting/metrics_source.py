@@ -0,0 +1,109 @@
+import logging
+import zlib
+from abc import ABC, abstractmethod
+from typing import Sequence
+
+import numpy as np
+
+from src.reporting.date_ranges import DateRange
+
+logger = logging.getLogger(__name__)
+
+# Additive metrics every source provides, in column order; KPIs are derived from them
+BASE_METRICS = ("spend", "impressions", "clicks", "conversions", "revenue")
+
+
+def campaign_keys(campaign_ids: Sequence[str]) -> np.ndarray:
+    """Stable 32-bit key per campaign ID (crc32), as uint64 for hashing."""
+    return np.fromiter((zlib.crc32(str(c).encode("utf-8")) for c in campaign_ids), dtype=np.uint64, count=len(campaign_ids))
+
+
+def day_numbers(date_range: DateRange) -> np.ndarray:
+    """Days of the range as proleptic ordinals."""
+    start = date_range.start.toordinal()
+    return np.arange(start, start + date_range.days, dtype=np.int64)
+
+
+class MetricsSource(ABC):
+    """
+    Where campaign metrics come from. A source answers one query for many
+    campaigns at once, so a portfolio report is one call per date range.
+    Implementations must be safe to share across threads.
+    """
+
+    name = "base"
+    # Changes whenever the source's data changes; report caches key on it
+    generation = 0
+
+    @abstractmethod
+    def totals(self, campaign_ids: Sequence[str], date_range: DateRange) -> np.ndarray:
+        """
+        Sums of BASE_METRICS over the range: float64 array of shape
+        (len(campaign_ids), len(BASE_METRICS)); campaigns without data are all zero.
+        """
+        ...
+
+
+def _splitmix64(x: np.ndarray) -> np.ndarray:
+    """Vectorized splitmix64 finalizer: uint64 keys -> well-mixed uint64 hashes (wrapping arithmetic)."""
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _uniform(keys: np.ndarray, salt: int) -> np.ndarray:
+    """Deterministic uniform [0, 1) floats, one per key."""
+    with np.errstate(over="ignore"):
+        hashed = _splitmix64(keys ^ np.uint64(salt))
+    return (hashed >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
+class FixtureMetricsSource(MetricsSource):
+    """
+    Local stand-in for the Meta insights API: plausible, deterministic daily
+    metrics for any campaign ID and day, computed with array hashing so results
+    don't depend on query order or batch size. Each campaign gets its own daily
+    spend level, CPM, CTR, conversion rate and order value; days vary around it.
+    """
+
+    name = "fixture"
+
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+
+    def _profiles(self, keys: np.ndarray) -> tuple:
+        u = [_uniform(keys, self.seed * 16 + i) for i in range(5)]
+        daily_spend = 20 + 480 * u[0]
+        cpm = 5 + 10 * u[1]
+        ctr = 0.005 + 0.025 * u[2]
+        cvr = 0.01 + 0.07 * u[3]
+        order_value = 20 + 100 * u[4]
+        return daily_spend, cpm, ctr, cvr, order_value
+
+    def daily(self, campaign_ids: Sequence[str], date_range: DateRange) -> np.ndarray:
+        """Daily BASE_METRICS, shape (len(campaign_ids), days, len(BASE_METRICS))."""
+        keys = campaign_keys(campaign_ids)
+        days = day_numbers(date_range).astype(np.uint64)
+        daily_spend, cpm, ctr, cvr, order_value = (p[:, None] for p in self._profiles(keys))
+
+        # One key per (campaign, day): campaign hash in the high bits, day ordinal in the low ones
+        cell = (keys[:, None] << np.uint64(32)) | days[None, :]
+        spend = daily_spend * (0.6 + 0.8 * _uniform(cell, self.seed * 16 + 8))
+        impressions = np.floor(spend / cpm * 1000)
+        clicks = np.floor(impressions * ctr * (0.8 + 0.4 * _uniform(cell, self.seed * 16 + 9)))
+        conversions = np.floor(clicks * cvr * (0.5 + _uniform(cell, self.seed * 16 + 10)))
+        revenue = conversions * order_value
+
+        out = np.empty((len(keys), len(days), len(BASE_METRICS)), dtype=np.float64)
+        out[..., 0] = np.round(spend, 2)
+        out[..., 1] = impressions
+        out[..., 2] = clicks
+        out[..., 3] = conversions
+        out[..., 4] = np.round(revenue, 2)
+        return out
+
+    def totals(self, campaign_ids: Sequence[str], date_range: DateRange) -> np.ndarray:
+        if not len(campaign_ids):
+            return np.zeros((0, len(BASE_METRICS)))
+        return self.daily(campaign_ids, date_range).sum(axis=1)
@@ -0,0 +1,376 @@
+"""
+Embedded columnar metrics store behind reporting_agent_tool. Everything is
+kept as memory-mapped .npy arrays under one directory:
+
+    meta.json            first day, days stored, campaign ID index (row order),
+                         generation (bumped by every write)
+    daily.npy            (day, campaign, metric) daily rollup
+    cumulative.npy       (day, campaign, metric) running sum of daily.npy, so the
+                         total over any date range is two row lookups
+    weekly.npy           (ISO week, campaign, metric) weekly rollup
+    hourly/<day>.npy     (campaign, hour, metric) for days loaded with hourly data
+
+Campaign rows are append-only, so a campaign keeps its row forever. Writes
+upsert (campaign, day) cells and refresh the rollups from the first touched day.
+One process writes at a time; readers (other processes included) reopen the
+arrays when meta.json changes, which also covers arrays replaced by a resize.
+
+    python -m src.reporting.metrics_store --seed-fixture --campaigns 2000 --days 180
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.reporting.date_ranges import DateRange
+from src.reporting.metrics_source import BASE_METRICS, FixtureMetricsSource, MetricsSource
+
+logger = logging.getLogger(__name__)
+
+N_METRICS = len(BASE_METRICS)
+GRANULARITIES = ("hour", "day", "week")
+
+# Share of a day's metrics per hour, used when only daily numbers are known
+DIURNAL_PROFILE = np.array([1, 1, 1, 1, 1, 2, 3, 4, 5, 6, 6, 6, 6, 6, 6, 6, 6, 6, 7, 7, 6, 4, 3, 2], dtype=np.float64)
+DIURNAL_PROFILE /= DIURNAL_PROFILE.sum()
+
+
+def _monday(ordinal: int) -> int:
+    return ordinal - date.fromordinal(ordinal).weekday()
+
+
+class MetricsStore(MetricsSource):
+    """Columnar, memory-mapped campaign metrics with hourly, daily and weekly rollups."""
+
+    name = "store"
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(os.path.join(root, "hourly"), exist_ok=True)
+        self._lock = threading.RLock()
+        self._meta_path = os.path.join(root, "meta.json")
+        self.first_day: Optional[int] = None
+        self.days = 0
+        self._generation = 0
+        self._meta_seen: Optional[tuple] = None
+        self.campaigns: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._daily = self._cumulative = self._weekly = None
+        self._stats = {"queries": 0, "query_ms": 0.0, "rows_written": 0}
+        self._load()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, f"{name}.npy")
+
+    def _meta_signature(self) -> Optional[tuple]:
+        """Changes whenever meta.json is rewritten (it is replaced, so the inode changes too)."""
+        try:
+            stat = os.stat(self._meta_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _load(self) -> None:
+        signature = self._meta_signature()
+        while signature is not None and signature != self._meta_seen:
+            with open(self._meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if tuple(meta.get("metrics", ())) != BASE_METRICS:
+                raise ValueError(f"Metrics store {self.root} has metrics {meta.get('metrics')}, expected {BASE_METRICS}")
+            self.first_day, self.days, self.campaigns = meta["first_day"], meta["days"], meta["campaigns"]
+            self._generation = meta.get("generation", 0)
+            self._index = {c: i for i, c in enumerate(self.campaigns)}
+            for name in ("daily", "cumulative", "weekly"):
+                setattr(self, f"_{name}", np.lib.format.open_memmap(self._path(name), mode="r+"))
+            # A write that landed while the arrays were being opened may have resized them; go again
+            self._meta_seen, signature = signature, self._meta_signature()
+
+    def _reload_if_changed(self) -> None:
+        """Pick up writes made through another MetricsStore on the same directory; one stat() when there are none."""
+        if self._meta_signature() != self._meta_seen:
+            self._load()
+
+    @property
+    def generation(self) -> int:
+        """Bumped by every write, including writes made by other processes."""
+        with self._lock:
+            self._reload_if_changed()
+            return self._generation
+
+    def _save_meta(self) -> None:
+        self._generation += 1
+        tmp = f"{self._meta_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"metrics": BASE_METRICS, "first_day": self.first_day, "days": self.days, "campaigns": self.campaigns,
+                       "generation": self._generation}, f)
+        os.replace(tmp, self._meta_path)
+        self._meta_seen = self._meta_signature()
+
+    def _allocate(self, name: str, shape: tuple, old: Optional[np.ndarray], offset: int = 0) -> np.ndarray:
+        """New zeroed memmap of `shape` holding `old` shifted by `offset` rows; replaces the file atomically."""
+        tmp = self._path(f"{name}.tmp")
+        array = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float64, shape=shape)
+        array[:] = 0
+        if old is not None:
+            array[offset:offset + old.shape[0], :old.shape[1]] = old
+        array.flush()
+        del array
+        os.replace(tmp, self._path(name))
+        return np.lib.format.open_memmap(self._path(name), mode="r+")
+
+    def _ensure_capacity(self, first_day: int, last_day: int, campaigns: int) -> None:
+        """Grow (by doubling) the day and campaign capacity to cover [first_day, last_day] and `campaigns` rows."""
+        if self._daily is None:
+            self.first_day = first_day
+            day_capacity, campaign_capacity, shift = max(64, last_day - first_day + 1), max(256, campaigns), 0
+        else:
+            day_capacity, campaign_capacity = self._daily.shape[0], self._daily.shape[1]
+            shift = max(0, self.first_day - first_day)
+            needed_days = max(self.days + shift, last_day - (self.first_day - shift) + 1)
+            if shift == 0 and needed_days <= day_capacity and campaigns <= campaign_capacity:
+                return
+            while needed_days > day_capacity:
+                day_capacity *= 2
+            while campaigns > campaign_capacity:
+                campaign_capacity *= 2
+
+        old_daily = self._daily[:self.days, :len(self.campaigns)] if self._daily is not None else None
+        self._daily = self._allocate("daily", (day_capacity, campaign_capacity, N_METRICS), old_daily, shift)
+        self._cumulative = self._allocate("cumulative", (day_capacity, campaign_capacity, N_METRICS), None)
+        self._weekly = self._allocate("weekly", (day_capacity // 7 + 2, campaign_capacity, N_METRICS), None)
+        self.first_day -= shift
+        self.days += shift
+        # Rollups are rebuilt after a resize; daily rows are the source of truth
+        self._refresh_rollups(0)
+
+    def rows(self, campaign_ids: Sequence[str]) -> np.ndarray:
+        """Row of each campaign, adding unknown ones to the index."""
+        rows = np.empty(len(campaign_ids), dtype=np.int64)
+        with self._lock:
+            for i, campaign in enumerate(campaign_ids):
+                row = self._index.get(campaign)
+                if row is None:
+                    row = self._index[campaign] = len(self.campaigns)
+                    self.campaigns.append(campaign)
+                rows[i] = row
+        return rows
+
+    def _refresh_rollups(self, from_day: int) -> None:
+        """Recompute cumulative sums from day index `from_day` and every week that starts at or after its week."""
+        if not self.days:
+            return
+        n = len(self.campaigns)
+        daily = self._daily[from_day:self.days, :n]
+        base = self._cumulative[from_day - 1, :n] if from_day > 0 else 0
+        self._cumulative[from_day:self.days, :n] = np.cumsum(daily, axis=0) + base
+
+        week_zero = _monday(self.first_day)
+        first_week = (self.first_day + from_day - week_zero) // 7
+        last_week = (self.first_day + self.days - 1 - week_zero) // 7
+        # Day index where each touched week starts (clamped to the stored days)
+        starts = [max(0, week_zero + 7 * w - self.first_day) for w in range(first_week, last_week + 1)]
+        self._weekly[first_week:last_week + 1, :n] = np.add.reduceat(self._daily[:self.days, :n], starts, axis=0)
+
+    def _flush(self) -> None:
+        for array in (self._daily, self._cumulative, self._weekly):
+            if array is not None:
+                array.flush()
+        self._save_meta()
+
+    def upsert_daily(self, campaign_ids: Sequence[str], days: Sequence[int], values: np.ndarray) -> None:
+        """
+        Set the daily BASE_METRICS of (campaign_ids[i], days[i]) to values[i];
+        days are date ordinals. Re-writing a cell replaces it, so replays are idempotent.
+        """
+        if len(campaign_ids):
+            self.upsert_rows(self.rows(campaign_ids), days, values)
+
+    def upsert_rows(self, rows: np.ndarray, days: Sequence[int], values: np.ndarray) -> None:
+        """upsert_daily() for campaign rows from rows(); (row, day) pairs must be unique."""
+        if not len(rows):
+            return
+        days = np.asarray(days, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64).reshape(len(rows), N_METRICS)
+        with self._lock:
+            self._ensure_capacity(int(days.min()), int(days.max()), len(self.campaigns))
+            day_index = days - self.first_day
+            self._daily[day_index, rows] = values
+            self.days = max(self.days, int(day_index.max()) + 1)
+            self._refresh_rollups(int(day_index.min()))
+            self._stats["rows_written"] += len(rows)
+            self._flush()
+
+    def cells(self, rows: np.ndarray, days: Sequence[int]) -> np.ndarray:
+        """Stored daily BASE_METRICS of each (row, day ordinal) pair; zeros where nothing is stored."""
+        days = np.asarray(days, dtype=np.int64)
+        out = np.zeros((len(rows), N_METRICS))
+        with self._lock:
+            self._reload_if_changed()
+            if self._daily is None or not len(rows):
+                return out
+            day_index = days - self.first_day
+            present = (day_index >= 0) & (day_index < self.days) & (rows < self._daily.shape[1])
+            out[present] = self._daily[day_index[present], rows[present]]
+        return out
+
+    def campaign_totals(self) -> np.ndarray:
+        """All-time BASE_METRICS per campaign row, from the last cumulative row."""
+        with self._lock:
+            self._reload_if_changed()
+            out = np.zeros((len(self.campaigns), N_METRICS))
+            if self._daily is not None and self.days:
+                stored = min(len(self.campaigns), self._daily.shape[1])
+                out[:stored] = self._cumulative[self.days - 1, :stored]
+            return out
+
+    def upsert_hourly(self, day: date, campaign_ids: Sequence[str], hourly: np.ndarray) -> None:
+        """Store a day's hourly metrics, shape (len(campaign_ids), 24, N_METRICS), and its daily rollup."""
+        hourly = np.asarray(hourly, dtype=np.float64).reshape(len(campaign_ids), 24, N_METRICS)
+        with self._lock:
+            rows = self.rows(campaign_ids)
+            path = os.path.join(self.root, "hourly", f"{day.isoformat()}.npy")
+            existing = np.load(path) if os.path.exists(path) else np.zeros((0, 24, N_METRICS))
+            merged = np.zeros((max(len(self.campaigns), existing.shape[0]), 24, N_METRICS))
+            merged[:existing.shape[0]] = existing
+            merged[rows] = hourly
+            np.save(path, merged)
+            self.upsert_rows(rows, [day.toordinal()] * len(rows), hourly.sum(axis=1))
+
+    def lookup(self, campaign_ids: Sequence[str]) -> np.ndarray:
+        """Row of each campaign, -1 for campaigns the store has never seen."""
+        return np.fromiter((self._index.get(str(c), -1) for c in campaign_ids), dtype=np.int64, count=len(campaign_ids))
+
+    def _day_window(self, date_range: DateRange) -> tuple:
+        """Half-open day-index window of the range, clamped to the stored days."""
+        start = min(max(date_range.start.toordinal() - self.first_day, 0), self.days)
+        end = min(max(date_range.end.toordinal() - self.first_day + 1, 0), self.days)
+        return start, max(start, end)
+
+    def totals(self, campaign_ids: Sequence[str], date_range: DateRange) -> np.ndarray:
+        started = time.perf_counter()
+        out = np.zeros((len(campaign_ids), N_METRICS))
+        with self._lock:
+            self._reload_if_changed()
+            if self._daily is not None and len(campaign_ids):
+                rows = self.lookup(campaign_ids)
+                known = rows >= 0
+                start, end = self._day_window(date_range)
+                if end > start and known.any():
+                    out[known] = self._cumulative[end - 1, rows[known]]
+                    if start > 0:
+                        out[known] -= self._cumulative[start - 1, rows[known]]
+            self._stats["queries"] += 1
+            self._stats["query_ms"] += (time.perf_counter() - started) * 1000
+        return out
+
+    def series(self, campaign_ids: Sequence[str], date_range: DateRange, granularity: str = "day") -> tuple:
+        """
+        Time series of BASE_METRICS for each campaign: (labels, array of shape
+        (len(campaign_ids), len(labels), N_METRICS)). Weeks are ISO weeks clipped
+        to the range; hours come from days loaded with hourly data (else spread
+        over DIURNAL_PROFILE).
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity {granularity!r}; use one of {', '.join(GRANULARITIES)}")
+        first, last = date_range.start.toordinal(), date_range.end.toordinal()
+        days = np.zeros((len(campaign_ids), last - first + 1, N_METRICS))
+        with self._lock:
+            self._reload_if_changed()
+            rows = self.lookup(campaign_ids)
+            known = rows >= 0
+            if self._daily is not None and known.any():
+                start, end = self._day_window(date_range)
+                offset = self.first_day + start - first
+                days[known, offset:offset + end - start] = self._daily[start:end, rows[known]].transpose(1, 0, 2)
+
+            if granularity == "day":
+                labels = [date.fromordinal(d).isoformat() for d in range(first, last + 1)]
+                return labels, days
+
+            if granularity == "week":
+                labels, columns = [], []
+                for week_start in range(_monday(first), last + 1, 7):
+                    lo, hi = max(week_start, first), min(week_start + 6, last)
+                    week_index = (week_start - _monday(self.first_day)) // 7 if self.first_day is not None else -1
+                    full = lo == week_start and hi == week_start + 6 and self.first_day is not None \
+                        and self.first_day <= week_start and week_start + 6 < self.first_day + self.days
+                    if full and known.any():
+                        column = np.zeros((len(campaign_ids), N_METRICS))
+                        column[known] = self._weekly[week_index, rows[known]]
+                    else:
+                        column = days[:, lo - first:hi - first + 1].sum(axis=1)
+                    labels.append(date.fromordinal(week_start).strftime("%G-W%V"))
+                    columns.append(column)
+                return labels, np.stack(columns, axis=1)
+
+            labels, columns = [], []
+            for d in range(first, last + 1):
+                day = date.fromordinal(d)
+                path = os.path.join(self.root, "hourly", f"{day.isoformat()}.npy")
+                hourly = days[:, d - first, None, :] * DIURNAL_PROFILE[None, :, None]
+                if os.path.exists(path):
+                    stored = np.load(path, mmap_mode="r")
+                    present = known & (rows < stored.shape[0])
+                    hourly[present] = stored[rows[present]]
+                labels.extend(f"{day.isoformat()}T{h:02d}" for h in range(24))
+                columns.append(hourly)
+            return labels, np.concatenate(columns, axis=1)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._reload_if_changed()
+            queries = self._stats["queries"]
+            return {
+                "campaigns": len(self.campaigns),
+                "days": self.days,
+                "generation": self._generation,
+                "first_day": date.fromordinal(self.first_day).isoformat() if self.first_day is not None else None,
+                "rows_written": self._stats["rows_written"],
+                "queries": queries,
+                "avg_query_ms": round(self._stats["query_ms"] / queries, 3) if queries else 0.0,
+                "bytes": sum(os.path.getsize(self._path(n)) for n in ("daily", "cumulative", "weekly") if os.path.exists(self._path(n))),
+            }
+
+
+def seed_from_fixture(store: MetricsStore, campaigns: int, days: int, end: Optional[date] = None, batch_days: int = 30) -> None:
+    """Fill the store with `days` days of fixture metrics for `campaigns` campaigns, ending yesterday."""
+    end = end or date.today() - timedelta(days=1)
+    start = end - timedelta(days=days - 1)
+    campaign_ids = [str(100000 + i) for i in range(campaigns)]
+    fixture = FixtureMetricsSource()
+    for batch_start in range(0, days, batch_days):
+        lo = start + timedelta(days=batch_start)
+        hi = min(end, lo + timedelta(days=batch_days - 1))
+        daily = fixture.daily(campaign_ids, DateRange(lo, hi, "seed"))
+        n_days = daily.shape[1]
+        store.upsert_daily(
+            np.repeat(campaign_ids, n_days).tolist(),
+            np.tile(np.arange(lo.toordinal(), lo.toordinal() + n_days), campaigns),
+            daily.reshape(-1, N_METRICS),
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default=os.getenv("METRICS_STORE_PATH", "data/metrics_store"))
+    parser.add_argument("--seed-fixture", action="store_true", help="load fixture metrics into the store")
+    parser.add_argument("--campaigns", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=180)
+    args = parser.parse_args()
+
+    store = MetricsStore(args.path)
+    if args.seed_fixture:
+        started = time.perf_counter()
+        seed_from_fixture(store, args.campaigns, args.days)
+        print(f"Seeded {args.campaigns} campaigns x {args.days} days in {time.perf_counter() - started:.1f}s")
+    print(json.dumps(store.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import logging
+import os
+from dataclasses import dataclass, field, replace
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.agents.agent_registry import agent_registry
+from src.observability.tracing import current_span
+from src.reporting.date_ranges import DEFAULT_RANGE, DateRange, parse_date_range
+from src.reporting.metrics_source import BASE_METRICS, FixtureMetricsSource, MetricsSource
+from src.reporting.report_cache import ReportCache, get_report_cache
+
+logger = logging.getLogger(__name__)
+
+KPI_METRICS = ("ctr", "cpc", "cpa", "roas")
+ALL_METRICS = BASE_METRICS + KPI_METRICS
+
+# Campaigns per report; larger portfolios should be split by the caller
+MAX_CAMPAIGNS = 5000
+# Days per date range; a typo like last_9999d would otherwise scan decades of data
+MAX_RANGE_DAYS = 731
+
+_COUNT_METRICS = frozenset({"impressions", "clicks", "conversions"})
+
+
+def derive_kpis(totals: np.ndarray) -> np.ndarray:
+    """
+    CTR (%), CPC, CPA and ROAS for every row of `totals` (columns BASE_METRICS)
+    at once; NaN where the denominator is zero.
+    """
+    spend, impressions, clicks, conversions, revenue = totals.T
+    numerators = np.stack([clicks * 100, spend, spend, revenue], axis=1)
+    denominators = np.stack([impressions, clicks, conversions, spend], axis=1)
+    out = np.full(numerators.shape, np.nan)
+    np.divide(numerators, denominators, out=out, where=denominators > 0)
+    return out
+
+
+def _format_value(metric: str, value: float) -> str:
+    if np.isnan(value):
+        return "-"
+    if metric in _COUNT_METRICS:
+        return f"{int(value):,}"
+    if metric == "ctr":
+        return f"{value:.2f}%"
+    return f"{value:,.2f}"
+
+
+@dataclass
+class ReportTable:
+    """One row per (campaign, date range) plus a portfolio total per range; `values` columns follow `metrics`."""
+    metrics: Tuple[str, ...]
+    campaigns: List[str]
+    ranges: List[DateRange]
+    values: np.ndarray
+    totals: np.ndarray
+    source: str = ""
+    unknown_metrics: List[str] = field(default_factory=list)
+
+    def rows(self) -> List[Tuple[str, DateRange, np.ndarray]]:
+        n = len(self.campaigns)
+        return [(self.campaigns[i % n], self.ranges[i // n], self.values[i]) for i in range(len(self.values))]
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        return [
+            {"campaign_id": campaign, "range": r.label, "start": r.start.isoformat(), "end": r.end.isoformat(),
+             **{m: (None if np.isnan(v) else round(float(v), 4)) for m, v in zip(self.metrics, row)}}
+            for campaign, r, row in self.rows()
+        ]
+
+    def to_text(self, max_rows: int = 50) -> str:
+        """
+        Compact pipe table for the supervisor to summarize. Past `max_rows`
+        campaigns per range, only the top ones by the first metric are listed;
+        the TOTAL row always covers every campaign.
+        """
+        header = ["campaign", "range", *self.metrics]
+        lines = [" | ".join(header)]
+        n = len(self.campaigns)
+        for r_index, date_range in enumerate(self.ranges):
+            block = self.values[r_index * n:(r_index + 1) * n]
+            order = np.arange(n)
+            if n > max_rows:
+                order = np.argsort(-np.nan_to_num(block[:, 0], nan=-np.inf), kind="stable")[:max_rows]
+            for i in order:
+                lines.append(" | ".join([self.campaigns[i], date_range.label, *(_format_value(m, v) for m, v in zip(self.metrics, block[i]))]))
+            if n > max_rows:
+                lines.append(f"... {n - max_rows} more campaigns (sorted by {self.metrics[0]}) | {date_range.label}")
+            if n > 1:
+                lines.append(" | ".join(["TOTAL", date_range.label, *(_format_value(m, v) for m, v in zip(self.metrics, self.totals[r_index]))]))
+        if self.unknown_metrics:
+            lines.append(f"(ignored unknown metrics: {', '.join(self.unknown_metrics)})")
+        return "\n".join(lines)
+
+
+class ReportingEngine:
+    """
+    Batched campaign reporting: one source query per date range covers every
+    campaign, and KPIs are derived for all rows and range totals in one array pass.
+    With a cache, repeated reports on the same campaigns, ranges and metrics are
+    served from it.
+    """
+
+    def __init__(self, source: MetricsSource, cache: Optional[ReportCache] = None):
+        self.source = source
+        self.cache = cache
+
+    def report(
+        self,
+        campaign_ids: Sequence[str],
+        date_ranges: Optional[Sequence[str]] = None,
+        metrics: Optional[Sequence[str]] = None,
+        today: Optional[date] = None,
+    ) -> ReportTable:
+        """Raises ValueError for an empty or oversized campaign list or an unknown or oversized date range."""
+        campaigns = list(dict.fromkeys(str(c).strip() for c in campaign_ids if str(c).strip()))
+        if not campaigns:
+            raise ValueError("At least one campaign ID is required")
+        if len(campaigns) > MAX_CAMPAIGNS:
+            raise ValueError(f"At most {MAX_CAMPAIGNS} campaigns per report ({len(campaigns)} requested)")
+        ranges = list(dict.fromkeys(parse_date_range(spec, today) for spec in (date_ranges or [DEFAULT_RANGE])))
+        for r in ranges:
+            if r.days > MAX_RANGE_DAYS:
+                raise ValueError(f"At most {MAX_RANGE_DAYS} days per date range ({r.label} covers {r.days})")
+
+        requested = [m.strip().lower() for m in (metrics or ALL_METRICS)]
+        selected = tuple(dict.fromkeys(m for m in requested if m in ALL_METRICS)) or ALL_METRICS
+        unknown = [m for m in requested if m not in ALL_METRICS]
+
+        if self.cache is None:
+            table = self._compute(campaigns, ranges, selected)
+        else:
+            key = (self.source, self.source.generation, tuple(campaigns), tuple(ranges), selected)
+            table, status = self.cache.get_or_compute(key, lambda: self._compute(campaigns, ranges, selected), self.cache.ttl_for(ranges, today))
+            current_span().set(report_cache=status)
+        return replace(table, unknown_metrics=unknown) if unknown else table
+
+    def _compute(self, campaigns: List[str], ranges: List[DateRange], selected: Tuple[str, ...]) -> ReportTable:
+        columns = [ALL_METRICS.index(m) for m in selected]
+        base = np.concatenate([self.source.totals(campaigns, r) for r in ranges])
+        range_totals = base.reshape(len(ranges), len(campaigns), len(BASE_METRICS)).sum(axis=1)
+        values = np.hstack([base, derive_kpis(base)])[:, columns]
+        totals = np.hstack([range_totals, derive_kpis(range_totals)])[:, columns]
+        return ReportTable(selected, campaigns, ranges, values, totals, source=self.source.name)
+
+
+def get_metrics_source() -> MetricsSource:
+    """
+    Source named by REPORTING_SOURCE: fixture (default, seeded by REPORTING_FIXTURE_SEED)
+    or store (the columnar metrics store at METRICS_STORE_PATH, default data/metrics_store).
+    """
+    name = os.getenv("REPORTING_SOURCE", "fixture").lower()
+    if name == "store":
+        from src.reporting.metrics_store import MetricsStore
+        path = os.path.abspath(os.getenv("METRICS_STORE_PATH", "data/metrics_store"))
+        return agent_registry.get_or_build("metrics_source", ("store", path), lambda: MetricsStore(path))
+    if name != "fixture":
+        logger.warning(f"Unknown REPORTING_SOURCE {name!r}; using the fixture source")
+    seed = int(os.getenv("REPORTING_FIXTURE_SEED") or 0)
+    return agent_registry.get_or_build("metrics_source", ("fixture", seed), lambda: FixtureMetricsSource(seed))
+
+
+def get_reporting_engine() -> ReportingEngine:
+    source = get_metrics_source()
+    cache = get_report_cache()
+    return agent_registry.get_or_build("reporting_engine", (id(source), id(cache)), lambda: ReportingEngine(source, cache))
@@ -0,0 +1,208 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+from src.agents.agent_registry import agent_registry
+from src.reporting.date_ranges import DateRange
+
+logger = logging.getLogger(__name__)
+
+# Days after which Meta stops restating a day's metrics (longest attribution window);
+# reports on ranges that ended before that can be kept much longer
+SETTLED_AFTER_DAYS = 28
+
+
+@dataclass
+class _Entry:
+    table: Any
+    size: int
+    latency: float
+    expires_at: float
+    stale_until: float
+
+
+def table_size(table: Any) -> int:
+    """Approximate memory held by a ReportTable (arrays plus campaign ID strings)."""
+    return table.values.nbytes + table.totals.nbytes + sum(len(c) + 49 for c in table.campaigns) + 512
+
+
+class ReportCache:
+    """
+    Cache of computed report tables keyed by (source, source generation,
+    campaign IDs, date ranges, metrics). Date ranges are resolved to concrete
+    dates before keying, so "last_7d" moves to a new entry at midnight, and new
+    data in the source moves every report to a new entry.
+
+    - Per-entry TTL: `ttl` for ranges that can still be restated, `settled_ttl`
+      for ranges that ended more than SETTLED_AFTER_DAYS ago.
+    - Stale-while-revalidate: for `stale_for` seconds past its TTL an entry is
+      still served while one background worker recomputes it.
+    - Concurrent misses for the same key wait for a single computation.
+    - Least recently used entries are evicted to stay within `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        settled_ttl: float = 6 * 3600.0,
+        stale_for: float = 300.0,
+        max_bytes: int = 32 * 1024 * 1024,
+        refresh_workers: int = 2,
+    ):
+        self.ttl = ttl
+        self.settled_ttl = settled_ttl
+        self.stale_for = stale_for
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._bytes = 0
+        # Bumped by clear(); computations started before it don't store their result
+        self._epoch = 0
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="report-refresh")
+        self._stats = {
+            "hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "refreshes": 0,
+            "refresh_errors": 0, "expired": 0, "evicted": 0, "saved_seconds": 0.0,
+        }
+
+    def ttl_for(self, ranges: Sequence[DateRange], today: Optional[date] = None) -> float:
+        settled = (today or date.today()) - timedelta(days=SETTLED_AFTER_DAYS)
+        return self.settled_ttl if all(r.end < settled for r in ranges) else self.ttl
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any], ttl: Optional[float] = None) -> Tuple[Any, str]:
+        """
+        Cached table for `key`, computing it with `compute()` on a miss.
+        Returns (table, status), status being hit, stale, coalesced or miss.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.stale_until:
+                self._entries.move_to_end(key)
+                self._stats["saved_seconds"] += entry.latency
+                if now < entry.expires_at:
+                    self._stats["hits"] += 1
+                    return entry.table, "hit"
+                self._stats["stale_hits"] += 1
+                if key not in self._inflight:
+                    future = self._inflight[key] = Future()
+                    self._stats["refreshes"] += 1
+                    self._executor.submit(self._refresh, key, compute, ttl, future, self._epoch)
+                return entry.table, "stale"
+            if entry is not None:
+                self._remove(key)
+                self._stats["expired"] += 1
+
+            future = self._inflight.get(key)
+            waiting = future is not None
+            if waiting:
+                self._stats["coalesced"] += 1
+            else:
+                future = self._inflight[key] = Future()
+                self._stats["misses"] += 1
+            epoch = self._epoch
+        if waiting:
+            return future.result(), "coalesced"
+        return self._load(key, compute, ttl, future, epoch), "miss"
+
+    def _done(self, key: Hashable, future: Future) -> None:
+        # clear() may have handed the key to a newer computation already
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+    def _load(self, key: Hashable, compute: Callable[[], Any], ttl: float, future: Future, epoch: int) -> Any:
+        started = time.perf_counter()
+        try:
+            table = compute()
+        except BaseException as e:
+            with self._lock:
+                self._done(key, future)
+            future.set_exception(e)
+            raise
+        self._put(key, table, ttl, time.perf_counter() - started, future, epoch)
+        future.set_result(table)
+        return table
+
+    def _refresh(self, key: Hashable, compute: Callable[[], Any], ttl: float, future: Future, epoch: int) -> None:
+        try:
+            self._load(key, compute, ttl, future, epoch)
+        except Exception as e:
+            # The stale entry keeps being served until it runs out of its stale window
+            logger.warning(f"Background report refresh failed: {e}")
+            with self._lock:
+                self._stats["refresh_errors"] += 1
+
+    def _put(self, key: Hashable, table: Any, ttl: float, latency: float, future: Future, epoch: int) -> None:
+        # Shared between callers from now on
+        table.values.flags.writeable = False
+        table.totals.flags.writeable = False
+        size = table_size(table)
+        now = time.monotonic()
+        with self._lock:
+            self._done(key, future)
+            if epoch != self._epoch:
+                # Computed from data that was current before clear(); hand it to its callers only
+                return
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = _Entry(table, size, latency, now + ttl, now + ttl + self.stale_for)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._stats["evicted"] += 1
+
+    def _remove(self, key: Hashable) -> None:
+        self._bytes -= self._entries.pop(key).size
+
+    def clear(self) -> None:
+        """
+        Drop every entry, e.g. after new data was loaded into the source. Later
+        requests don't wait for computations already running, and those don't
+        store their results.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._inflight.clear()
+            self._bytes = 0
+            self._epoch += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self._stats["hits"] + self._stats["stale_hits"] + self._stats["coalesced"]
+            lookups = hits + self._stats["misses"]
+            return {
+                **self._stats,
+                "saved_seconds": round(self._stats["saved_seconds"], 3),
+                "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "refreshing": len(self._inflight),
+            }
+
+
+def get_report_cache() -> Optional[ReportCache]:
+    """
+    Shared cache of reporting results, on unless REPORT_CACHE=0; tuned with
+    REPORT_CACHE_TTL, REPORT_CACHE_SETTLED_TTL, REPORT_CACHE_STALE_FOR (seconds)
+    and REPORT_CACHE_MAX_BYTES.
+    """
+    if os.getenv("REPORT_CACHE", "1").lower() in ("0", "false", "no"):
+        return None
+    ttl = float(os.getenv("REPORT_CACHE_TTL") or 300)
+    settled_ttl = float(os.getenv("REPORT_CACHE_SETTLED_TTL") or 6 * 3600)
+    stale_for = float(os.getenv("REPORT_CACHE_STALE_FOR") or 300)
+    max_bytes = int(os.getenv("REPORT_CACHE_MAX_BYTES") or 32 * 1024 * 1024)
+    return agent_registry.get_or_build(
+        "report_cache",
+        (ttl, settled_ttl, stale_for, max_bytes),
+        lambda: ReportCache(ttl=ttl, settled_ttl=settled_ttl, stale_for=stale_for, max_bytes=max_bytes),
+    )
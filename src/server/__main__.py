@@ -0,0 +1,49 @@
+"""
+Headless HTTP/SSE entry point for the supervisor agent.
+
+    python -m src.server --port 8000 --workers 8 --queue 64
+    python -m src.server --stand-in        # fully local, no OpenAI calls
+"""
+import argparse
+import logging
+import os
+
+from src.agents.meta_query_agent import MetaQueryAgent
+from src.llms.openai_llm import OpenAILLM
+from src.server.http_server import AgentHTTPServer
+from src.server.scheduler import TurnScheduler
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve MetaQueryAgent over HTTP/SSE")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=8, help="maximum concurrently running turns")
+    parser.add_argument("--queue", type=int, default=64, help="maximum turns waiting for a worker before returning 503")
+    parser.add_argument("--stand-in", action="store_true", help="use the local stand-in model instead of OpenAI")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if args.stand_in:
+        os.environ["LLM_STAND_IN"] = "1"
+
+    agent = MetaQueryAgent(model=OpenAILLM().get_llm_model())
+    scheduler = TurnScheduler(agent, max_workers=args.workers, max_queue=args.queue)
+    server = AgentHTTPServer((args.host, args.port), scheduler)
+
+    logger.info(f"Serving MetaQueryAgent on http://{args.host}:{args.port} (workers={args.workers}, queue={args.queue})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        # Close pooled connections while the scheduler loop that opened them still runs
+        OpenAILLM.get_transport().close()
+        scheduler.shutdown()
+
+
+if __name__ == "__main__":
+    main()
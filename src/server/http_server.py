@@ -0,0 +1,175 @@
+import json
+import logging
+import queue
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+
+from src.agents.agent_registry import agent_registry
+from src.creatives.generator import get_creative_generator
+from src.observability.prompt_cache import get_prompt_cache_tracker
+from src.observability.tracing import get_trace_collector, tracing_enabled
+from src.observability.usage import get_usage_ledger
+from src.reporting.report_cache import get_report_cache
+from src.server.scheduler import Backpressure, TurnScheduler
+
+logger = logging.getLogger(__name__)
+
+_MESSAGES_PATH = re.compile(r"^/conversations/([0-9a-f]+)/messages$")
+_USAGE_PATH = re.compile(r"^/conversations/([0-9a-f]+)/usage$")
+
+
+class AgentRequestHandler(BaseHTTPRequestHandler):
+    """
+    Endpoints:
+      GET  /health                              scheduler stats
+      GET  /metrics                             registry, cache, pre-router, context-budget, prompt-cache, trace, usage, report-cache and creative-generation counters
+      POST /conversations                       -> {"conversation_id": ...}
+      GET  /conversations/<id>/messages         conversation history
+      GET  /conversations/<id>/usage            tokens and cost by agent and tool, budget status
+      POST /conversations/<id>/messages         {"content": "..."} -> turn result
+           (with "Accept: text/event-stream" or ?stream=1, streams SSE events instead)
+    """
+
+    protocol_version = "HTTP/1.1"
+    server: "AgentHTTPServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.info("%s - %s", self.address_string(), format % args)
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Dict[str, str] = None) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length))
+
+    def do_GET(self) -> None:
+        path = self.path.split("?", 1)[0]
+        if path == "/health":
+            self._send_json(200, {"status": "ok", **self.server.scheduler.stats()})
+            return
+
+        if path == "/metrics":
+            response_cache = getattr(self.server.scheduler.agent, "response_cache", None)
+            pre_router = getattr(self.server.scheduler.agent, "pre_router", None)
+            context_budget = getattr(self.server.scheduler.agent, "context_budget", None)
+            report_cache = get_report_cache()
+            self._send_json(200, {
+                "scheduler": self.server.scheduler.stats(),
+                "agent_registry": agent_registry.stats(),
+                "response_cache": response_cache.stats() if response_cache is not None else None,
+                "pre_router": pre_router.stats() if pre_router is not None else None,
+                "context_budget": context_budget.stats() if context_budget is not None else None,
+                "prompt_cache": get_prompt_cache_tracker().stats(),
+                "tracing": get_trace_collector().stats() if tracing_enabled() else None,
+                "usage": get_usage_ledger().stats(),
+                "report_cache": report_cache.stats() if report_cache is not None else None,
+                "creatives": get_creative_generator().stats(),
+            })
+            return
+
+        match = _USAGE_PATH.match(path)
+        if match:
+            if self.server.scheduler.get_messages(match.group(1)) is None:
+                self._send_json(404, {"error": "unknown conversation"})
+                return
+            report = get_usage_ledger().conversation_report(match.group(1))
+            self._send_json(200, report or {"conversation_id": match.group(1), "calls": 0, "tokens": 0, "cost_usd": 0.0})
+            return
+
+        match = _MESSAGES_PATH.match(path)
+        if match:
+            messages = self.server.scheduler.get_messages(match.group(1))
+            if messages is None:
+                self._send_json(404, {"error": "unknown conversation"})
+            else:
+                self._send_json(200, {"conversation_id": match.group(1), "messages": messages})
+            return
+
+        self._send_json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        path, _, query = self.path.partition("?")
+        if path == "/conversations":
+            self._send_json(201, {"conversation_id": self.server.scheduler.create_conversation()})
+            return
+
+        match = _MESSAGES_PATH.match(path)
+        if not match:
+            self._send_json(404, {"error": "not found"})
+            return
+
+        try:
+            content = self._read_json().get("content", "")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": "invalid JSON body"})
+            return
+        if not content:
+            self._send_json(400, {"error": "'content' is required"})
+            return
+
+        stream = "stream=1" in query or "text/event-stream" in (self.headers.get("Accept") or "")
+        events: "queue.Queue" = queue.Queue()
+
+        try:
+            future = self.server.scheduler.submit(match.group(1), content, on_event=events.put if stream else None)
+        except KeyError:
+            self._send_json(404, {"error": "unknown conversation"})
+            return
+        except Backpressure as e:
+            self._send_json(503, {"error": "server busy", "detail": str(e)}, headers={"Retry-After": "1"})
+            return
+
+        if not stream:
+            try:
+                self._send_json(200, future.result())
+            except Exception as e:
+                logger.exception(f"Turn failed for conversation {match.group(1)}")
+                self._send_json(500, {"error": "turn failed", "detail": str(e)})
+            return
+
+        self._stream_events(events, future)
+
+    def _stream_events(self, events: "queue.Queue", future) -> None:
+        """Write scheduler events as Server-Sent Events until the final one."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        while True:
+            try:
+                event = events.get(timeout=1.0)
+            except queue.Empty:
+                if future.done() and future.exception() is not None:
+                    event = {"type": "error", "error": str(future.exception())}
+                else:
+                    continue
+            try:
+                self.wfile.write(f"event: {event.get('type')}\ndata: {json.dumps(event, ensure_ascii=False, default=str)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                # Client went away; the turn still completes and is recorded
+                return
+            if event.get("type") in ("final", "error"):
+                return
+
+
+class AgentHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, scheduler: TurnScheduler):
+        super().__init__(address, AgentRequestHandler)
+        self.scheduler = scheduler
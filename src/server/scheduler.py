@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+from src.agents.meta_query_agent import MetaQueryAgent
+from src.conversation.conversation_store import ConversationStore, get_conversation_store
+from src.conversation.session import bind_conversation
+from src.conversation.turn import record_error, record_turn_result, record_user_message, split_result
+from src.observability.tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+class Backpressure(Exception):
+    """Raised when the turn queue is full; callers should retry later."""
+
+
+class _ConversationLock:
+    """Serializes one conversation's turns; `users` counts turns holding or waiting for it."""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+class TurnScheduler:
+    """
+    Runs supervisor turns for many conversations on one background event loop.
+
+    - At most `max_workers` turns execute concurrently (the worker pool).
+    - At most `max_queue` further turns wait for a worker; beyond that, submit()
+      raises Backpressure instead of queueing without bound.
+    - Turns of the same conversation run one at a time, in arrival order.
+    """
+
+    def __init__(self, agent: MetaQueryAgent, max_workers: int = 8, max_queue: int = 64, store: ConversationStore = None):
+        self.agent = agent
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.store = store or get_conversation_store()
+
+        # Only conversations with a turn running or waiting; touched on the loop thread only
+        self._conversation_locks: Dict[str, _ConversationLock] = {}
+        self._admitted = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="turn-scheduler", daemon=True)
+        self._thread.start()
+        self._workers = asyncio.Semaphore(max_workers)
+
+    # ── conversations ───────────────────────────────────────────
+
+    def create_conversation(self) -> str:
+        return self.store.create_conversation()
+
+    def get_messages(self, conversation_id: str) -> Optional[List[Dict[str, str]]]:
+        if not self.store.has_conversation(conversation_id):
+            return None
+        return self.store.get_messages(conversation_id)
+
+    # ── turns ───────────────────────────────────────────────────
+
+    def submit(self, conversation_id: str, content: str, on_event: Callable[[Dict[str, Any]], None] = None) -> Future:
+        """
+        Queue a user turn. Returns a Future resolving to the turn result; if given,
+        `on_event` receives every MetaQueryAgent.astream() event as it happens
+        (called from the scheduler thread).
+        """
+        if not self.store.has_conversation(conversation_id):
+            raise KeyError(conversation_id)
+        with self._lock:
+            if self._admitted >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise Backpressure(f"{self._admitted} turns in flight or queued")
+            self._admitted += 1
+
+        return asyncio.run_coroutine_threadsafe(self._run_turn(conversation_id, content, on_event), self._loop)
+
+    async def _run_turn(self, conversation_id: str, content: str, on_event: Optional[Callable]) -> Dict[str, Any]:
+        conversation_lock = self._conversation_locks.setdefault(conversation_id, _ConversationLock())
+        conversation_lock.users += 1
+        try:
+            async with conversation_lock.lock, self._workers:
+                with self._lock:
+                    self._running += 1
+                try:
+                    return await self._execute(conversation_id, content, on_event)
+                finally:
+                    with self._lock:
+                        self._running -= 1
+                        self._completed += 1
+        finally:
+            conversation_lock.users -= 1
+            if not conversation_lock.users:
+                del self._conversation_locks[conversation_id]
+            with self._lock:
+                self._admitted -= 1
+
+    async def _execute(self, conversation_id: str, content: str, on_event: Optional[Callable]) -> Dict[str, Any]:
+        conversation = self.store.conversation(conversation_id)
+        record_user_message(conversation, content)
+
+        result: Dict[str, Any] = {}
+        # Tools (e.g. launching_agent_tool) read and append to this conversation's history
+        with bind_conversation(conversation), span("turn", "turn", conversation_id=conversation_id, input_chars=len(content)):
+            try:
+                async for event in self.agent.astream(conversation.langchain_messages()):
+                    if event.get("type") == "final":
+                        result = event.get("result") or {}
+                    elif on_event is not None:
+                        on_event(event)
+            except BaseException as e:
+                # Answer the user message, so the next turn isn't built on one left without a reply
+                record_error(conversation, f"Error during master agent: {e or type(e).__name__}")
+                raise
+
+        structured, tool_calls = split_result(result)
+        if result.get("error"):
+            record_error(conversation, structured.get("response", ""))
+            response_text = structured.get("response", "")
+        else:
+            response_text = record_turn_result(conversation, structured, tool_calls)
+
+        turn = {
+            "conversation_id": conversation_id,
+            "response": response_text,
+            "structured_response": structured,
+            "tool_calls": tool_calls,
+            "error": bool(result.get("error")),
+        }
+        if on_event is not None:
+            on_event({"type": "final", "result": turn})
+        return turn
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "running": self._running,
+                "queued": self._admitted - self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+            }
+
+    def shutdown(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
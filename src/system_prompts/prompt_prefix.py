@@ -0,0 +1,142 @@
+"""
+Frozen, versioned prompt prefixes. Provider-side prompt caching only reuses a
+prefix that is byte-for-byte identical across calls, so every agent sends its
+system prompt and tool schemas first and builds them only from static inputs.
+The version of each prefix is checked in (prompt_versions.json); a prefix that
+changes without a version bump is logged, since it invalidates every cached
+prompt for that agent.
+
+    python -m src.system_prompts.prompt_prefix            # show versions
+    python -m src.system_prompts.prompt_prefix --update   # freeze the current ones
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from src.agents.agent_registry import agent_registry, prompt_version
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_PATH = os.path.join(os.path.dirname(__file__), "prompt_versions.json")
+
+
+def canonical_json(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+@dataclass(frozen=True)
+class PromptPrefix:
+    """The static head of every request an agent sends: system prompt, tool schemas, response schema."""
+    agent_name: str
+    system_prompt: str
+    tool_schemas: Tuple[str, ...]
+    response_schema: str
+
+    @property
+    def version(self) -> str:
+        digest = hashlib.sha256()
+        for part in (self.system_prompt, *self.tool_schemas, self.response_schema):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()[:12]
+
+    @property
+    def size(self) -> int:
+        return len(self.system_prompt) + sum(len(s) for s in self.tool_schemas) + len(self.response_schema)
+
+
+_lock = threading.Lock()
+_prefixes: Dict[str, PromptPrefix] = {}
+_frozen: Optional[Dict[str, str]] = None
+
+
+def frozen_versions() -> Dict[str, str]:
+    """Checked-in prefix version per agent."""
+    global _frozen
+    if _frozen is None:
+        try:
+            with open(VERSIONS_PATH, encoding="utf-8") as f:
+                _frozen = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            _frozen = {}
+    return _frozen
+
+
+def _build_prefix(agent_name: str, system_prompt: str, tools: List[Any], response_format: Any) -> PromptPrefix:
+    prefix = PromptPrefix(
+        agent_name=agent_name,
+        system_prompt=system_prompt,
+        tool_schemas=tuple(canonical_json(convert_to_openai_tool(t, strict=True)) for t in tools),
+        response_schema=canonical_json(response_format.model_json_schema()) if response_format is not None else "",
+    )
+    with _lock:
+        current = _prefixes.get(agent_name)
+        _prefixes[agent_name] = prefix
+
+    expected = frozen_versions().get(agent_name)
+    if current is not None and current != prefix:
+        logger.warning(f"{agent_name} prompt prefix changed in-process ({current.version} -> {prefix.version}); cached prompts will miss")
+    elif expected and expected != prefix.version:
+        logger.warning(f"{agent_name} prompt prefix is {prefix.version} but {expected} is frozen; "
+                       f"bump it with python -m src.system_prompts.prompt_prefix --update")
+    return prefix
+
+
+def freeze_prefix(agent_name: str, system_prompt: str, tools: List[Any], response_format: Any = None) -> PromptPrefix:
+    """
+    The prefix an agent sends, built once per (agent, prompt, tool set, response
+    format). Tool schemas keep the agent's declared order, which is also the
+    order they are bound in.
+    """
+    key = (agent_name, prompt_version(system_prompt), tuple(id(t) for t in tools), id(response_format))
+    return agent_registry.get_or_build("prompt_prefix", key, lambda: _build_prefix(agent_name, system_prompt, tools, response_format))
+
+
+def current_prefixes() -> Dict[str, PromptPrefix]:
+    with _lock:
+        return dict(_prefixes)
+
+
+def _load_agents() -> None:
+    # Building the agents registers their prefixes; the model is never called
+    from src.agents.launching_agent import LaunchingAgent
+    from src.agents.meta_query_agent import MetaQueryAgent
+    from src.llms.fake_llm import FakeChatModel
+
+    model = FakeChatModel(responses=[""])
+    for agent in (MetaQueryAgent, LaunchingAgent):
+        agent(model=model)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--update", action="store_true", help=f"write the current versions to {os.path.basename(VERSIONS_PATH)}")
+    args = parser.parse_args()
+
+    _load_agents()
+    # Under -m this file runs as __main__; the agents registered with the imported module
+    from src.system_prompts import prompt_prefix
+
+    frozen = frozen_versions()
+    versions = {}
+    for name, prefix in sorted(prompt_prefix.current_prefixes().items()):
+        versions[name] = prefix.version
+        status = "ok" if frozen.get(name) == prefix.version else f"changed (frozen {frozen.get(name)})"
+        print(f"{name:<20} {prefix.version}  {prefix.size:>6} chars  {status}")
+
+    if args.update:
+        with open(VERSIONS_PATH, "w", encoding="utf-8") as f:
+            json.dump(versions, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Wrote {VERSIONS_PATH}")
+
+
+if __name__ == "__main__":
+    main()
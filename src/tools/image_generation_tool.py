@@ -1,21 +1,42 @@
+import asyncio
+
 from langchain.tools import tool
 
+from src.creatives.generator import get_creative_generator
+from src.observability.tracing import span
+from src.observability.usage import tool_scope
+
+
 @tool("image_generation_tool")
 def image_generation_tool(
     product_url: str,
     num_images: int = 3
 ) -> str:
     """
-    Dummy tool to simulate creative image generation from a product URL.
-    Returns demo image URLs.
+    Generate ad creative images from a product URL.
+    Returns the creative image URLs; creatives already generated for the same
+    product are reused.
     """
-    demo_urls = [
-        f"https://cdn.demo.com/generated_creative_{i+1}.png"
-        for i in range(num_images)
-    ]
-
-    return (
-        "[DEMO] Image generation successful. "
-        f"Product URL: {product_url}. "
-        f"Generated creatives: {demo_urls}"
-    )
+    with span("image_generation_tool", "tool", input_chars=len(product_url)) as tool_span, tool_scope("image_generation_tool"):
+        generator = get_creative_generator()
+        result = generator.generate(product_url, num_images)
+        urls = [c.url for c in result.creatives]
+        tool_span.set(cached=result.cached, generated=result.generated, failed=result.failed, pending=result.pending)
+        if not urls:
+            return f"Image generation error: no creative could be generated for {product_url}. Ask the user to retry or provide creatives."
+
+        prefix = "[DEMO] " if generator.backend.name == "local" else ""
+        reused = f" ({result.cached} reused from earlier generations)" if result.cached else ""
+        return (
+            f"{prefix}Image generation successful. "
+            f"Product URL: {product_url}. "
+            f"Generated creatives: {urls}{reused}"
+        )
+
+
+async def _aimage_generation_tool(product_url: str, num_images: int = 3) -> str:
+    """Waits on the generation worker pool, so it runs in a thread to keep the event loop free."""
+    return await asyncio.to_thread(image_generation_tool.func, product_url, num_images)
+
+
+image_generation_tool.coroutine = _aimage_generation_tool
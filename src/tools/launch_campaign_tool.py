@@ -17,3 +17,16 @@ def launch_campaign_tool(
         f"Daily Budget={daily_budget}, "
         f"Creatives={creative_urls}"
     )
+
+
+async def _alaunch_campaign_tool(
+    objective: str,
+    geo: str,
+    daily_budget: int,
+    creative_urls: List[str]
+) -> str:
+    """Native async implementation (no blocking I/O, so no thread hop is needed)."""
+    return launch_campaign_tool.func(objective, geo, daily_budget, creative_urls)
+
+
+launch_campaign_tool.coroutine = _alaunch_campaign_tool
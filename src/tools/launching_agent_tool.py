@@ -1,90 +1,129 @@
 from langchain.tools import tool
-from langchain_core.messages import HumanMessage, AIMessage
-import streamlit as st
 import json
+from typing import Any, List, Tuple
 from src.llms.openai_llm import OpenAILLM
+from src.agents.launch_stage_machine import load_state, state_messages
 from src.agents.launching_agent import LaunchingAgent
+from src.conversation.session import current_conversation
+from src.observability.tracing import span
+from src.observability.usage import tool_scope
 import logging
+from langgraph.config import get_stream_writer
 
 logger = logging.getLogger(__name__)
 
-@tool("launching_agent_tool")     
+
+def _emit_progress(event: dict) -> None:
+    """Send a sub-agent progress event to MetaQueryAgent.stream() consumers, if any."""
+    try:
+        get_stream_writer()({"agent_name": "LAUNCHING_AGENT", **event})
+    except Exception:
+        # Not running inside a streaming graph (e.g. direct tool call)
+        pass
+
+
+def _prepare_launching_messages(query: str) -> List[Any]:
+    """Record the incoming query and return the LaunchingAgent input: current state plus the query."""
+    conversation = current_conversation()
+    # Read before appending; the state lives with the agent's latest reply
+    state = load_state(conversation)
+
+    # Add incoming query to the conversation as user message
+    conversation.append({
+        "role": "user",
+        "content": query,
+        "agent_name": "LAUNCHING_AGENT",
+        "formatted_output": ""
+    })
+
+    # Only the persisted state and the new input, so the prompt stays the same
+    # size however long the launch conversation gets
+    return state_messages(state, query)
+
+
+def _record_result(result_message: Any) -> str:
+    """Store the LaunchingAgent result in the conversation and return the text for the supervisor."""
+    logger.debug(f"Launching agent tool result: {result_message}")
+
+    # Determine response text and return value
+    response_text = ""
+    if isinstance(result_message, dict):
+        follow_up_question = result_message.get("follow_up_question", "")
+        state = result_message.get("state", "")
+
+        if follow_up_question:
+            response_text = follow_up_question
+        elif state == "completed":
+            response_text = "Meta Campaign launch successfully"
+        else:
+            response_text = str(result_message)
+    else:
+        response_text = str(result_message)
+
+    # Add agent response to the conversation
+    current_conversation().append({
+        "role": "assistant",
+        "content": response_text,
+        "agent_name": "LAUNCHING_AGENT",
+        # The persisted launch state; error results keep the previous one current
+        "formatted_output": json.dumps(result_message, ensure_ascii=False) if isinstance(result_message, dict) and not result_message.get("error") else ""
+    })
+
+    _emit_progress({"status": "finished", "stage": result_message.get("stage") if isinstance(result_message, dict) else None})
+
+    return response_text
+
+
+def _record_error(e: Exception) -> str:
+    logger.error(f"Error in launching_agent_tool: {e}", exc_info=True)
+    error_msg = f"Error during launching campaign: {str(e)}"
+
+    # Store error in the conversation
+    current_conversation().append({
+        "role": "assistant",
+        "content": error_msg,
+        "agent_name": "LAUNCHING_AGENT",
+        "formatted_output": ""
+    })
+
+    return error_msg
+
+
+def _start_launching_agent(query: str) -> Tuple[LaunchingAgent, List[Any]]:
+    """The shared LaunchingAgent and its input for this query (recorded in the conversation)."""
+    launching_agent_messages = _prepare_launching_messages(query)
+    launching_agent = LaunchingAgent(model=OpenAILLM().get_llm_model())
+    _emit_progress({"status": "started"})
+    return launching_agent, launching_agent_messages
+
+
+@tool("launching_agent_tool")
 def launching_agent_tool(query: str) -> str:
     """
-    Meta Ads Campaign Launching agent tool. 
+    Meta Ads Campaign Launching agent tool.
     - If query is not provided: returns the follow_up_question (what Master should ask user).
     - If query is provided: returns the launching information for the query.
     """
-    try:
-        # Initialize session state messages if not exists
-        if "messages" not in st.session_state:
-            st.session_state.messages = []
-        
-        # Add incoming query to session state as user message
-        st.session_state.messages.append({
-            "role": "user",
-            "content": query,
-            "agent_name": "LAUNCHING_AGENT",
-            "formatted_output": ""
-        })
-        
-        # Get all messages related to LAUNCHING_AGENT
-        launching_agent_messages = []
-        for msg in st.session_state.messages:
-            if msg.get("agent_name") == "LAUNCHING_AGENT":
-                role = msg.get("role")
-                if role == "user":
-                    launching_agent_messages.append(HumanMessage(content=msg.get("content", "")))
-                elif role == "assistant":
-                    # Use formatted_output if available, else content
-                    content = msg.get("formatted_output") or msg.get("content", "")
-                    launching_agent_messages.append(AIMessage(content=content))
-        
-        model = OpenAILLM().get_llm_model()
-        launching_agent = LaunchingAgent(model=model)
-
-        # Invoke with all related messages
-        result_message = launching_agent.invoke(launching_agent_messages)
-
-        print(f"Launching agent tool result: {result_message}")
-
-        # Determine response text and return value
-        response_text = ""
-        if isinstance(result_message, dict):
-            follow_up_question = result_message.get("follow_up_question", "")
-            state = result_message.get("state", "")
-            
-            if follow_up_question:
-                response_text = follow_up_question
-            elif state == "completed":
-                response_text = "Meta Campaign launch successfully"
-            else:
-                response_text = str(result_message)
-        else:
-            response_text = str(result_message)
-        
-        # Add agent response to session state
-        st.session_state.messages.append({
-            "role": "assistant",
-            "content": response_text,
-            "agent_name": "LAUNCHING_AGENT",
-            "formatted_output": json.dumps(result_message, ensure_ascii=False) if isinstance(result_message, dict) else ""
-        })
-
-        # Return the response text
+    with span("launching_agent_tool", "tool", input_chars=len(query)) as tool_span, tool_scope("launching_agent_tool"):
+        try:
+            launching_agent, launching_agent_messages = _start_launching_agent(query)
+            response_text = _record_result(launching_agent.invoke(launching_agent_messages))
+        except Exception as e:
+            response_text = _record_error(e)
+        tool_span.set(output_chars=len(response_text))
         return response_text
-    
-    except Exception as e:
-        logger.error(f"Error in launching_agent_tool: {e}", exc_info=True)
-        error_msg = f"Error during launching campaign: {str(e)}"
-        
-        # Store error in session state
-        if "messages" in st.session_state:
-            st.session_state.messages.append({
-                "role": "assistant",
-                "content": error_msg,
-                "agent_name": "LAUNCHING_AGENT",
-                "formatted_output": ""
-            })
-        
-        return error_msg
+
+
+async def _alaunching_agent_tool(query: str) -> str:
+    """Native async implementation used when the supervisor runs via ainvoke/astream."""
+    with span("launching_agent_tool", "tool", input_chars=len(query)) as tool_span, tool_scope("launching_agent_tool"):
+        try:
+            launching_agent, launching_agent_messages = _start_launching_agent(query)
+            response_text = _record_result(await launching_agent.ainvoke(launching_agent_messages))
+        except Exception as e:
+            response_text = _record_error(e)
+        tool_span.set(output_chars=len(response_text))
+        return response_text
+
+
+launching_agent_tool.coroutine = _alaunching_agent_tool
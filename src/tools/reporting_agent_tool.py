@@ -1,25 +1,47 @@
+import asyncio
+
 from langchain.tools import tool
+from typing import List, Optional
+
+from src.observability.tracing import span
+from src.observability.usage import tool_scope
+from src.reporting.report import get_reporting_engine
+
+# Campaign rows listed per date range; totals always cover the whole portfolio
+MAX_TABLE_ROWS = 50
+
 
 @tool("reporting_agent_tool")
 def reporting_agent_tool(
-    campaign_id: str,
+    campaign_ids: List[str],
+    date_ranges: Optional[List[str]] = None,
+    metrics: Optional[List[str]] = None,
 ) -> str:
     """
-    Dummy tool to simulate Meta Ads reporting from a campaign ID.
-    Returns demo reporting data.
+    Meta Ads reporting for one or many campaigns in a single call.
+    - campaign_ids: every campaign the user asked about (a whole portfolio at once)
+    - date_ranges: e.g. last_7d, last_30d, yesterday, this_month, last_month or
+      2025-01-01..2025-01-31 (default last_7d)
+    - metrics: any of spend, impressions, clicks, conversions, revenue, ctr, cpc, cpa, roas (default all)
+    Returns a compact table: one row per campaign and date range, plus a TOTAL row per range.
     """
-    
-    demo_reporting_data = {
-        "spend": 100,
-        "impressions": 1000,
-        "clicks": 100,
-        "ctr": 10,
-        "conversions": 10,
-        "roas": 10
-    }
-
-    return (
-        "[DEMO] Reporting successful. "
-        f"Campaign ID: {campaign_id}. "
-        f"Reporting data: {demo_reporting_data}"            # TODO: Implement actual reporting data
-    )
+    with span("reporting_agent_tool", "tool", input_chars=sum(len(c) for c in campaign_ids)) as tool_span, tool_scope("reporting_agent_tool"):
+        try:
+            table = get_reporting_engine().report(campaign_ids, date_ranges, metrics)
+            report = f"Reporting data ({table.source} source, {len(table.campaigns)} campaigns):\n{table.to_text(MAX_TABLE_ROWS)}"
+        except ValueError as e:
+            report = f"Reporting error: {e}"
+        tool_span.set(output_chars=len(report), campaigns=len(campaign_ids))
+        return report
+
+
+async def _areporting_agent_tool(
+    campaign_ids: List[str],
+    date_ranges: Optional[List[str]] = None,
+    metrics: Optional[List[str]] = None,
+) -> str:
+    """Runs in a thread: the store source reads memory-mapped files and a cache miss computes the whole table."""
+    return await asyncio.to_thread(reporting_agent_tool.func, campaign_ids, date_ranges, metrics)
+
+
+reporting_agent_tool.coroutine = _areporting_agent_tool
@@ -0,0 +1,30 @@
+from langchain_openai import ChatOpenAI
+
+from src.agents.agent_registry import AgentRegistry, agent_registry, model_key
+from src.agents.meta_query_agent import MetaQueryAgent
+
+
+def _client():
+    return ChatOpenAI(model="gpt-4.1", api_key="test")
+
+
+def test_get_or_build_builds_once_per_key():
+    registry = AgentRegistry()
+    builds = []
+    first = registry.get_or_build("graph", "a", lambda: builds.append(1) or object())
+    assert registry.get_or_build("graph", "a", lambda: builds.append(1) or object()) is first
+    assert len(builds) == 1
+    assert registry.stats()["graph"]["entries"] == 1
+    assert registry.holds(first) and not registry.holds(object())
+
+
+def test_only_registered_models_are_keyed():
+    shared = agent_registry.get_or_build("model", ("test-shared",), _client)
+    assert model_key(shared) == model_key(shared)
+    assert model_key("gpt-4.1") == "gpt-4.1"
+    assert model_key(_client()) is None
+
+
+def test_equally_configured_clients_do_not_share_a_graph():
+    agents = [MetaQueryAgent(model=_client()) for _ in range(2)]
+    assert agents[0].agent is not agents[1].agent
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.agents.launch_stage_machine import FOLLOW_UP_QUESTIONS
+from src.agents.launching_agent import LaunchingAgent
+from src.conversation.conversation_store import InMemoryConversationStore
+from src.conversation.session import bind_conversation
+from src.llms.fake_llm import FakeChatModel, launch_flow_reply
+from src.states.launching_agent_state import LaunchingAgentState
+from src.tools import reporting_agent_tool as reporting_module
+from src.tools.image_generation_tool import image_generation_tool
+from src.tools.launching_agent_tool import launching_agent_tool
+from src.tools.reporting_agent_tool import reporting_agent_tool
+
+
+@pytest.fixture(autouse=True)
+def scratch_dir(tmp_path, monkeypatch):
+    # Turn logs and generated creatives are written relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("LLM_STAND_IN", "1")
+    monkeypatch.setenv("CREATIVES_PATH", str(tmp_path / "creatives"))
+    monkeypatch.setenv("CREATIVE_LOCAL_LATENCY", "0")
+
+
+def test_launching_agent_ainvoke_matches_invoke():
+    agent = LaunchingAgent(model=FakeChatModel(responses=[launch_flow_reply]), fast_path=False)
+    messages = [HumanMessage(content="I want to launch a campaign")]
+    assert asyncio.run(agent.ainvoke(messages)) == agent.invoke(messages)
+
+    fast = LaunchingAgent(model=FakeChatModel(responses=[launch_flow_reply]), fast_path=True)
+    answer = [AIMessage(content=LaunchingAgentState(objective="Traffic").model_dump_json()), HumanMessage(content="India")]
+    assert asyncio.run(fast.ainvoke(answer)) == fast.invoke(answer)
+
+
+def test_launching_tool_coroutine_records_the_turn_like_the_sync_tool():
+    replies = []
+    for run in (launching_agent_tool.invoke, lambda args: asyncio.run(launching_agent_tool.ainvoke(args))):
+        conversation = InMemoryConversationStore().conversation()
+        with bind_conversation(conversation):
+            replies.append(run({"query": "launch a traffic campaign"}))
+        assert [m["role"] for m in conversation.messages()] == ["user", "assistant"]
+    assert replies[0] == replies[1] == FOLLOW_UP_QUESTIONS["geo"]
+
+
+def test_reporting_tool_coroutine_runs_off_the_event_loop(monkeypatch):
+    threads = []
+    get_engine = reporting_module.get_reporting_engine
+    monkeypatch.setattr(reporting_module, "get_reporting_engine", lambda: threads.append(threading.get_ident()) or get_engine())
+    args = {"campaign_ids": ["123", "456"], "date_ranges": ["yesterday"], "metrics": ["spend"]}
+
+    async def main():
+        return await reporting_agent_tool.ainvoke(args), threading.get_ident()
+
+    report, loop_thread = asyncio.run(main())
+    assert report == reporting_agent_tool.invoke(args)
+    assert threads[0] != loop_thread
+
+
+def test_image_generation_tool_coroutine():
+    report = asyncio.run(image_generation_tool.ainvoke({"product_url": "https://shop.example.com/p/1", "num_images": 2}))
+    assert "Image generation successful" in report
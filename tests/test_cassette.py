@@ -0,0 +1,40 @@
+import pytest
+from langchain_core.messages import HumanMessage
+
+from src.llms.cassette import Cassette, CassetteChatModel, CassetteMiss
+from src.llms.fake_llm import FakeChatModel
+
+
+def test_auto_mode_records_once_then_replays(tmp_path):
+    cassette = Cassette(str(tmp_path / "llm.cassette"))
+    model = CassetteChatModel(inner=FakeChatModel(responses=["first", "second"]), cassette=cassette)
+    assert model.invoke([HumanMessage(content="hi")]).text == "first"
+    assert model.invoke([HumanMessage(content="hi")]).text == "first"
+    assert model.invoke([HumanMessage(content="other")]).text == "second"
+    assert (cassette.stats()["recorded"], cassette.stats()["hits"]) == (2, 1)
+
+
+def test_replay_mode_reads_a_reopened_cassette_and_raises_on_a_miss(tmp_path):
+    path = str(tmp_path / "llm.cassette")
+    CassetteChatModel(inner=FakeChatModel(responses=["recorded"]), cassette=Cassette(path)).invoke([HumanMessage(content="hi")])
+
+    replay = CassetteChatModel(inner=FakeChatModel(responses=["live"]), cassette=Cassette(path), mode="replay")
+    assert replay.invoke([HumanMessage(content="hi")]).text == "recorded"
+    with pytest.raises(CassetteMiss):
+        replay.invoke([HumanMessage(content="never recorded")])
+
+
+def test_missing_index_is_rebuilt_from_the_data_file(tmp_path):
+    path = tmp_path / "llm.cassette"
+    model = CassetteChatModel(inner=FakeChatModel(responses=["a", "b"]), cassette=Cassette(str(path)))
+    model.invoke([HumanMessage(content="one")])
+    model.invoke([HumanMessage(content="two")])
+    (tmp_path / "llm.cassette.idx").unlink()
+    with open(path, "ab") as f:
+        f.write(b"\x00" * 7)  # torn write
+    assert len(Cassette(str(path))) == 2
+
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        CassetteChatModel(inner=FakeChatModel(responses=["a"]), cassette=Cassette(str(tmp_path / "c")), mode="rewind")
@@ -0,0 +1,57 @@
+import json
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from src.agents.context_budget import ContextBudget, estimate_tokens
+
+
+def _history(turns):
+    messages = []
+    for i in range(turns):
+        messages.append(HumanMessage(content=f"question number {i} about campaign performance and budgets"))
+        messages.append(AIMessage(content=json.dumps({"context": f"mode=reporting | stage=turn{i}", "response": f"answer {i} " * 20})))
+    return messages
+
+
+def test_short_history_is_kept_verbatim():
+    history = _history(2)
+    budgeted, report = ContextBudget(keep_recent=12).apply(history)
+    assert budgeted == history and report.saved == 0
+
+
+def test_older_replies_are_stripped_and_latest_structured_reply_kept():
+    history = _history(10) + [HumanMessage(content="and now?")]
+    budgeted, report = ContextBudget(max_tokens=100_000, keep_recent=1).apply(history)
+    assert report.stripped == 9  # every older reply but the latest structured one
+    assert budgeted[1].text == "answer 0 " * 20
+    assert budgeted[-2] is history[-2] and budgeted[-2].text.startswith("{")
+
+
+def test_over_budget_history_is_summarized():
+    history = _history(30) + [ToolMessage(content="x" * 2000, tool_call_id="t")]
+    budget = ContextBudget(max_tokens=600, keep_recent=4, summary_tokens=300)
+    budgeted, report = budget.apply(history)
+    assert isinstance(budgeted[0], SystemMessage) and budgeted[0].text.startswith("Summary of earlier conversation")
+    assert report.tokens_after < report.tokens_before
+    assert report.summarized + report.dropped == len(history) - 5  # all but the verbatim window
+    assert budgeted[-5:] == history[-5:]
+    assert budget.stats()["trimmed_turns"] == 1
+
+
+def test_estimate_tokens_counts_words_and_punctuation():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("hi, there!") == 5
+
+
+def test_summarized_head_is_byte_stable_across_turns():
+    # Two summary blocks of two turns fit the budget: the head changes every fourth turn, not every turn
+    budget = ContextBudget(max_tokens=600, keep_recent=4, summary_tokens=300)
+    history = _history(20)
+    summaries = []
+    for turn in range(20, 32):
+        budgeted, _ = budget.apply(history)
+        summaries.append(budgeted[0].text)
+        history = history + _history(turn + 1)[-2:]
+    appended = [later.startswith(earlier) for earlier, later in zip(summaries, summaries[1:])]
+    assert appended.count(False) == 2  # at turns 24 and 28
+    assert budget.stats()["trimmed_turns"] == 12
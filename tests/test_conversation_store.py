@@ -0,0 +1,91 @@
+import pytest
+
+from src.conversation.conversation_store import (
+    ConversationStore,
+    FileConversationStore,
+    InMemoryConversationStore,
+    SQLiteConversationStore,
+)
+from src.creatives.backends import GenerationBackend
+from src.reporting.metrics_source import MetricsSource
+
+
+@pytest.fixture(params=["memory", "sqlite", "file"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteConversationStore(str(tmp_path / "conversations.db"))
+    if request.param == "file":
+        return FileConversationStore(str(tmp_path / "conversations.jsonl"))
+    return InMemoryConversationStore()
+
+
+def test_messages_by_conversation_and_agent(store):
+    conversation_id = store.create_conversation()
+    store.append(conversation_id, {"role": "user", "content": "launch", "agent_name": "LAUNCHING_AGENT"})
+    store.append(conversation_id, {"role": "assistant", "content": "ok", "agent_name": "META_QUERY_AGENT"})
+    store.append(conversation_id, {"role": "assistant", "content": "objective?", "agent_name": "LAUNCHING_AGENT"})
+
+    assert [m["content"] for m in store.get_messages(conversation_id)] == ["launch", "ok", "objective?"]
+    assert [m["content"] for m in store.get_messages(conversation_id, "LAUNCHING_AGENT")] == ["launch", "objective?"]
+    assert [m["content"] for m in store.get_messages(conversation_id, since=2)] == ["objective?"]
+
+
+def test_conversation_handle_picks_up_messages_written_through_the_store(store):
+    conversation = store.conversation()
+    conversation.append({"role": "user", "content": "hi", "agent_name": "META_QUERY_AGENT"})
+    store.append(conversation.id, {"role": "assistant", "content": "hello", "agent_name": "META_QUERY_AGENT"})
+    assert len(conversation) == 2
+    assert [m.text for m in conversation.langchain_messages()] == ["hi", "hello"]
+
+
+@pytest.mark.parametrize("kind", ["sqlite", "file"])
+def test_durable_stores_survive_a_reopen(kind, tmp_path):
+    make = {"sqlite": SQLiteConversationStore, "file": FileConversationStore}[kind]
+    path = str(tmp_path / "conversations")
+    conversation_id = make(path).create_conversation()
+    make(path).append(conversation_id, {"role": "user", "content": "hi", "agent_name": ""})
+    reopened = make(path)
+    assert reopened.has_conversation(conversation_id)
+    assert [m["content"] for m in reopened.get_messages(conversation_id)] == ["hi"]
+
+
+@pytest.mark.parametrize("base", [ConversationStore, MetricsSource, GenerationBackend])
+def test_incomplete_implementations_fail_at_instantiation(base):
+    incomplete = type("Incomplete", (base,), {})
+    with pytest.raises(TypeError):
+        incomplete()
+
+
+def test_handle_starts_over_after_a_clear_by_another_worker(store):
+    conversation = store.conversation()
+    for text in ("a", "b", "c"):
+        conversation.append({"role": "user", "content": text, "agent_name": ""})
+    assert len(conversation) == 3
+
+    store.clear(conversation.id)
+    store.append(conversation.id, {"role": "user", "content": "fresh", "agent_name": ""})
+    assert [m["content"] for m in conversation.messages()] == ["fresh"]
+    conversation.append({"role": "assistant", "content": "reply", "agent_name": ""})
+    assert [m["content"] for m in store.get_messages(conversation.id)] == ["fresh", "reply"]
+
+
+def test_sqlite_workers_share_clears(tmp_path):
+    path = str(tmp_path / "conversations.db")
+    first, second = SQLiteConversationStore(path), SQLiteConversationStore(path)
+    mine = first.conversation()
+    mine.append({"role": "user", "content": "old", "agent_name": ""})
+    theirs = second.conversation(mine.id)
+    assert len(theirs) == 1
+
+    theirs.clear()
+    theirs.append({"role": "user", "content": "new", "agent_name": ""})
+    assert [m["content"] for m in mine.messages()] == ["new"]
+
+
+def test_usage_totals_add_up_and_survive_a_clear(store):
+    conversation_id = store.create_conversation()
+    store.add_usage(conversation_id, {"input_tokens": 10, "cost_usd": 0.5})
+    store.add_usage(conversation_id, {"input_tokens": 5})
+    store.clear(conversation_id)
+    assert store.usage(conversation_id) == {"input_tokens": 15, "cost_usd": 0.5}
+    assert store.usage("unknown") == {}
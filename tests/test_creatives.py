@@ -0,0 +1,36 @@
+from src.creatives.backends import CreativeSpec, GenerationBackend, LocalGenerationBackend
+from src.creatives.generator import MAX_IMAGES, CreativeGenerator, CreativeStore
+
+URL = "https://shop.example.com/product/1"
+
+
+def test_generated_creatives_are_reused_from_the_store(tmp_path):
+    store = CreativeStore(str(tmp_path), base_url="https://cdn.example.com/creatives")
+    generator = CreativeGenerator(LocalGenerationBackend(latency=0.0, size=8), store, spare_variants=0)
+    first = generator.generate(URL, num_images=2)
+    assert [c.variant for c in first.creatives] == [0, 1]
+    assert (first.generated, first.cached, first.failed) == (2, 0, 0)
+    assert first.creatives[0].url.startswith("https://cdn.example.com/creatives/")
+    with open(first.creatives[0].path, "rb") as f:
+        assert f.read(8) == b"\x89PNG\r\n\x1a\n"
+
+    # A fresh generator over the same store doesn't call the backend again
+    again = CreativeGenerator(LocalGenerationBackend(latency=0.0, size=8), store, spare_variants=0).generate(URL, num_images=2)
+    assert again.generated == 0 and all(c.cached for c in again.creatives)
+    assert [c.path for c in again.creatives] == [c.path for c in first.creatives]
+    assert len(generator.generate(URL, num_images=MAX_IMAGES + 5).creatives) == MAX_IMAGES
+
+
+class _FlakyBackend(GenerationBackend):
+    name = "flaky"
+
+    def generate(self, spec: CreativeSpec) -> bytes:
+        if spec.variant == 0:
+            raise RuntimeError("model overloaded")
+        return b"image"
+
+
+def test_spare_variant_covers_a_failed_one(tmp_path):
+    result = CreativeGenerator(_FlakyBackend(), CreativeStore(str(tmp_path)), spare_variants=1).generate(URL, num_images=2)
+    assert result.failed == 1
+    assert [c.variant for c in result.creatives] == [1, 2]
@@ -0,0 +1,33 @@
+from datetime import date
+
+import pytest
+
+from src.reporting.date_ranges import find_date_ranges, parse_date_range, period_phrases, unparsed_period_phrases
+
+TODAY = date(2025, 3, 10)
+
+
+@pytest.mark.parametrize("spec, start, end", [
+    ("today", date(2025, 3, 10), date(2025, 3, 10)),
+    ("yesterday", date(2025, 3, 9), date(2025, 3, 9)),
+    ("last 7 days", date(2025, 3, 3), date(2025, 3, 9)),
+    ("this_month", date(2025, 3, 1), date(2025, 3, 10)),
+    ("last month", date(2025, 2, 1), date(2025, 2, 28)),
+    ("2025-01-01..2025-01-31", date(2025, 1, 1), date(2025, 1, 31)),
+])
+def test_parse_date_range(spec, start, end):
+    parsed = parse_date_range(spec, TODAY)
+    assert (parsed.start, parsed.end) == (start, end)
+
+
+@pytest.mark.parametrize("spec", ["last_0d", "2025-02-01..2025-01-01", "last quarter"])
+def test_invalid_ranges_raise(spec):
+    with pytest.raises(ValueError):
+        parse_date_range(spec, TODAY)
+
+
+def test_ranges_and_periods_in_free_text():
+    text = "spend for last_30d and yesterday, and for 2025-01-01 to 2025-01-31 vs last quarter"
+    assert find_date_ranges(text) == ["last_30d", "yesterday", "2025-01-01 to 2025-01-31"]
+    assert unparsed_period_phrases(text) == ["last quarter"]
+    assert period_phrases("may I see march vs 1 may") == ["march", "may"]
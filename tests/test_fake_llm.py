@@ -0,0 +1,40 @@
+import asyncio
+import json
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from src.llms.fake_llm import FakeChatModel, launch_flow_reply, tool_call_message
+
+
+def test_replies_cycle_and_carry_usage():
+    model = FakeChatModel(responses=["plain", {"response": "json"}, tool_call_message("reporting_agent_tool", {"campaign_ids": ["1"]})])
+    first = model.invoke([HumanMessage(content="abcdefgh")])
+    assert first.text == "plain"
+    assert first.usage_metadata["input_tokens"] == 2 and first.usage_metadata["output_tokens"] == 2
+    assert json.loads(model.invoke([HumanMessage(content="x")]).text) == {"response": "json"}
+    assert model.invoke([HumanMessage(content="x")]).tool_calls[0]["args"] == {"campaign_ids": ["1"]}
+    assert model.invoke([HumanMessage(content="x")]).text == "plain"
+
+
+def test_repeated_prefix_is_reported_as_cached_input():
+    model = FakeChatModel(responses=["ok"], prompt_cache_min_tokens=128)
+    system = SystemMessage(content="s" * 4 * 300)
+    assert model.invoke([system, HumanMessage(content="one")]).usage_metadata["input_token_details"]["cache_read"] == 0
+    assert model.invoke([system, HumanMessage(content="two")]).usage_metadata["input_token_details"]["cache_read"] == 256
+
+
+def test_stream_matches_invoke():
+    model = FakeChatModel(responses=["streamed reply"], token_chars=3)
+    chunks = list(model.stream([HumanMessage(content="hi")]))
+    assert "".join(c.text for c in chunks) == "streamed reply"
+    assert len(chunks) == 6  # five content pieces and the final usage chunk
+
+    async def collect():
+        return [c.text async for c in model.astream([HumanMessage(content="hi")])]
+    assert "".join(asyncio.run(collect())) == "streamed reply"
+
+
+def test_launch_flow_reply_asks_for_the_next_field():
+    state = launch_flow_reply([HumanMessage(content="launch a campaign")])
+    assert (state["stage"], state["objective"]) == ("CAMPAIGN_INFO", None)
+    assert "objective" in state["follow_up_question"]
@@ -0,0 +1,60 @@
+import http.client
+import json
+import threading
+
+from langchain_core.messages import AIMessage
+
+from src.conversation.conversation_store import InMemoryConversationStore
+from src.server.http_server import AgentHTTPServer
+from src.server.scheduler import TurnScheduler
+
+
+class _Agent:
+    """Supervisor stand-in: answers "hello", fails on anything else."""
+
+    async def astream(self, messages):
+        if messages[-1].text != "hello":
+            raise RuntimeError("model unavailable")
+        result = {"messages": [AIMessage(content="hi")], "structured_response": {"context": "mode=clarify", "response": "hi"}}
+        yield {"type": "final", "result": result}
+
+
+def _serve():
+    scheduler = TurnScheduler(_Agent(), max_workers=2, store=InMemoryConversationStore())
+    server = AgentHTTPServer(("127.0.0.1", 0), scheduler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, scheduler
+
+
+def _request(server, method, path, body=None):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=10)
+    connection.request(method, path, body=json.dumps(body) if body is not None else None, headers={"Content-Type": "application/json"})
+    response = connection.getresponse()
+    payload = json.loads(response.read())
+    connection.close()
+    return response.status, payload
+
+
+def test_turn_round_trip_and_failed_turn_returns_json_500():
+    server, scheduler = _serve()
+    try:
+        status, created = _request(server, "POST", "/conversations")
+        assert status == 201
+        path = f"/conversations/{created['conversation_id']}/messages"
+
+        status, turn = _request(server, "POST", path, {"content": "hello"})
+        assert status == 200 and turn["response"] == "hi"
+
+        status, error = _request(server, "POST", path, {"content": "boom"})
+        assert status == 500
+        assert error["error"] == "turn failed" and "model unavailable" in error["detail"]
+
+        # The failed turn is answered in the history, and no per-conversation lock is left behind
+        status, history = _request(server, "GET", path)
+        assert [(m["role"], m["content"]) for m in history["messages"]][-2:] == [
+            ("user", "boom"), ("assistant", "Error during master agent: model unavailable"),
+        ]
+        assert scheduler._conversation_locks == {}
+    finally:
+        server.shutdown()
+        scheduler.shutdown()
@@ -0,0 +1,94 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from langchain_openai import ChatOpenAI
+
+from src.llms.http_transport import HTTPTransportConfig, SharedHTTPTransport
+
+
+class _StubOpenAIHandler(BaseHTTPRequestHandler):
+    """Minimal OpenAI-compatible chat completions endpoint with keep-alive."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        body = json.dumps({
+            "id": "stub", "object": "chat.completion", "created": 0, "model": "stub",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "pong"}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def stub_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubOpenAIHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+def _model(transport, url):
+    return ChatOpenAI(
+        model="stub", api_key="test", base_url=url, max_retries=0,
+        http_client=transport.sync_client, http_async_client=transport.async_client,
+    )
+
+
+def test_sync_calls_reuse_one_connection(stub_url):
+    transport = SharedHTTPTransport(HTTPTransportConfig(http2=False))
+    model = _model(transport, stub_url)
+    assert [model.invoke("ping").content for _ in range(3)] == ["pong"] * 3
+    sync = transport.metrics()["sync"]
+    assert (sync["requests"], sync["errors"], sync["open_connections"]) == (3, 0, 1)
+    transport.close()
+    assert transport.sync_client.is_closed
+
+
+def test_async_client_works_across_event_loops(stub_url):
+    # Streamlit threads run asyncio.run() per call while the server has its own long-lived loop
+    transport = SharedHTTPTransport(HTTPTransportConfig(http2=False))
+    model = _model(transport, stub_url)
+    assert asyncio.run(model.ainvoke("ping")).content == "pong"
+    assert asyncio.run(model.ainvoke("ping")).content == "pong"
+
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    assert asyncio.run_coroutine_threadsafe(model.ainvoke("ping"), loop).result(timeout=10).content == "pong"
+    metrics = transport.metrics()["async"]
+    assert (metrics["requests"], metrics["errors"]) == (3, 0)
+    assert metrics["event_loops"] == 1  # the pools of the two closed loops were dropped
+
+    # Shutdown closes the server loop's pool on that loop
+    transport.close()
+    assert transport.metrics()["async"]["event_loops"] == 0
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
+    loop.close()
+
+
+def test_aclose_closes_the_running_loops_pool(stub_url):
+    transport = SharedHTTPTransport(HTTPTransportConfig(http2=False))
+    model = _model(transport, stub_url)
+
+    async def main():
+        await model.ainvoke("ping")
+        assert transport.metrics()["async"]["open_connections"] == 1
+        await transport.aclose()
+        assert transport.metrics()["async"]["event_loops"] == 0
+
+    asyncio.run(main())
+    assert transport.sync_client.is_closed
@@ -0,0 +1,48 @@
+import json
+from datetime import date
+
+import numpy as np
+
+from src.reporting.date_ranges import DateRange
+from src.reporting.ingest import IngestPipeline, read_chunks
+from src.reporting.metrics_store import MetricsStore
+
+HEADER = "Campaign ID,Reporting starts,Amount spent,Impressions,Link clicks,Results,Purchases conversion value\n"
+
+
+def test_csv_export_is_loaded_with_restatements_and_bad_rows(tmp_path):
+    path = tmp_path / "export.csv"
+    path.write_text(
+        HEADER
+        + "101,2025-03-01,10,1000,50,2,40\n"
+        + "101,2025-03-01,12,1100,55,3,60\n"  # restated in the same file: the last row wins
+        + "102,2025-03-02,5,,10,1,20\n"
+        + "102,not a date,5,500,10,1,20\n"
+        + "103,2025-03-02,7,700,14,1,"  # still being written
+    )
+    pipeline = IngestPipeline(MetricsStore(str(tmp_path / "store")), chunk_rows=2)
+    stats = pipeline.ingest_file(str(path))
+    assert (stats.rows_read, stats.rows_written, stats.duplicates, stats.bad_rows) == (4, 2, 1, 1)
+    assert np.allclose(pipeline.totals(["101", "102", "103"]), [[12, 1100, 55, 3, 60], [5, 0, 10, 1, 20], [0] * 5])
+
+    # The finished line is picked up from the saved offset; an updated day replaces the old value
+    with open(path, "a") as f:
+        f.write("\n101,2025-03-01,20,2000,90,4,80\n")
+    reopened = IngestPipeline(MetricsStore(str(tmp_path / "store")))
+    stats = reopened.ingest_file(str(path))
+    assert (stats.rows_read, stats.restated) == (2, 1)
+    assert np.allclose(reopened.totals(["101", "103"]), [[20, 2000, 90, 4, 80], [7, 700, 14, 1, 0]])
+    march = DateRange(date(2025, 3, 1), date(2025, 3, 31), "march")
+    assert np.allclose(reopened.store.totals(["101", "102", "103"], march), reopened.totals(["101", "102", "103"]))
+
+
+def test_jsonl_export_uses_field_aliases(tmp_path):
+    path = tmp_path / "export.jsonl"
+    records = [
+        {"campaign_id": 7, "date_start": "2025-03-01T00:00:00", "spend": "1.5", "purchase_value": 3},
+        {"Campaign": "8", "Date": "2025-03-01", "Amount_Spent": 2, "clicks": 4},
+    ]
+    path.write_text("".join(json.dumps(r) + "\n" for r in records) + "not json\n")
+    (chunk, offset), = read_chunks(str(path))
+    assert chunk.campaign_ids == ["7", "8"] and chunk.bad_rows == 1 and offset == path.stat().st_size
+    assert np.allclose(chunk.values, [[1.5, 0, 0, 0, 3], [2, 0, 4, 0, 0]])
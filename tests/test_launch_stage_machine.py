@@ -0,0 +1,66 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.agents.launch_stage_machine import (
+    FOLLOW_UP_QUESTIONS,
+    allowed_stage,
+    enforce_transitions,
+    load_state,
+    next_state,
+    pending_field,
+    state_messages,
+)
+from src.agents.launching_agent import LaunchingAgent
+from src.conversation.conversation_store import InMemoryConversationStore
+from src.llms.fake_llm import FakeChatModel, launch_flow_reply
+from src.states.launching_agent_state import LaunchingAgentState
+
+CAMPAIGN_INFO = {"objective": "Traffic", "geo": "India", "daily_budget": 500, "start_time": "2026-11-01T09:00:00"}
+
+
+def test_fields_are_asked_for_in_stage_order():
+    state = LaunchingAgentState()
+    assert pending_field(state) == "objective"
+    assert next_state(state).follow_up_question == FOLLOW_UP_QUESTIONS["objective"]
+
+    state = LaunchingAgentState(**CAMPAIGN_INFO, creative_mode="GENERATE")
+    advanced = next_state(state)
+    assert (advanced.stage, pending_field(state)) == ("CREATIVE", "product_url")
+
+    # Generated creatives need the model (image generation) before the flow can go on
+    assert next_state(state.model_copy(update={"product_url": "https://example.com/p"})) is None
+
+
+def test_model_cannot_skip_a_stage_or_complete_without_confirmation():
+    proposed = LaunchingAgentState(stage="LAUNCHING", state="completed", objective="Sales")
+    clamped = enforce_transitions(proposed)
+    assert (clamped.stage, clamped.state) == ("CAMPAIGN_INFO", "ongoing")
+    assert clamped.follow_up_question == FOLLOW_UP_QUESTIONS["geo"]
+
+    ready = LaunchingAgentState(stage="LAUNCHING", state="completed", creative_mode="USER_PROVIDED",
+                                creative_urls=["https://example.com/a.png"], user_confirmation="YES", **CAMPAIGN_INFO)
+    assert allowed_stage(ready) == "LAUNCHING"
+    assert enforce_transitions(ready) is ready
+
+
+def test_state_is_loaded_from_the_latest_stored_reply():
+    conversation = InMemoryConversationStore().conversation()
+    assert load_state(conversation) is None
+    state = LaunchingAgentState(objective="Leads")
+    conversation.append({"role": "assistant", "content": "geo?", "agent_name": "LAUNCHING_AGENT", "formatted_output": state.model_dump_json()})
+    conversation.append({"role": "assistant", "content": "error", "agent_name": "LAUNCHING_AGENT", "formatted_output": ""})
+    assert load_state(conversation) == state
+
+    messages = state_messages(state, "India")
+    assert isinstance(messages[0], AIMessage) and messages[-1] == HumanMessage(content="India")
+
+
+def test_launching_agent_skips_the_model_for_recognized_answers(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    model = FakeChatModel(responses=[launch_flow_reply])
+    agent = LaunchingAgent(model=model, fast_path=True)
+    previous = LaunchingAgentState(objective="Traffic", follow_up_question=FOLLOW_UP_QUESTIONS["geo"])
+    state = agent.invoke([AIMessage(content=previous.model_dump_json()), HumanMessage(content="India")])
+    assert state["geo"] == "India" and state["follow_up_question"] == FOLLOW_UP_QUESTIONS["daily_budget"]
+
+    retry = agent.invoke([AIMessage(content=LaunchingAgentState(**{**CAMPAIGN_INFO, "daily_budget": None}).model_dump_json()), HumanMessage(content="0")])
+    assert retry["daily_budget"] is None and retry["follow_up_question"].endswith(FOLLOW_UP_QUESTIONS["daily_budget"])
@@ -0,0 +1,49 @@
+import json
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from src.conversation.conversation_store import InMemoryConversationStore
+from src.conversation.message_log import MessageLog
+from src.conversation.session import bind_conversation, current_conversation, current_conversation_id
+from src.conversation.turn import record_turn_result, record_user_message, split_result
+
+
+def test_views_by_agent_and_role_convert_each_message_once():
+    log = MessageLog([
+        {"role": "user", "content": "launch", "agent_name": ""},
+        {"role": "assistant", "content": "ok", "agent_name": "META_QUERY_AGENT", "formatted_output": '{"response": "ok"}'},
+        {"role": "tool", "content": "state", "agent_name": "LAUNCHING_AGENT", "tool_call_id": "c1", "name": "launching_agent_tool"},
+        {"role": "system", "content": "ignored", "agent_name": ""},
+    ])
+    everything = log.langchain_messages()
+    assert [type(m) for m in everything] == [HumanMessage, AIMessage, ToolMessage]
+    assert everything[1].text == '{"response": "ok"}'
+    assert log.langchain_messages(roles=("user", "tool"))[0] is everything[0]
+    assert [m["content"] for m in log.messages("LAUNCHING_AGENT")] == ["state"]
+    assert log.last(roles=("assistant",), with_field="formatted_output")["content"] == "ok"
+    assert log.last("REPORTING_AGENT") is None
+
+
+def test_turn_is_recorded_with_its_tool_messages():
+    conversation = InMemoryConversationStore().conversation()
+    record_user_message(conversation, "spend for campaign 123")
+    result = {
+        "structured_response": {"context": "mode=reporting", "response": "spend 10"},
+        "tool_calls": [{"name": "reporting_agent_tool", "content": "spend 10", "tool_call_id": "c1"}],
+    }
+    structured, tool_calls = split_result(result)
+    assert record_turn_result(conversation, structured, tool_calls) == "spend 10"
+
+    reply, tool = conversation.messages()[1:]
+    assert json.loads(reply["formatted_output"]) == structured
+    assert (tool["agent_name"], tool["tool_call_id"]) == ("REPORTING_AGENT", "c1")
+    assert split_result("plain text") == ({"response": "plain text", "context": {}}, [])
+
+
+def test_bound_conversation_is_current_only_inside_the_block():
+    conversation = InMemoryConversationStore().conversation()
+    assert current_conversation_id() is None
+    with bind_conversation(conversation):
+        assert current_conversation() is conversation
+        assert current_conversation_id() == conversation.id
+    assert current_conversation_id() is None
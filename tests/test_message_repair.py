@@ -0,0 +1,32 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from src.agents.message_repair import repair_tool_messages
+
+
+def _call(call_id):
+    return {"name": "reporting_agent_tool", "args": {}, "id": call_id, "type": "tool_call"}
+
+
+def test_valid_history_is_left_alone():
+    history = [HumanMessage(content="q"), AIMessage(content="", tool_calls=[_call("a")]), ToolMessage(content="r", tool_call_id="a"), AIMessage(content="done")]
+    cleaned, report = repair_tool_messages(history)
+    assert cleaned == history and not report.changed
+
+
+def test_orphans_and_unanswered_calls_are_repaired():
+    history = [
+        ToolMessage(content="orphan", tool_call_id="x"),
+        HumanMessage(content="q"),
+        AIMessage(content="", tool_calls=[_call("a"), _call("b")]),
+        ToolMessage(content="r", tool_call_id="a"),
+        ToolMessage(content="again", tool_call_id="a"),
+        HumanMessage(content="next"),
+        AIMessage(content="", tool_calls=[_call("c")]),
+        HumanMessage(content="last"),
+    ]
+    cleaned, report = repair_tool_messages(history)
+    assert [m.text for m in cleaned] == ["q", "", "r", "next", "last"]
+    assert [tc["id"] for tc in cleaned[1].tool_calls] == ["a"]
+    assert [d["reason"] for d in report.dropped_tool_messages] == ["no preceding AIMessage with tool_calls", "already answered"]
+    assert [s["tool_call_id"] for s in report.stripped_tool_calls] == ["b", "c"]
+    assert report.dropped_ai_messages == [6]
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from src.agents.meta_query_agent import MetaQueryAgent
+from src.agents.response_cache import ResponseCache
+from src.llms.fake_llm import FakeChatModel, tool_call_message
+
+CLARIFY_REPLY = {
+    "context": "mode=clarify | stage=intake | question=launch_or_reporting",
+    "response": "Would you like to launch a campaign or see a report?",
+}
+
+
+@pytest.fixture(autouse=True)
+def scratch_dir(tmp_path, monkeypatch):
+    # Turn logs are written relative to the working directory
+    monkeypatch.chdir(tmp_path)
+
+
+async def _collect(events):
+    return [event async for event in events]
+
+
+def _run_all(agent, text):
+    """Results of the same turn through invoke, ainvoke, stream and astream, plus the stream event types."""
+    messages = [HumanMessage(content=text)]
+    streamed = list(agent.stream(messages))
+    astreamed = asyncio.run(_collect(agent.astream(messages)))
+    assert [e["type"] for e in streamed] == [e["type"] for e in astreamed]
+    results = [agent.invoke(messages), asyncio.run(agent.ainvoke(messages)), streamed[-1]["result"], astreamed[-1]["result"]]
+    return results, [e["type"] for e in streamed]
+
+
+def test_stream_paints_tool_progress_then_the_response_token_by_token():
+    reply = {"context": "mode=reporting | stage=report", "response": "Campaign 123 spent $10 yesterday."}
+    model = FakeChatModel(responses=[tool_call_message("reporting_agent_tool", {"campaign_ids": ["123"]}), reply], token_chars=3)
+    events = list(MetaQueryAgent(model=model).stream([HumanMessage(content="how did my best campaign do?")]))
+    types = [e["type"] for e in events]
+    assert types.index("tool_start") < types.index("tool_end") < types.index("token")
+    tokens = [e["text"] for e in events if e["type"] == "token"]
+    assert len(tokens) > 1 and "".join(tokens) == reply["response"]
+    assert [e["value"] for e in events if e["type"] == "field" and e["field"] == "context"] == [reply["context"]]
+    assert types[-1] == "final" and events[-1]["result"]["structured_response"] == reply
+
+
+def test_entry_points_agree_on_a_model_turn():
+    agent = MetaQueryAgent(model=FakeChatModel(responses=[CLARIFY_REPLY]))
+    results, events = _run_all(agent, "hi there")
+    assert all(r["structured_response"]["response"] == CLARIFY_REPLY["response"] for r in results)
+    assert events[-1] == "final"
+
+
+def test_entry_points_agree_on_a_pre_routed_turn():
+    summary = {"context": "mode=reporting | stage=report", "response": "Campaign 123 spent $10 yesterday."}
+    agent = MetaQueryAgent(model=FakeChatModel(responses=[summary]))
+    results, events = _run_all(agent, "spend for campaign 123 yesterday")
+    assert {r["routed"] for r in results} == {"campaign_report"}
+    # The report is routed straight to the tool, then the model phrases the reply
+    assert all(r["structured_response"]["response"] == summary["response"] for r in results)
+    assert all([tc["name"] for tc in r["tool_calls"]] == ["reporting_agent_tool"] for r in results)
+    assert events[:2] == ["tool_start", "tool_end"] and "token" in events and events[-1] == "final"
+
+
+def test_routed_launch_relays_the_launching_agent():
+    agent = MetaQueryAgent(model=FakeChatModel(responses=[CLARIFY_REPLY]))
+    result = agent.invoke([HumanMessage(content="launch a campaign for my shoe store")])
+    assert result["routed"] == "explicit_launch"
+    assert result["structured_response"]["context"].startswith("mode=launch | stage=pre_routed")
+    assert result["structured_response"]["response"] != CLARIFY_REPLY["response"]
+
+
+def test_cached_turn_skips_the_model():
+    cache = ResponseCache()
+    agent = MetaQueryAgent(model=FakeChatModel(responses=[CLARIFY_REPLY]), response_cache=cache)
+    messages = [HumanMessage(content="spend for campaign 123 yesterday")]
+    first = agent.invoke(messages)
+    events = list(agent.stream(messages))
+    assert [e["type"] for e in events] == ["token", "final"]
+    assert events[-1]["result"]["cached"] == "exact"
+    assert events[-1]["result"]["structured_response"] == first["structured_response"]
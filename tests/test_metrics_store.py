@@ -0,0 +1,70 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from src.reporting.date_ranges import DateRange
+from src.reporting.metrics_source import FixtureMetricsSource
+from src.reporting.metrics_store import MetricsStore, seed_from_fixture
+
+END = date(2025, 3, 31)
+CAMPAIGNS = ["100000", "100001", "100002"]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = MetricsStore(str(tmp_path / "store"))
+    seed_from_fixture(store, campaigns=len(CAMPAIGNS), days=90, end=END, batch_days=40)
+    return store
+
+
+def test_range_totals_match_the_fixture(store):
+    fixture = FixtureMetricsSource()
+    for r in (DateRange(END - timedelta(days=6), END, "w"), DateRange(date(2025, 1, 15), date(2025, 2, 20), "x")):
+        assert np.allclose(store.totals(CAMPAIGNS + ["unknown"], r)[:3], fixture.totals(CAMPAIGNS, r))
+    assert not store.totals(["unknown"], DateRange(END, END, "d")).any()
+
+
+def test_series_rollups_add_up(store):
+    r = DateRange(date(2025, 3, 1), date(2025, 3, 31), "march")
+    days, daily = store.series(CAMPAIGNS, r, "day")
+    weeks, weekly = store.series(CAMPAIGNS, r, "week")
+    hours, hourly = store.series(CAMPAIGNS[:1], DateRange(END, END, "d"), "hour")
+    assert len(days) == 31 and weeks[0] == "2025-W09" and len(hours) == 24
+    assert np.allclose(daily.sum(axis=1), weekly.sum(axis=1))
+    assert np.allclose(hourly.sum(axis=1), daily[:1, -1])
+    with pytest.raises(ValueError):
+        store.series(CAMPAIGNS, r, "minute")
+
+
+def test_upserts_are_idempotent_and_persisted(store, tmp_path):
+    day = DateRange(END, END, "d")
+    before = store.totals(CAMPAIGNS, day)
+    store.upsert_daily(["100000"], [END.toordinal()], np.ones((1, 5)))
+    store.upsert_daily(["100000"], [END.toordinal()], np.ones((1, 5)))
+    reopened = MetricsStore(str(tmp_path / "store"))
+    after = reopened.totals(CAMPAIGNS, day)
+    assert np.allclose(after[0], 1) and np.allclose(after[1:], before[1:])
+
+    # A day before the stored range shifts the arrays without losing data
+    early = date(2024, 1, 1)
+    reopened.upsert_daily(["100001"], [early.toordinal()], np.full((1, 5), 2.0))
+    assert np.allclose(reopened.totals(CAMPAIGNS, day), after)
+    assert np.allclose(reopened.totals(["100001"], DateRange(early, early, "e")), 2.0)
+
+
+def test_readers_pick_up_another_writers_upserts_and_resizes(store, tmp_path):
+    reader = MetricsStore(str(tmp_path / "store"))
+    day = DateRange(END, END, "d")
+    generation = reader.generation
+    store.upsert_daily(["100000"], [END.toordinal()], np.full((1, 5), 3.0))
+    assert np.allclose(reader.totals(["100000"], day), 3.0)
+    assert reader.generation > generation
+
+    # Enough new campaigns and earlier days to replace the arrays with bigger ones
+    early = date(2023, 1, 1)
+    new_campaigns = [str(200000 + i) for i in range(300)]
+    store.upsert_daily(new_campaigns, [early.toordinal()] * 300, np.ones((300, 5)))
+    assert np.allclose(reader.totals(new_campaigns, DateRange(early, early, "e")), 1.0)
+    assert np.allclose(reader.totals(["100000"], day), 3.0)
+    assert reader.stats()["campaigns"] == len(CAMPAIGNS) + 300
@@ -0,0 +1,55 @@
+import pytest
+from langchain_core.messages import HumanMessage
+
+from src.agents.pre_router import PreRouter, campaign_report_rule, explicit_launch_rule
+
+
+def test_campaign_report_routes_ids_and_understood_ranges():
+    decision = campaign_report_rule("spend for campaign 123 and 456 over last_30d", {})
+    assert decision.tool == "reporting_agent_tool"
+    assert decision.args == {"campaign_ids": ["123", "456"], "date_ranges": ["last_30d"]}
+
+
+@pytest.mark.parametrize("text", [
+    "spend for campaign 123 in March 2025",
+    "spend for campaign 123 over the past 30 days",
+    "roas for campaign 123 last quarter",
+    "spend for campaign 123 over the last 2 weeks",
+])
+def test_periods_the_range_parser_does_not_understand_fall_back_to_the_llm(text):
+    # Routing these would report the default last_7d (or take 2025 as a campaign)
+    assert campaign_report_rule(text, {}) is None
+
+
+def test_campaign_report_takes_ids_named_as_campaigns():
+    decision = campaign_report_rule("roas for campaigns 111, 222 & 333 yesterday", {})
+    assert decision.args["campaign_ids"] == ["111", "222", "333"]
+    assert decision.summarize
+
+
+@pytest.mark.parametrize("text", [
+    "top 100 campaigns by spend last month",
+    "report for campaign 123 with a budget of 5000",
+    "spend report for campaign 4567 in 2025",
+    "spend report for 4567 yesterday",
+])
+def test_other_numbers_fall_back_to_the_llm(text):
+    assert campaign_report_rule(text, {}) is None
+
+
+@pytest.mark.parametrize("text, routed", [
+    ("launch a campaign for my shoe store", True),
+    ("create a new campaign", True),
+    ("How do I launch a campaign?", False),
+    ("Did my launch last week go well?", False),
+])
+def test_explicit_launch_skips_questions(text, routed):
+    assert (explicit_launch_rule(text, {}) is not None) == routed
+
+
+def test_router_counts_hits_and_fallbacks():
+    router = PreRouter()
+    assert router.route([HumanMessage(content="performance of campaign 123 last month")]).args["date_ranges"] == ["last month"]
+    assert router.route([HumanMessage(content="how are my ads doing?")]) is None
+    stats = router.stats()
+    assert stats["rules"]["campaign_report"] == 1 and stats["fallbacks"] == 1
@@ -0,0 +1,20 @@
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from src.llms.fake_llm import FakeChatModel
+from src.observability.prompt_cache import PromptCacheTracker
+
+
+def test_cached_input_tokens_are_attributed_to_the_prompt_prefix():
+    tracker = PromptCacheTracker()
+    model = FakeChatModel(responses=["ok"], prompt_cache_min_tokens=128)
+    config = {"callbacks": [tracker], "metadata": {"agent_name": "META_QUERY_AGENT", "prompt_prefix": "v1"}}
+    system = SystemMessage(content="s" * 4 * 300)
+    model.invoke([system, HumanMessage(content="one")], config=config)
+    model.invoke([system, HumanMessage(content="two")], config=config)
+
+    (row,) = tracker.stats()["by_prefix"]
+    assert (row["agent"], row["prefix"], row["calls"]) == ("META_QUERY_AGENT", "v1", 2)
+    assert row["cached_tokens"] == 256 and row["uncached_tokens"] == row["input_tokens"] - 256
+    assert [call["cached_tokens"] for call in tracker.recent_calls()] == [0, 256]
+    tracker.reset()
+    assert tracker.stats() == {"by_prefix": []}
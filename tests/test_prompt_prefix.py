@@ -0,0 +1,18 @@
+from src.agents.launching_agent import LaunchingAgent
+from src.agents.meta_query_agent import MetaQueryAgent
+from src.llms.fake_llm import FakeChatModel
+from src.system_prompts.prompt_prefix import freeze_prefix, frozen_versions
+
+
+def test_checked_in_versions_match_the_agents(tmp_path, monkeypatch):
+    # A prompt or tool schema change must come with `python -m src.system_prompts.prompt_prefix --update`
+    monkeypatch.chdir(tmp_path)
+    model = FakeChatModel(responses=[""])
+    agents = [MetaQueryAgent(model=model), LaunchingAgent(model=model)]
+    assert {a.run_config["metadata"]["agent_name"]: a.prompt_prefix.version for a in agents} == frozen_versions()
+
+
+def test_prefix_is_built_once_and_versioned_by_content():
+    first = freeze_prefix("TEST_AGENT", "You are a test agent.", [])
+    assert freeze_prefix("TEST_AGENT", "You are a test agent.", []) is first
+    assert freeze_prefix("TEST_AGENT", "You are another test agent.", []).version != first.version
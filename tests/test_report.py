@@ -0,0 +1,25 @@
+from datetime import date
+
+import pytest
+
+from src.reporting.metrics_source import FixtureMetricsSource
+from src.reporting.report import MAX_RANGE_DAYS, ReportingEngine
+
+TODAY = date(2025, 6, 15)
+
+
+def test_report_covers_every_campaign_and_range():
+    table = ReportingEngine(FixtureMetricsSource()).report(["1", "2", "1"], ["yesterday", "last_7d"], ["spend", "roas"], today=TODAY)
+    assert table.campaigns == ["1", "2"]
+    assert table.metrics == ("spend", "roas")
+    assert table.values.shape == (4, 2)
+    assert table.totals.shape == (2, 2)
+
+
+def test_oversized_date_range_is_rejected():
+    engine = ReportingEngine(FixtureMetricsSource())
+    engine.report(["1"], [f"last_{MAX_RANGE_DAYS}d"], today=TODAY)
+    with pytest.raises(ValueError, match="days per date range"):
+        engine.report(["1"], [f"last_{MAX_RANGE_DAYS + 1}d"], today=TODAY)
+    with pytest.raises(ValueError, match="Unknown date range"):
+        engine.report(["1"], ["last fortnight"], today=TODAY)
@@ -0,0 +1,96 @@
+import threading
+import time
+from datetime import date
+
+import numpy as np
+import pytest
+
+from src.reporting.date_ranges import parse_date_range
+from src.reporting.metrics_source import FixtureMetricsSource
+from src.reporting.metrics_store import MetricsStore
+from src.reporting.report import ReportingEngine
+from src.reporting.report_cache import ReportCache
+
+TODAY = date(2025, 6, 15)
+
+
+def _computer(calls, delay=0.0):
+    engine = ReportingEngine(FixtureMetricsSource())
+
+    def compute():
+        calls.append(1)
+        time.sleep(delay)
+        return engine.report(["1", "2"], ["last_7d"], today=TODAY)
+    return compute
+
+
+def test_hit_then_stale_then_refreshed():
+    calls = []
+    cache = ReportCache(ttl=0.0, stale_for=60.0)
+    table, status = cache.get_or_compute("k", _computer(calls))
+    assert status == "miss" and not table.values.flags.writeable
+
+    again, status = cache.get_or_compute("k", _computer(calls))
+    assert status == "stale" and again is table
+    for _ in range(100):
+        if len(calls) == 2:
+            break
+        time.sleep(0.01)
+    assert len(calls) == 2 and cache.stats()["refreshes"] == 1
+
+    assert ReportCache(ttl=60.0).get_or_compute("k", _computer(calls))[1] == "miss"
+    fresh = ReportCache(ttl=60.0)
+    fresh.get_or_compute("k", _computer(calls))
+    assert fresh.get_or_compute("k", _computer(calls))[1] == "hit"
+
+
+def test_concurrent_misses_compute_once():
+    calls, statuses = [], []
+    cache = ReportCache()
+    threads = [threading.Thread(target=lambda: statuses.append(cache.get_or_compute("k", _computer(calls, 0.1))[1])) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert sorted(statuses) == ["coalesced"] * 3 + ["miss"]
+
+
+def test_failed_compute_is_not_cached_and_settled_ranges_live_longer():
+    cache = ReportCache(ttl=10.0, settled_ttl=100.0)
+
+    def broken():
+        raise RuntimeError("source down")
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("k", broken)
+    assert cache.get_or_compute("k", _computer([]))[1] == "miss"
+
+    assert cache.ttl_for([parse_date_range("last_7d", TODAY)], TODAY) == 10.0
+    assert cache.ttl_for([parse_date_range("2025-01-01..2025-01-31", TODAY)], TODAY) == 100.0
+
+
+def test_refresh_started_before_clear_is_not_stored():
+    calls, release = [], threading.Event()
+    compute = _computer(calls)
+    cache = ReportCache(ttl=0.0, stale_for=60.0)
+    cache.get_or_compute("k", compute)
+    assert cache.get_or_compute("k", lambda: release.wait(5) and compute())[1] == "stale"
+    cache.clear()
+    release.set()
+    for _ in range(100):
+        if not cache.stats()["refreshing"] and len(calls) == 2:
+            break
+        time.sleep(0.01)
+    assert len(calls) == 2 and cache.stats()["entries"] == 0
+    assert cache.get_or_compute("k", compute)[1] == "miss"
+
+
+def test_new_store_data_moves_reports_to_a_new_entry(tmp_path):
+    path = str(tmp_path / "store")
+    engine = ReportingEngine(MetricsStore(path), ReportCache(ttl=60.0))
+    day = TODAY.toordinal() - 1
+    MetricsStore(path).upsert_daily(["1"], [day], np.ones((1, 5)))
+    assert engine.report(["1"], ["yesterday"], today=TODAY).values[0, 0] == 1.0
+    # Written by another process (here another instance) after the report was cached
+    MetricsStore(path).upsert_daily(["1"], [day], np.full((1, 5), 2.0))
+    assert engine.report(["1"], ["yesterday"], today=TODAY).values[0, 0] == 2.0
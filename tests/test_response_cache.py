@@ -0,0 +1,52 @@
+from langchain_core.messages import HumanMessage
+
+from src.agents.response_cache import ResponseCache
+
+RESULT = {"structured_response": {"response": "spend 10"}, "tool_calls": [{"name": "reporting_agent_tool"}]}
+
+
+def _key(text):
+    return ResponseCache.request_key([HumanMessage(content=text)])
+
+
+def test_questions_about_different_periods_do_not_share_an_answer():
+    cache = ResponseCache()
+    month = _key("give me the spend and roas for campaign 123 over the last month")
+    week = _key("give me the spend and roas for campaign 123 over the last week")
+    assert month[:2] != week[:2]
+
+    assert cache.put(month, RESULT, 1.0)
+    assert cache.get(week) is None
+    assert cache.get(_key("give me the spend and roas for campaign 123 over the last 30 days")) is None
+
+
+def test_rephrased_question_hits_the_cached_answer():
+    cache = ResponseCache()
+    cache.put(_key("give me the spend and roas for campaign 123 over the last month"), RESULT, 1.0)
+    assert cache.get(_key("Give me the spend and ROAS for campaign 123 over the last month!"))[1] == "exact"
+    assert cache.get(_key("give me the spend and the roas for campaign 123 over the last month"))[1] == "similar"
+    assert cache.get(_key("give me the spend and roas for campaign 124 over the last month")) is None
+
+
+def test_expired_and_uncacheable_results_are_not_served():
+    key = _key("spend for campaign 7 yesterday")
+    assert not ResponseCache().put(key, {**RESULT, "tool_calls": [{"name": "launching_agent_tool"}]}, 1.0)
+
+    cache = ResponseCache(ttl=0.0)
+    cache.put(key, RESULT, 1.0)
+    assert cache.get(key) is None
+    assert cache.stats()["expired"] == 1
+
+
+def test_differing_qualifiers_do_not_match():
+    cache = ResponseCache()
+    cache.put(_key("spend and roas for campaign 12345 over the last month excluding weekends"), RESULT, 1.0)
+    assert cache.get(_key("spend and roas for campaign 12345 over the last month including weekends")) is None
+    assert cache.get(_key("show me spend and roas for campaign 12345 over the last month excluding weekends"))[1] == "similar"
+
+
+def test_replies_without_a_tool_call_are_not_cached():
+    cache = ResponseCache()
+    chit_chat = {"structured_response": {"response": "You're welcome!"}, "tool_calls": []}
+    assert not cache.put(_key("thanks"), chit_chat, 1.0)
+    assert cache.get(_key("thanks")) is None
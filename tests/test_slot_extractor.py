@@ -0,0 +1,37 @@
+import pytest
+
+from src.agents.slot_extractor import extract_daily_budget, extract_slots
+
+
+@pytest.mark.parametrize("text, budget", [
+    ("Run it for 2 weeks with a budget of 500 per day", 500),
+    ("target the top 3 cities in India, budget 500 a day", 500),
+    ("budget is 500 for campaign 3", 500),
+    ("$1,200", 1200),
+    ("spend ₹750/day", 750),
+    ("2k", 2000),
+    ("500", 500),
+])
+def test_budget_is_the_amount_tied_to_the_budget(text, budget):
+    assert extract_daily_budget(text) == budget
+
+
+def test_ambiguous_or_missing_budget_gives_no_slot():
+    assert extract_daily_budget("budget 500 or 800 per day") is None
+    assert extract_daily_budget("3 or 4") is None
+    assert extract_daily_budget("run it for 2 weeks") is None
+    with pytest.raises(ValueError):
+        extract_daily_budget("budget of 0")
+
+
+def test_extract_slots_reads_unambiguous_values_anywhere():
+    extraction = extract_slots("Sales campaign for https://shop.example.com/p/1 in India starting 2025-07-01, top 3 cities, 500 a day")
+    assert extraction.slots == {
+        "product_url": "https://shop.example.com/p/1",
+        "start_time": "2025-07-01T00:00:00",
+        "objective": "Sales",
+        "geo": "India",
+        "daily_budget": 500,
+    }
+    assert extract_slots("Pune", expected="geo").slots == {"geo": "Pune"}
+    assert extract_slots("not sure", expected="geo").slots == {}
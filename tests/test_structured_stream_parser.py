@@ -0,0 +1,42 @@
+from src.agents.structured_stream_parser import IncrementalJSONParser, StructuredStreamParser
+from src.states.meta_query_agent_state import MetaQueryAgentResponse
+
+
+def feed_in_chunks(parser, text, size=3):
+    events = []
+    for i in range(0, len(text), size):
+        events.extend(parser.feed(text[i:i + size]))
+    return events
+
+
+def test_top_level_string_streams_deltas_then_field():
+    events = feed_in_chunks(IncrementalJSONParser(), '{"context": "mode=clarify", "response": "Hi \\"there\\""}')
+    deltas = "".join(text for kind, key, text in events if kind == "delta" and key == "response")
+    assert deltas == 'Hi "there"'
+    assert ("field", "response", 'Hi "there"') in events
+    assert ("field", "context", "mode=clarify") in events
+
+
+def test_nested_object_keys_are_not_reported_as_top_level_fields():
+    parser = IncrementalJSONParser()
+    events = feed_in_chunks(parser, '{"context": {"stage": "x", "n": [1, {"k": 2}]}, "response": "ok"}')
+    fields = [(key, value) for kind, key, value in events if kind == "field"]
+    assert fields == [("context", {"stage": "x", "n": [1, {"k": 2}]}), ("response", "ok")]
+    assert parser.done
+
+
+def test_structured_parser_validates_fields():
+    parser = StructuredStreamParser(MetaQueryAgentResponse)
+    events = parser.feed('{"context": "mode=clarify", "response": "Which campaign?", "bogus": 1}')
+    assert parser.fields == {"context": "mode=clarify", "response": "Which campaign?"}
+    assert {"type": "field_error", "field": "bogus", "error": "unknown field"} in events
+
+
+def test_escaped_surrogate_pairs_stream_as_one_character():
+    text = '{"response": "ok \\ud83d\\ude00 \\u00e9", "context": "x \\ud83d"}'
+    for size in (1, 3, 7):
+        events = feed_in_chunks(IncrementalJSONParser(), text, size)
+        deltas = {key: "".join(t for kind, k, t in events if kind == "delta" and k == key) for key in ("response", "context")}
+        assert deltas == {"response": "ok \U0001F600 é", "context": "x �"}
+        deltas["response"].encode("utf-8")
+    assert ("field", "response", "ok \U0001F600 é") in events
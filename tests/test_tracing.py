@@ -0,0 +1,96 @@
+import asyncio
+import contextvars
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from src.agents.meta_query_agent import MetaQueryAgent
+from src.llms.fake_llm import FakeChatModel
+from src.observability.tracing import current_span, format_trace, get_trace_collector, set_tracing, span, traced_aiter, traced_iter, tracing_scope
+
+
+@pytest.fixture(autouse=True)
+def tracing(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("TRACE_PATH", str(tmp_path / "traces.jsonl"))
+    set_tracing(True)
+    yield
+    set_tracing(False)
+
+
+def test_spans_nest_and_export_the_root():
+    with span("turn", "turn") as root:
+        with span("tool", "tool") as child:
+            assert current_span() is child
+            child.set(cached=True)
+    assert current_span().recording is False
+    assert root.children == [child] and child.trace_id == root.trace_id
+    assert get_trace_collector().find(root.trace_id) is root
+    assert format_trace(root).splitlines()[1].startswith("  tool [tool]")
+
+
+def test_disabled_tracing_returns_the_noop_span():
+    set_tracing(False)
+    with span("turn", "turn") as root:
+        assert root.recording is False
+        assert current_span() is root
+
+
+def test_agent_invoke_records_a_model_span():
+    agent = MetaQueryAgent(model=FakeChatModel(responses=[{"context": "mode=clarify", "response": "hello"}]))
+    result = agent.invoke([HumanMessage(content="hi")])
+    assert result["structured_response"]["response"] == "hello"
+
+    root = get_trace_collector().recent()[-1]
+    assert root.name == "META_QUERY_AGENT"
+    assert "model" in [c.name for c in root.children]
+
+
+def test_tracing_scope_overrides_the_process_setting_in_its_context_only():
+    with tracing_scope(False):
+        assert span("turn", "turn").recording is False
+        # Another session's turn (a separate context) still follows the process setting
+        assert contextvars.Context().run(lambda: span("turn", "turn").recording) is True
+    set_tracing(False)
+    with tracing_scope(True), span("turn", "turn") as root:
+        assert current_span() is root
+    assert span("turn", "turn").recording is False
+
+
+def test_traced_iter_keeps_the_span_out_of_the_consumer():
+    def steps():
+        yield current_span().name
+        yield current_span().name
+
+    events = traced_iter(span("agent", "agent"), steps())
+    assert next(events) == "agent"
+    assert current_span().recording is False
+    events.close()  # closed while paused, without touching the consumer's context
+    assert current_span().recording is False
+
+
+def test_traced_aiter_records_errors():
+    async def steps():
+        yield 1
+        raise RuntimeError("boom")
+
+    async def consume(agent_span):
+        return [item async for item in traced_aiter(agent_span, steps())]
+
+    agent_span = span("agent", "agent")
+    with pytest.raises(RuntimeError):
+        asyncio.run(consume(agent_span))
+    assert agent_span.status == "error" and agent_span.duration_ms is not None
+
+
+def test_agent_stream_does_not_leak_its_span():
+    agent = MetaQueryAgent(model=FakeChatModel(responses=[{"context": "mode=clarify", "response": "hello"}]))
+    events = agent.stream([HumanMessage(content="hi")])
+    next(events)
+    assert current_span().recording is False
+    rest = list(events)
+    assert rest[-1]["type"] == "final"
+
+    root = get_trace_collector().recent()[-1]
+    assert root.name == "META_QUERY_AGENT"
+    assert "model" in [c.name for c in root.children]
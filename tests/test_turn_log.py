@@ -0,0 +1,33 @@
+import json
+import time
+
+from langchain_core.messages import AIMessage
+
+from src.observability.turn_log import TurnLogConfig, TurnLogWriter, compact_message
+
+
+def _records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_records_are_written_in_the_background_and_flushed_on_close(tmp_path):
+    path = tmp_path / "turns.jsonl"
+    writer = TurnLogWriter(TurnLogConfig(path=str(path), flush_interval=60))
+    for i in range(3):
+        assert writer.write({"turn": i, "messages": [compact_message(AIMessage(content="hi"))]})
+    writer.close()
+    assert [r["turn"] for r in _records(path)] == [0, 1, 2]
+    assert _records(path)[0]["messages"] == [{"type": "ai", "content": "hi"}]
+    assert writer.stats()["written"] == 3
+
+
+def test_full_file_is_rotated_and_old_backups_pruned(tmp_path):
+    path = tmp_path / "turns.jsonl"
+    writer = TurnLogWriter(TurnLogConfig(path=str(path), max_bytes=10, backups=1, flush_interval=0.01))
+    for i in range(3):
+        writer.write({"turn": i})
+        time.sleep(0.1)
+    writer.close()
+    assert writer.stats()["rotations"] == 2
+    assert len(list(tmp_path.glob("turns.*.jsonl"))) == 1
+    assert [r["turn"] for r in _records(path)] == [2]
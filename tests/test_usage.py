@@ -0,0 +1,58 @@
+from langchain_core.messages import HumanMessage
+
+from src.agents.meta_query_agent import MetaQueryAgent
+from src.conversation.conversation_store import InMemoryConversationStore, SQLiteConversationStore
+from src.conversation.session import bind_conversation
+from src.llms.fake_llm import FakeChatModel
+from src.observability.usage import ConversationBudget, Usage, UsageLedger, call_usage, price_for
+
+
+def test_calls_are_priced_by_model_snapshot():
+    assert price_for("gpt-4.1-mini-2025-04-14") == price_for("gpt-4.1-mini") != price_for("gpt-4.1")
+    usage = call_usage("gpt-4.1", input_tokens=1_000_000, cached_tokens=500_000, output_tokens=0)
+    assert round(usage.cost_usd, 6) == 1.25
+
+
+def test_ledger_charges_conversation_and_agent():
+    ledger = UsageLedger()
+    conversation = InMemoryConversationStore().conversation()
+    model = FakeChatModel(responses=["ok"])
+    with bind_conversation(conversation):
+        model.invoke([HumanMessage(content="x" * 40)], config={"callbacks": [ledger], "metadata": {"agent_name": "META_QUERY_AGENT"}})
+    report = ledger.conversation_report(conversation.id)
+    assert (report["calls"], report["input_tokens"], report["output_tokens"]) == (1, 10, 1)
+    assert list(report["by_agent"]) == ["META_QUERY_AGENT"]
+    assert ledger.conversation_report("unknown") is None
+
+
+def test_budget_degrades_then_exhausts():
+    budget = ConversationBudget(max_tokens=100, degrade_at=0.5)
+    assert [budget.status(Usage(input_tokens=n)) for n in (10, 60, 100)] == ["ok", "degraded", "exhausted"]
+    assert not ConversationBudget().enabled
+
+
+def test_exhausted_conversation_skips_the_supervisor(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("CONVERSATION_BUDGET_TOKENS", "5")
+    agent = MetaQueryAgent(model=FakeChatModel(responses=[{"context": "mode=clarify", "response": "a long enough answer"}]))
+    conversation = InMemoryConversationStore().conversation()
+    with bind_conversation(conversation):
+        assert agent.invoke([HumanMessage(content="hello")]).get("budget") is None
+        assert agent.invoke([HumanMessage(content="hello again")])["budget"] == "exhausted"
+
+
+def test_budget_totals_are_shared_through_the_store(tmp_path):
+    # Two workers (or a restart) on one database see the same spend, even after the ledger evicts the conversation
+    path = str(tmp_path / "conversations.db")
+    budget = ConversationBudget(max_tokens=12)
+    first = UsageLedger(budget, max_conversations=1, store=SQLiteConversationStore(path))
+    second = UsageLedger(budget, store=SQLiteConversationStore(path))
+    conversation = InMemoryConversationStore().conversation()
+    model = FakeChatModel(responses=["ok"])
+    with bind_conversation(conversation):
+        model.invoke([HumanMessage(content="x" * 40)], config={"callbacks": [first]})
+    with bind_conversation(InMemoryConversationStore().conversation()):
+        model.invoke([HumanMessage(content="x")], config={"callbacks": [first]})
+    assert first.conversation_report(conversation.id) is None  # evicted from memory
+    assert first.budget_status(conversation.id) == second.budget_status(conversation.id) == "degraded"
+    assert second.conversation_usage(conversation.id).tokens == 11